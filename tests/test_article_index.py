@@ -0,0 +1,237 @@
+"""Tests of the local index of approved articles, synced from a stand-in for the DynamoDB queries."""
+
+from typing import Any, Dict, List
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+pytest.importorskip("pynamodb")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from news_aggregator_data_access_layer.constants import ArticleApprovalStatus  # noqa: E402
+from news_aggregator_data_access_layer.models.dynamodb import SourcedArticles  # noqa: E402
+from pynamodb.attributes import NumberAttribute, UTCDateTimeAttribute  # noqa: E402
+
+from the_daily_bite_web_app.utils import article_index  # noqa: E402
+from the_daily_bite_web_app.utils.article_index import (  # noqa: E402
+    ApprovedArticlesIndex,
+    is_index_cursor,
+)
+
+TOPIC_ID = "topic"
+PUBLISHED_AT = datetime(2023, 7, 1, tzinfo=timezone.utc)
+
+
+def make_sourced_article(
+    idx: int, approval_status: ArticleApprovalStatus = ArticleApprovalStatus.APPROVED
+) -> SourcedArticles:
+    dt_published = PUBLISHED_AT + timedelta(hours=idx)
+    sourced_article = SourcedArticles(
+        topic_id=TOPIC_ID,
+        sourced_article_id=f"article-{idx:02d}",
+        title=f"Article {idx}",
+        date_published=dt_published.strftime("%Y/%m/%d"),
+        dt_published=dt_published,
+        short_summary_ref=f"{TOPIC_ID}/article-{idx:02d}/short",
+        source_article_urls=[f"https://example.com/{idx}"],
+        providers=["Provider"],
+        article_approval_status=approval_status,
+    )
+    # the keys the app doesn't set itself get values sorting the articles by publishing time
+    for name, attribute in SourcedArticles.get_attributes().items():
+        if (attribute.is_hash_key or attribute.is_range_key) and getattr(
+            sourced_article, name
+        ) is None:
+            if isinstance(attribute, UTCDateTimeAttribute):
+                setattr(sourced_article, name, dt_published)
+            elif isinstance(attribute, NumberAttribute):
+                setattr(sourced_article, name, dt_published.timestamp())
+            else:
+                setattr(sourced_article, name, f"{dt_published.isoformat()}#{idx}")
+    return sourced_article
+
+
+class StandInQuery:
+    """Stand-in for SourcedArticles.query returning the articles set, recording its arguments."""
+
+    def __init__(self):
+        self.sourced_articles: List[SourcedArticles] = []
+        self.calls: List[Dict[str, Any]] = []
+
+    def __call__(self, hash_key, **kwargs):
+        self.calls.append({"hash_key": hash_key, **kwargs})
+        return iter(self.sourced_articles)
+
+
+@pytest.fixture
+def query(monkeypatch) -> StandInQuery:
+    query = StandInQuery()
+    monkeypatch.setattr(article_index.SourcedArticles, "query", query)
+    return query
+
+
+def make_index(**kwargs) -> ApprovedArticlesIndex:
+    return ApprovedArticlesIndex(
+        ":memory:",
+        sync_interval_secs=60,
+        full_sync_interval_secs=3600,
+        topic_ttl_secs=kwargs.pop("topic_ttl_secs", 3600),
+        **kwargs,
+    )
+
+
+def article_ids(articles: List[Dict[str, Any]]) -> List[str]:
+    return [article["article_id"] for article in articles]
+
+
+def test_get_page_pages_through_the_articles_latest_first(query):
+    index = make_index()
+    query.sourced_articles = [make_sourced_article(idx) for idx in range(12)]
+    index.sync_topic(TOPIC_ID)
+
+    pages = []
+    cursor = None
+    while True:
+        articles, cursors, cursor = index.get_page(TOPIC_ID, cursor, count=5)
+        pages.append(article_ids(articles))
+        assert len(cursors) == len(articles)
+        if cursor is None:
+            break
+        assert is_index_cursor(cursor)
+        assert cursor == cursors[-1]
+
+    assert pages == [
+        [f"article-{idx:02d}" for idx in range(11, 6, -1)],
+        [f"article-{idx:02d}" for idx in range(6, 1, -1)],
+        ["article-01", "article-00"],
+    ]
+
+
+def test_get_page_pages_through_the_articles_oldest_first(query):
+    index = make_index()
+    query.sourced_articles = [make_sourced_article(idx) for idx in range(7)]
+    index.sync_topic(TOPIC_ID)
+
+    articles, _, cursor = index.get_page(TOPIC_ID, None, count=5, latest_first=False)
+    assert article_ids(articles) == [f"article-{idx:02d}" for idx in range(5)]
+    articles, _, cursor = index.get_page(TOPIC_ID, cursor, count=5, latest_first=False)
+    assert article_ids(articles) == ["article-05", "article-06"]
+    assert cursor is None
+
+
+def test_get_page_has_no_next_page_when_the_last_page_is_full(query):
+    index = make_index()
+    query.sourced_articles = [make_sourced_article(idx) for idx in range(5)]
+    index.sync_topic(TOPIC_ID)
+
+    articles, _, cursor = index.get_page(TOPIC_ID, None, count=5)
+
+    assert len(articles) == 5
+    assert cursor is None
+
+
+def test_can_serve_only_synced_topics_and_index_cursors(query):
+    index = make_index()
+    assert not index.can_serve(TOPIC_ID, None)
+
+    query.sourced_articles = [make_sourced_article(0)]
+    index.sync_topic(TOPIC_ID)
+
+    assert index.can_serve(TOPIC_ID, None)
+    assert not index.can_serve(TOPIC_ID, {"topic_id": {"S": TOPIC_ID}})
+    assert not index.can_serve("other topic", None)
+
+
+def test_sync_without_changed_at_attribute_reads_from_the_newest_article_indexed(query):
+    index = make_index()
+    query.sourced_articles = [make_sourced_article(idx) for idx in range(3)]
+    index.sync_topic(TOPIC_ID)
+    query.sourced_articles = [make_sourced_article(3)]
+    index.sync_topic(TOPIC_ID)
+
+    assert query.calls[0]["last_evaluated_key"] is None
+    assert query.calls[1]["last_evaluated_key"] == article_index.sourced_article_key(
+        make_sourced_article(2)
+    )
+    articles, _, _ = index.get_page(TOPIC_ID, None, count=10)
+    assert article_ids(articles) == ["article-03", "article-02", "article-01", "article-00"]
+
+
+def test_sync_with_changed_at_attribute_reads_the_changed_articles(query):
+    index = make_index(changed_at_attribute="dt_published", changed_at_index="changed-at-index")
+    query.sourced_articles = [make_sourced_article(idx) for idx in [1, 2, 3]]
+    index.sync_topic(TOPIC_ID)
+    # an older article approved later and an article no longer approved
+    query.sourced_articles = [
+        make_sourced_article(0),
+        make_sourced_article(2, ArticleApprovalStatus.REJECTED),
+    ]
+    index.sync_topic(TOPIC_ID)
+
+    assert "index_name" not in query.calls[0]
+    assert query.calls[1]["index_name"] == "changed-at-index"
+    assert query.calls[1]["range_key_condition"] is not None
+    articles, _, _ = index.get_page(TOPIC_ID, None, count=10)
+    assert article_ids(articles) == ["article-03", "article-01", "article-00"]
+
+
+def test_changed_at_attribute_missing_from_the_model_falls_back_to_full_syncs():
+    index = make_index(changed_at_attribute="no_such_attribute", changed_at_index="index")
+
+    assert index.changed_at_attribute is None
+    assert index.changed_at_index is None
+
+
+def test_untrack_idle_topics_drops_them_from_the_index(query, monkeypatch):
+    index = make_index(topic_ttl_secs=0)
+    # no background syncs, the test syncs itself
+    monkeypatch.setattr(index, "_sync_loop", lambda: None)
+    index.track_topics([TOPIC_ID])
+    query.sourced_articles = [make_sourced_article(0)]
+    index.sync_topic(TOPIC_ID)
+    assert index.is_synced(TOPIC_ID)
+
+    assert index.untrack_idle_topics() == [TOPIC_ID]
+
+    assert not index.is_synced(TOPIC_ID)
+    assert index.get_page(TOPIC_ID, None, count=5)[0] == []
+
+
+def test_track_topics_keeps_recently_tracked_topics(query, monkeypatch):
+    index = make_index(topic_ttl_secs=3600)
+    monkeypatch.setattr(index, "_sync_loop", lambda: None)
+    index.track_topics([TOPIC_ID])
+
+    assert index.untrack_idle_topics() == []
+
+
+def test_an_untracked_topic_is_synced_again_to_serve_its_cursors(query, monkeypatch):
+    index = make_index(topic_ttl_secs=0)
+    monkeypatch.setattr(index, "_sync_loop", lambda: None)
+    index.track_topics([TOPIC_ID])
+    query.sourced_articles = [make_sourced_article(idx) for idx in range(7)]
+    index.sync_topic(TOPIC_ID)
+    _, _, cursor = index.get_page(TOPIC_ID, None, count=5)
+    index.untrack_idle_topics()
+    assert not index.can_serve(TOPIC_ID, cursor)
+
+    assert index.sync_untracked_topic(TOPIC_ID)
+
+    assert index.can_serve(TOPIC_ID, cursor)
+    assert article_ids(index.get_page(TOPIC_ID, cursor, count=5)[0]) == ["article-01", "article-00"]
+
+
+def test_sync_untracked_topic_fails_when_the_topic_cant_be_read(monkeypatch):
+    def failing_query(hash_key, **kwargs):
+        raise RuntimeError("Throttled")
+
+    monkeypatch.setattr(article_index.SourcedArticles, "query", failing_query)
+    index = make_index()
+    monkeypatch.setattr(index, "_sync_loop", lambda: None)
+
+    assert not index.sync_untracked_topic(TOPIC_ID)
@@ -0,0 +1,228 @@
+"""Tests of the Lambda invoker's retries and concurrency limit against stand-in clients."""
+
+from typing import Any, Dict, List
+
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+pytest.importorskip("boto3")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+import requests  # noqa: E402
+from botocore.exceptions import (  # noqa: E402
+    ClientError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+from the_daily_bite_web_app.exceptions import InvokeFunctionException  # noqa: E402
+from the_daily_bite_web_app.utils.aws_lambda import LambdaInvoker  # noqa: E402
+
+
+class StandInLambdaClient:
+    """Stand-in for the boto3 Lambda client raising the errors given, then echoing the payload."""
+
+    def __init__(self, errors: List[Exception] = [], latency_secs: float = 0):
+        self.errors = list(errors)
+        self.latency_secs = latency_secs
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, FunctionName: str, Payload: str, LogType: str) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            error = self.errors.pop(0) if self.errors else None
+        try:
+            time.sleep(self.latency_secs)
+            if error is not None:
+                raise error
+            body = json.dumps({"statusCode": 200, "body": json.loads(Payload)})
+            return {"StatusCode": 200, "Payload": io.BytesIO(body.encode("utf-8"))}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class StandInResponse:
+    def __init__(self, status_code: int, body: Dict[str, Any]):
+        self.status_code = status_code
+        self.text = json.dumps(body)
+        self._body = body
+
+    def json(self) -> Dict[str, Any]:
+        return self._body
+
+
+class StandInSession:
+    """Stand-in for the requests session of the local mode raising the errors given, then echoing."""
+
+    def __init__(self, errors: List[Exception] = []):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def post(self, url: str, json: Dict[str, Any], timeout: float) -> StandInResponse:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return StandInResponse(200, {"statusCode": 200, "body": json})
+
+
+def make_invoker(
+    client: Any = None,
+    session: Any = None,
+    max_concurrency: int = 4,
+    max_attempts: int = 4,
+) -> LambdaInvoker:
+    invoker = LambdaInvoker(
+        region_name="us-east-1",
+        local_testing=session is not None,
+        max_concurrency=max_concurrency,
+        max_attempts=max_attempts,
+        base_backoff_secs=0,
+        timeout_secs=1,
+    )
+    invoker._lambda_client = client
+    invoker._session = session
+    return invoker
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Invoke")
+
+
+def test_invoke_retries_connection_errors_and_timeouts():
+    client = StandInLambdaClient(
+        [
+            EndpointConnectionError(endpoint_url="https://lambda"),
+            ConnectTimeoutError(endpoint_url="https://lambda"),
+            ReadTimeoutError(endpoint_url="https://lambda"),
+        ]
+    )
+    invoker = make_invoker(client, max_attempts=4)
+
+    response = invoker.invoke("function", {"param": 1})
+
+    assert response == {"statusCode": 200, "body": {"param": 1}}
+    assert client.calls == 4
+
+
+def test_invoke_retries_throttling():
+    client = StandInLambdaClient([client_error("TooManyRequestsException")])
+    invoker = make_invoker(client)
+
+    invoker.invoke("function", {})
+
+    assert client.calls == 2
+
+
+def test_invoke_does_not_retry_other_client_errors():
+    client = StandInLambdaClient([client_error("InvalidParameterValueException")])
+    invoker = make_invoker(client)
+
+    with pytest.raises(InvokeFunctionException):
+        invoker.invoke("function", {})
+    assert client.calls == 1
+
+
+def test_invoke_gives_up_after_max_attempts():
+    client = StandInLambdaClient(
+        [EndpointConnectionError(endpoint_url="https://lambda") for _ in range(5)]
+    )
+    invoker = make_invoker(client, max_attempts=3)
+
+    with pytest.raises(InvokeFunctionException):
+        invoker.invoke("function", {})
+    assert client.calls == 3
+
+
+def test_invoke_local_retries_connection_errors_and_timeouts():
+    session = StandInSession([requests.ConnectionError(), requests.Timeout()])
+    invoker = make_invoker(session=session)
+
+    response = invoker.invoke("function", {"param": 1}, function_url="http://localhost:9000")
+
+    assert response == {"statusCode": 200, "body": {"param": 1}}
+    assert session.calls == 3
+
+
+def test_invocations_in_progress_are_limited_to_max_concurrency():
+    client = StandInLambdaClient(latency_secs=0.05)
+    invoker = make_invoker(client, max_concurrency=2)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(
+            executor.map(lambda idx: invoker.invoke("function", {"idx": idx}), range(8))
+        )
+
+    assert [response["body"]["idx"] for response in responses] == list(range(8))
+    assert client.max_in_flight == 2
+
+
+def test_invoke_many_returns_the_result_of_each_invocation_in_order():
+    client = StandInLambdaClient([client_error("InvalidParameterValueException")])
+    invoker = make_invoker(client, max_concurrency=1)
+
+    results = invoker.invoke_many([("function", {"idx": 0}), ("function", {"idx": 1})])
+
+    assert isinstance(results[0], InvokeFunctionException)
+    assert results[1] == {"statusCode": 200, "body": {"idx": 1}}
+
+
+def test_invoke_async_runs_the_invocation_off_the_event_loop():
+    client = StandInLambdaClient()
+    invoker = make_invoker(client)
+    event_loop_thread = threading.current_thread()
+    invocation_threads = []
+    invoke_lambda = invoker._invoke_lambda
+
+    def recording_invoke_lambda(*args):
+        invocation_threads.append(threading.current_thread())
+        return invoke_lambda(*args)
+
+    invoker._invoke_lambda = recording_invoke_lambda  # type: ignore
+
+    response = asyncio.run(invoker.invoke_async("function", {"param": 1}))
+
+    assert response == {"statusCode": 200, "body": {"param": 1}}
+    assert invocation_threads and event_loop_thread not in invocation_threads
+
+
+def test_invoke_async_retries_and_raises_like_invoke():
+    client = StandInLambdaClient(
+        [client_error("TooManyRequestsException"), client_error("InvalidParameterValueException")]
+    )
+    invoker = make_invoker(client)
+
+    with pytest.raises(InvokeFunctionException):
+        asyncio.run(invoker.invoke_async("function", {}))
+    assert client.calls == 2
+
+
+def test_invoke_many_async_overlaps_the_invocations_and_keeps_their_order():
+    client = StandInLambdaClient(
+        [client_error("InvalidParameterValueException")], latency_secs=0.05
+    )
+    invoker = make_invoker(client, max_concurrency=4)
+
+    results = asyncio.run(
+        invoker.invoke_many_async([("function", {"idx": idx}) for idx in range(4)])
+    )
+
+    assert isinstance(results[0], InvokeFunctionException)
+    assert [result["body"]["idx"] for result in results[1:]] == [1, 2, 3]
+    assert client.max_in_flight > 1
@@ -0,0 +1,835 @@
+"""
+End-to-end benchmarks of the state event handlers against in-memory stand-ins for DynamoDB and S3.
+
+The handlers of the login, news topics, newspaper and newsletter states are driven through the same
+event processing as the app (chained events included) while the DynamoDB models and the S3 reads
+are served from memory, so the numbers reflect the work done by the app itself. For each handler
+the wall time, the allocations and the backend calls are reported, with caches cleared before each
+session ("cold") and with caches warmed up by a previous session ("warm").
+
+The benchmarks only run when RUN_BENCHMARKS is true (see ``make benchmark``) and are configured
+with environment variables:
+
+- BENCHMARK_TOPICS: the number of published topics.
+- BENCHMARK_ARTICLES_PER_TOPIC: the number of sourced articles of each topic.
+- BENCHMARK_DAYS: the number of days the articles of each topic are spread over.
+- BENCHMARK_USERS: the number of preview users, each subscribed to BENCHMARK_SUBSCRIPTIONS topics.
+- BENCHMARK_SUMMARY_CHARS: the length of the short summaries (medium and full are 2x and 4x).
+- BENCHMARK_BACKEND_LATENCY_MS: a latency added to every backend call.
+- BENCHMARK_ROUNDS: the number of timed sessions of each scenario and mode.
+- BENCHMARK_RESULTS_PATH: where the JSON results are written.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+RUN_BENCHMARKS = os.environ.get("RUN_BENCHMARKS", "false").lower() in ["true"]
+BENCHMARK_TOPICS = int(os.environ.get("BENCHMARK_TOPICS", 5))
+BENCHMARK_ARTICLES_PER_TOPIC = int(os.environ.get("BENCHMARK_ARTICLES_PER_TOPIC", 100))
+BENCHMARK_DAYS = int(os.environ.get("BENCHMARK_DAYS", 10))
+BENCHMARK_USERS = int(os.environ.get("BENCHMARK_USERS", 20))
+BENCHMARK_SUBSCRIPTIONS = int(os.environ.get("BENCHMARK_SUBSCRIPTIONS", 3))
+BENCHMARK_SUMMARY_CHARS = int(os.environ.get("BENCHMARK_SUMMARY_CHARS", 1500))
+BENCHMARK_BACKEND_LATENCY_MS = float(os.environ.get("BENCHMARK_BACKEND_LATENCY_MS", 0))
+BENCHMARK_ROUNDS = int(os.environ.get("BENCHMARK_ROUNDS", 5))
+BENCHMARK_RESULTS_PATH = os.environ.get("BENCHMARK_RESULTS_PATH", "benchmark_results.json")
+
+if not RUN_BENCHMARKS:
+    pytest.skip("set RUN_BENCHMARKS=true to run the benchmarks", allow_module_level=True)
+
+# nothing is sent to CloudWatch and the background index sync and summary prefetches are off so
+# every backend call is made by the handler measured. set them explicitly to benchmark them
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("ARTICLE_INDEX_ENABLED", "false")
+os.environ.setdefault("SUMMARY_PREFETCH_ENABLED", "false")
+os.environ.setdefault("EVENT_LATENCY_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("SUMMARY_URL_SIGNING_KEY", "benchmark")
+
+pytest.importorskip("reflex")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+import botocore.exceptions  # noqa: E402
+from news_aggregator_data_access_layer.constants import (  # noqa: E402
+    ArticleApprovalStatus,
+    SummarizationLength,
+)
+from news_aggregator_data_access_layer.models.dynamodb import (  # noqa: E402
+    NewsTopics,
+    NewsTopicSuggestions,
+    PreviewUsers,
+    SourcedArticles,
+    UserTopicSubscriptions,
+)
+from pynamodb.attributes import Attribute, NumberAttribute, UTCDateTimeAttribute  # noqa: E402
+from pynamodb.exceptions import UpdateError  # noqa: E402
+from pynamodb.expressions.condition import And, Comparison, Exists  # noqa: E402
+from pynamodb.expressions.operand import Path  # noqa: E402
+from pynamodb.models import Model  # noqa: E402
+from reflex.event import Event  # noqa: E402
+from reflex.state import State  # noqa: E402
+
+from the_daily_bite_web_app.states import newspaper as newspaper_states  # noqa: E402
+from the_daily_bite_web_app.states.base import BaseState  # noqa: E402
+from the_daily_bite_web_app.states.login import (  # noqa: E402
+    LoginState,
+    preview_users_cache,
+    unknown_preview_users_cache,
+)
+from the_daily_bite_web_app.states.models import User  # noqa: E402
+from the_daily_bite_web_app.states.news_topics import (  # noqa: E402
+    NewsTopicsState,
+    news_topic_suggestions_buffer,
+)
+from the_daily_bite_web_app.states.newsletter import NewsletterState  # noqa: E402
+from the_daily_bite_web_app.states.newspaper import NewspaperState  # noqa: E402
+from the_daily_bite_web_app.utils import dynamodb as dynamodb_utils  # noqa: E402
+from the_daily_bite_web_app.utils import summaries as summaries_utils  # noqa: E402
+from the_daily_bite_web_app.utils.sourced_articles import (  # noqa: E402
+    sourced_article_details_cache,
+)
+from the_daily_bite_web_app.utils.topics import topic_catalog, topic_metadata_cache  # noqa: E402
+from the_daily_bite_web_app.utils.write_behind import write_behind_queue  # noqa: E402
+
+pytestmark = pytest.mark.benchmark
+
+# the alert reflex sends when an event handler raises
+HANDLER_ERROR_MESSAGE = "An error occurred. See logs for details."
+
+
+class BackendCalls:
+    """Counts the calls made to the backend stand-ins, from any thread."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, operation: str) -> None:
+        with self._lock:
+            self._counts[operation] += 1
+        if BENCHMARK_BACKEND_LATENCY_MS:
+            time.sleep(BENCHMARK_BACKEND_LATENCY_MS / 1000)
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self._counts)
+
+
+def _key_attributes(model: Type[Model]) -> Tuple[Attribute, Optional[Attribute]]:
+    hash_key_attribute, range_key_attribute = None, None
+    for attribute in model.get_attributes().values():
+        if attribute.is_hash_key:
+            hash_key_attribute = attribute
+        elif attribute.is_range_key:
+            range_key_attribute = attribute
+    return hash_key_attribute, range_key_attribute  # type: ignore
+
+
+def _serialize_value(attribute: Attribute, value: Any) -> Dict[str, Any]:
+    return {attribute.attr_type: attribute.serialize(value)}
+
+
+def _sort_value(serialized_value: Dict[str, Any]) -> Any:
+    # dynamodb sorts numbers numerically and strings and binaries by their bytes
+    ((attr_type, value),) = serialized_value.items()
+    return float(value) if attr_type == "N" else value
+
+
+def _document_path(attribute: Any) -> List[str]:
+    if isinstance(attribute, Attribute):
+        return [attribute.attr_name]
+    if isinstance(attribute, Path):
+        return attribute.path
+    return attribute.split(".")
+
+
+def _project(serialized_item: Dict[str, Any], attributes_to_get: Optional[List[Any]]):
+    """Applies a projection of top level attributes and list elements, like dynamodb does."""
+    if not attributes_to_get:
+        return dict(serialized_item)
+    projected: Dict[str, Any] = dict()
+    list_indexes: Dict[str, List[int]] = defaultdict(list)
+    for attribute in attributes_to_get:
+        name, *indexes = re.split(r"[\[\]]+", _document_path(attribute)[0].rstrip("]"))
+        if name not in serialized_item:
+            continue
+        if indexes:
+            list_indexes[name].append(int(indexes[0]))
+        else:
+            projected[name] = serialized_item[name]
+    for name, indexes in list_indexes.items():
+        if name in projected:
+            continue
+        elements = serialized_item[name]["L"]
+        selected = [elements[idx] for idx in sorted(set(indexes)) if idx < len(elements)]
+        if selected:
+            projected[name] = {"L": selected}
+    return projected
+
+
+def _matches(condition: Any, serialized_item: Dict[str, Any]) -> bool:
+    """Evaluates the conditions the app uses (equality, existence and conjunctions) on an item."""
+    if condition is None:
+        return True
+    if isinstance(condition, And):
+        return all(_matches(value, serialized_item) for value in condition.values)
+    if isinstance(condition, Exists):
+        return condition.values[0].path[0] in serialized_item
+    if isinstance(condition, Comparison) and condition.operator == "=":
+        path, value = condition.values
+        return serialized_item.get(path.path[0]) == value.value
+    raise NotImplementedError(f"Condition not supported by the in-memory table: {condition}")
+
+
+class _QueryResults:
+    """The result iterator of a query, with the last evaluated key of the items read so far."""
+
+    def __init__(self, model: Type[Model], items: List[Dict[str, Any]]):
+        self._model = model
+        self._items = items
+        self._index = 0
+
+    def __iter__(self) -> Iterator[Model]:
+        while self._index < len(self._items):
+            self._index += 1
+            yield self._model.from_raw_data(self._items[self._index - 1])
+
+    @property
+    def last_evaluated_key(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if self._index == 0 or self._index >= len(self._items):
+            return None
+        hash_key_attribute, range_key_attribute = _key_attributes(self._model)
+        item = self._items[self._index - 1]
+        return {
+            attribute.attr_name: item[attribute.attr_name]
+            for attribute in (hash_key_attribute, range_key_attribute)
+            if attribute is not None
+        }
+
+
+class InMemoryTable:
+    """
+    An in-memory stand-in for the DynamoDB table of a model.
+
+    Items are kept serialized and deserialized on every read so the cost of converting items is
+    measured as it would be against DynamoDB. Only what the app uses is supported.
+    """
+
+    def __init__(self, model: Type[Model], backend_calls: BackendCalls):
+        self.model = model
+        self.backend_calls = backend_calls
+        self.hash_key_attribute, self.range_key_attribute = _key_attributes(model)
+        # <serialized hash key>: <serialized range key>: <serialized item>
+        self._partitions: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self._lock = threading.RLock()
+
+    def _key(self, serialized_item: Dict[str, Any]) -> Tuple[str, str]:
+        range_key = (
+            json.dumps(serialized_item[self.range_key_attribute.attr_name])
+            if self.range_key_attribute is not None
+            else ""
+        )
+        return json.dumps(serialized_item[self.hash_key_attribute.attr_name]), range_key
+
+    def _serialized_key(self, hash_key: Any, range_key: Any = None) -> Dict[str, Any]:
+        serialized_key = {
+            self.hash_key_attribute.attr_name: _serialize_value(self.hash_key_attribute, hash_key)
+        }
+        if self.range_key_attribute is not None:
+            serialized_key[self.range_key_attribute.attr_name] = _serialize_value(
+                self.range_key_attribute, range_key
+            )
+        return serialized_key
+
+    def put(self, item: Model) -> None:
+        serialized_item = item.serialize(null_check=False)
+        hash_key, range_key = self._key(serialized_item)
+        with self._lock:
+            self._partitions[hash_key][range_key] = serialized_item
+
+    def delete(self, item: Model) -> None:
+        hash_key, range_key = self._key(item.serialize(null_check=False))
+        with self._lock:
+            self._partitions[hash_key].pop(range_key, None)
+
+    def find(self, serialized_key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        hash_key, range_key = self._key(serialized_key)
+        with self._lock:
+            return self._partitions.get(hash_key, dict()).get(range_key)
+
+    def query(
+        self,
+        hash_key: Any,
+        range_key_condition: Any = None,
+        filter_condition: Any = None,
+        scan_index_forward: Optional[bool] = None,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        attributes_to_get: Optional[List[Any]] = None,
+        **kwargs: Any,
+    ) -> _QueryResults:
+        self.backend_calls.record(f"{self.model.__name__}.Query")
+        partition_key = json.dumps(_serialize_value(self.hash_key_attribute, hash_key))
+        with self._lock:
+            items = list(self._partitions.get(partition_key, dict()).values())
+        if self.range_key_attribute is not None:
+            range_key_name = self.range_key_attribute.attr_name
+            items.sort(
+                key=lambda item: _sort_value(item[range_key_name]),
+                reverse=scan_index_forward is False,
+            )
+            if last_evaluated_key:
+                # the query resumes right after the last evaluated key, in the order of the query
+                start = _sort_value(last_evaluated_key[range_key_name])
+                items = [
+                    item
+                    for item in items
+                    if (
+                        _sort_value(item[range_key_name]) < start
+                        if scan_index_forward is False
+                        else _sort_value(item[range_key_name]) > start
+                    )
+                ]
+        items = [
+            _project(item, attributes_to_get)
+            for item in items
+            if _matches(range_key_condition, item) and _matches(filter_condition, item)
+        ]
+        return _QueryResults(self.model, items)
+
+    def scan(self, filter_condition: Any = None, **kwargs: Any) -> Iterator[Model]:
+        self.backend_calls.record(f"{self.model.__name__}.Scan")
+        with self._lock:
+            items = [item for partition in self._partitions.values() for item in partition.values()]
+        return iter(
+            [self.model.from_raw_data(item) for item in items if _matches(filter_condition, item)]
+        )
+
+    def get(
+        self,
+        hash_key: Any,
+        range_key: Any = None,
+        attributes_to_get: Optional[List[Any]] = None,
+        **kwargs: Any,
+    ) -> Model:
+        self.backend_calls.record(f"{self.model.__name__}.GetItem")
+        item = self.find(self._serialized_key(hash_key, range_key))
+        if item is None:
+            raise self.model.DoesNotExist()
+        return self.model.from_raw_data(_project(item, attributes_to_get))
+
+    def batch_get(
+        self, keys: Any, attributes_to_get: Optional[List[Any]] = None, **kwargs: Any
+    ) -> Iterator[Model]:
+        keys = list(keys)
+        # a BatchGetItem request reads up to 100 keys
+        for _ in range(0, len(keys), 100):
+            self.backend_calls.record(f"{self.model.__name__}.BatchGetItem")
+        for key in keys:
+            hash_key, range_key = key if isinstance(key, (list, tuple)) else (key, None)
+            item = self.find(self._serialized_key(hash_key, range_key))
+            if item is not None:
+                yield self.model.from_raw_data(_project(item, attributes_to_get))
+
+    def update(self, item: Model, actions: List[Any], condition: Any = None, **kwargs: Any) -> None:
+        self.backend_calls.record(f"{self.model.__name__}.UpdateItem")
+        serialized_key = item.serialize(null_check=False)
+        with self._lock:
+            existing_item = self.find(serialized_key)
+            if not _matches(condition, existing_item or dict()):
+                raise UpdateError(
+                    cause=botocore.exceptions.ClientError(
+                        {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}},
+                        "UpdateItem",
+                    )
+                )
+            stored_item = dict(existing_item or self._project_key(serialized_key))
+            for action in actions:
+                if action.format_string != "{0} = {1}":
+                    raise NotImplementedError(
+                        f"Action not supported by the in-memory table: {action}"
+                    )
+                path, value = action.values
+                stored_item[path.path[0]] = value.value
+            hash_key, range_key = self._key(stored_item)
+            self._partitions[hash_key][range_key] = stored_item
+
+    def _project_key(self, serialized_item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            attribute.attr_name: serialized_item[attribute.attr_name]
+            for attribute in (self.hash_key_attribute, self.range_key_attribute)
+            if attribute is not None
+        }
+
+    def install(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Serve the reads and writes of the model from this table."""
+        table = self
+        monkeypatch.setattr(
+            self.model,
+            "query",
+            classmethod(lambda cls, *args, **kwargs: table.query(*args, **kwargs)),
+        )
+        monkeypatch.setattr(
+            self.model,
+            "scan",
+            classmethod(lambda cls, *args, **kwargs: table.scan(*args, **kwargs)),
+        )
+        monkeypatch.setattr(
+            self.model, "get", classmethod(lambda cls, *args, **kwargs: table.get(*args, **kwargs))
+        )
+        monkeypatch.setattr(
+            self.model,
+            "batch_get",
+            classmethod(lambda cls, *args, **kwargs: table.batch_get(*args, **kwargs)),
+        )
+        monkeypatch.setattr(
+            self.model, "update", lambda item, *args, **kwargs: table.update(item, *args, **kwargs)
+        )
+
+
+class InMemoryBatchWrite:
+    """A stand-in for pynamodb's BatchWrite writing to the in-memory tables."""
+
+    tables: Dict[Type[Model], InMemoryTable] = dict()
+
+    def __init__(self, model: Type[Model], auto_commit: bool = True):
+        self.table = self.tables[model]
+        self.pending_operations: List[Tuple[str, Model]] = []
+        self.failed_operations: List[Any] = []
+
+    def save(self, item: Model) -> None:
+        self.pending_operations.append(("save", item))
+
+    def delete(self, item: Model) -> None:
+        self.pending_operations.append(("delete", item))
+
+    def commit(self) -> None:
+        if not self.pending_operations:
+            return
+        self.table.backend_calls.record(f"{self.table.model.__name__}.BatchWriteItem")
+        for action, item in self.pending_operations:
+            if action == "save":
+                self.table.put(item)
+            else:
+                self.table.delete(item)
+        self.pending_operations = []
+
+
+class InMemoryBucket:
+    """An in-memory stand-in for the S3 bucket of the article summaries."""
+
+    def __init__(self, backend_calls: BackendCalls):
+        self.backend_calls = backend_calls
+        self.objects: Dict[str, str] = dict()
+
+    def get_object(self, bucket: str, key: str) -> Tuple[str, Dict[str, Any]]:
+        self.backend_calls.record("S3.GetObject")
+        return self.objects[key], dict()
+
+
+def _fill_missing_key_attributes(item: Model, dt: datetime, unique_id: str) -> Model:
+    # the keys the app doesn't set itself get values sorting the items by time
+    for name, attribute in type(item).get_attributes().items():
+        if (attribute.is_hash_key or attribute.is_range_key) and getattr(item, name) is None:
+            if isinstance(attribute, UTCDateTimeAttribute):
+                setattr(item, name, dt)
+            elif isinstance(attribute, NumberAttribute):
+                setattr(item, name, dt.timestamp())
+            else:
+                setattr(item, name, f"{dt.isoformat()}#{unique_id}")
+    return item
+
+
+class Dataset(NamedTuple):
+    topic_ids: List[str]
+    user_ids: List[str]
+    tables: Dict[Type[Model], InMemoryTable]
+    bucket: InMemoryBucket
+
+
+def build_dataset(backend_calls: BackendCalls) -> Dataset:
+    """Builds the topics, articles, summaries, users and subscriptions benchmarked against."""
+    tables = {
+        model: InMemoryTable(model, backend_calls)
+        for model in (
+            NewsTopics,
+            SourcedArticles,
+            UserTopicSubscriptions,
+            PreviewUsers,
+            NewsTopicSuggestions,
+        )
+    }
+    bucket = InMemoryBucket(backend_calls)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    not_approved_status = next(
+        status for status in ArticleApprovalStatus if status != ArticleApprovalStatus.APPROVED
+    )
+    topic_ids = [f"benchmark-topic-{idx}" for idx in range(BENCHMARK_TOPICS)]
+    for topic_idx, topic_id in enumerate(topic_ids):
+        tables[NewsTopics].put(
+            _fill_missing_key_attributes(
+                NewsTopics(
+                    topic_id=topic_id,
+                    topic=f"Benchmark topic {topic_idx}",
+                    is_published=True,
+                    last_publishing_date=now,
+                ),
+                now,
+                topic_id,
+            )
+        )
+        for article_idx in range(BENCHMARK_ARTICLES_PER_TOPIC):
+            dt_published = now - timedelta(
+                days=BENCHMARK_DAYS * article_idx / max(BENCHMARK_ARTICLES_PER_TOPIC, 1)
+            )
+            article_id = f"{topic_id}-article-{article_idx}"
+            summary_refs = {
+                length: f"{topic_id}/{article_id}/{length}_summary.txt"
+                for length in ("short", "medium", "full")
+            }
+            for multiplier, summary_ref in zip((1, 2, 4), summary_refs.values()):
+                bucket.objects[summary_ref] = "Lorem ipsum dolor sit amet.\n" * (
+                    BENCHMARK_SUMMARY_CHARS * multiplier // 28
+                )
+            tables[SourcedArticles].put(
+                _fill_missing_key_attributes(
+                    SourcedArticles(
+                        topic_id=topic_id,
+                        sourced_article_id=article_id,
+                        title=f"Benchmark article {article_idx} of topic {topic_idx}",
+                        source_article_urls=[
+                            f"https://example.com/{article_id}/{idx}" for idx in range(3)
+                        ],
+                        providers=[f"Provider {idx}" for idx in range(3)],
+                        date_published=dt_published.strftime("%Y/%m/%d"),
+                        dt_published=dt_published,
+                        short_summary_ref=summary_refs["short"],
+                        medium_summary_ref=summary_refs["medium"],
+                        full_summary_ref=summary_refs["full"],
+                        # one article in ten is filtered out by the approval status
+                        article_approval_status=not_approved_status
+                        if article_idx % 10 == 9
+                        else ArticleApprovalStatus.APPROVED,
+                    ),
+                    dt_published,
+                    article_id,
+                )
+            )
+    user_ids = [f"benchmark-user-{idx}" for idx in range(BENCHMARK_USERS)]
+    for user_idx, user_id in enumerate(user_ids):
+        tables[PreviewUsers].put(
+            _fill_missing_key_attributes(
+                PreviewUsers(user_id=user_id, name=f"Benchmark user {user_idx}"), now, user_id
+            )
+        )
+        for topic_id in topic_ids[:BENCHMARK_SUBSCRIPTIONS]:
+            tables[UserTopicSubscriptions].put(
+                UserTopicSubscriptions(user_id, topic_id, date_subscribed=now)
+            )
+    return Dataset(topic_ids, user_ids, tables, bucket)
+
+
+def clear_shared_caches() -> None:
+    """Clears the caches shared between sessions so the next session starts cold."""
+    for cache in (
+        newspaper_states.article_pages_cache,
+        summaries_utils.summary_texts_cache,
+        sourced_article_details_cache,
+        topic_metadata_cache,
+        preview_users_cache,
+        unknown_preview_users_cache,
+    ):
+        cache.clear()
+    newspaper_states.published_date_label.cache_clear()
+    # read again on the next use
+    topic_catalog._published_topics = None
+
+
+class Step(NamedTuple):
+    """An event sent by the benchmarked client."""
+
+    state: Type[State]
+    handler: str
+    # called with the state the event is sent to, to build the event payload
+    payload: Callable[[State], Dict[str, Any]] = lambda state: dict()
+
+
+class StepResult(NamedTuple):
+    handler: str
+    wall_ms: float
+    delta_bytes: int
+    backend_calls: Counter
+    alloc_peak_bytes: Optional[int]
+    alloc_retained_bytes: Optional[int]
+
+
+def run_session(
+    root_state_cls: Type[State],
+    steps: List[Step],
+    user_id: Optional[str],
+    session_idx: int,
+    backend_calls: BackendCalls,
+    trace_allocations: bool,
+) -> List[StepResult]:
+    """
+    Runs the steps of a client session, along with the events chained by the handlers.
+
+    :param root_state_cls: The root state of the app.
+    :param steps: The events sent by the client.
+    :param user_id: The id of the logged in user. None when logged out.
+    :param session_idx: A unique index of the session, used for its token and client ip.
+    :param backend_calls: The backend calls counter.
+    :param trace_allocations: Whether to measure the allocations of each handler.
+    :return: The measurements of each handler run, in order.
+    """
+    root_state = root_state_cls()
+    token = f"benchmark-token-{session_idx}"
+    root_state.router_data = {
+        "token": token,
+        "ip": f"10.0.{session_idx // 256 % 256}.{session_idx % 256}",
+    }
+    if user_id is not None:
+        base_state = root_state.get_substate(BaseState.get_full_name().split("."))
+        base_state.user = User(user_id=user_id, name=user_id)
+    results: List[StepResult] = []
+
+    async def process(event: Event) -> None:
+        state = root_state.get_substate(event.name.split(".")[:-1])
+        handler = event.name.split(".")[-1]
+        calls_before = backend_calls.snapshot()
+        if trace_allocations:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        chained_events: List[Event] = []
+        delta_bytes = 0
+        start = time.perf_counter()
+        async for update in root_state._process(event):
+            delta_bytes += len(update.json())
+            for chained_event in update.events:
+                assert HANDLER_ERROR_MESSAGE not in json.dumps(
+                    chained_event.payload
+                ), f"{event.name} raised"
+                # events of the states are sent back by the client; the others run in the browser
+                if chained_event.name.startswith(f"{root_state.get_name()}."):
+                    chained_events.append(chained_event)
+        wall_ms = (time.perf_counter() - start) * 1000
+        alloc_peak_bytes, alloc_retained_bytes = None, None
+        if trace_allocations:
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+            alloc_peak_bytes = memory_peak - memory_before
+            alloc_retained_bytes = memory_after - memory_before
+        # the writes deferred by the handler are flushed so they are counted with it
+        write_behind_queue.flush()
+        news_topic_suggestions_buffer.flush()
+        results.append(
+            StepResult(
+                handler=f"{type(state).__name__}.{handler}",
+                wall_ms=wall_ms,
+                delta_bytes=delta_bytes,
+                backend_calls=backend_calls.snapshot() - calls_before,
+                alloc_peak_bytes=alloc_peak_bytes,
+                alloc_retained_bytes=alloc_retained_bytes,
+            )
+        )
+        for chained_event in chained_events:
+            await process(chained_event)
+
+    async def run_steps() -> None:
+        for step in steps:
+            state = root_state.get_substate(step.state.get_full_name().split("."))
+            await process(
+                Event(
+                    token=token,
+                    name=f"{step.state.get_full_name()}.{step.handler}",
+                    payload=step.payload(state),
+                )
+            )
+
+    asyncio.run(run_steps())
+    return results
+
+
+def _first_article(state: NewspaperState) -> Dict[str, Any]:
+    topic_id = state.selected_newspaper_topic_id
+    article_id = next(iter(state._newspaper_article_index[topic_id]))
+    return dict(topic_id=topic_id, article_id=article_id)
+
+
+def _first_not_subscribed_topic(state: NewsTopicsState) -> Dict[str, Any]:
+    # users subscribed to every topic unsubscribe from the first one instead
+    news_topic = next(
+        (news_topic for news_topic in state.news_topics if not news_topic.is_user_subscribed),
+        state.news_topics[0],
+    )
+    return dict(news_topic=news_topic.dict())
+
+
+SCENARIOS: Dict[str, Tuple[bool, List[Step]]] = {
+    # <scenario>: (<whether the user is logged in>, <steps>)
+    "login": (
+        False,
+        [
+            Step(LoginState, "set_user_id_field", lambda state: dict(value="benchmark-user-0")),
+            Step(LoginState, "log_in"),
+            Step(LoginState, "set_user_id_field", lambda state: dict(value="unknown-user")),
+            Step(LoginState, "log_in"),
+        ],
+    ),
+    "news_topics": (
+        True,
+        [
+            Step(NewsTopicsState, "on_load"),
+            Step(NewsTopicsState, "toggle_news_topic_selected", _first_not_subscribed_topic),
+            Step(NewsTopicsState, "update_user_news_topic_subscriptions"),
+            Step(
+                NewsTopicsState,
+                "set_news_topic_suggestion",
+                lambda state: dict(value="Benchmark suggestion"),
+            ),
+            Step(NewsTopicsState, "suggest_news_topic"),
+        ],
+    ),
+    "newspaper": (
+        True,
+        [
+            Step(NewspaperState, "on_load_newspaper"),
+            Step(NewspaperState, "load_more_articles"),
+            Step(
+                NewspaperState,
+                "set_show_article_property",
+                lambda state: dict(**_first_article(state), show_article=True),
+            ),
+            Step(NewspaperState, "populate_article_text", _first_article),
+            Step(
+                NewspaperState,
+                "set_show_length_property",
+                lambda state: dict(
+                    **_first_article(state), show_length=SummarizationLength.FULL.value
+                ),
+            ),
+            Step(NewspaperState, "populate_article_text", _first_article),
+            Step(NewspaperState, "newspaper_topic_selected", lambda state: dict(idx=1)),
+            Step(NewspaperState, "refresh_selected_topic_newspaper_articles"),
+        ],
+    ),
+    "newsletter": (
+        True,
+        [
+            Step(NewsletterState, "set_email", lambda state: dict(value="benchmark@example.com")),
+            Step(NewsletterState, "newsletter_interest_signup"),
+        ],
+    ),
+}
+
+
+def _summarize(results: List[StepResult]) -> Dict[str, Any]:
+    wall_ms = [result.wall_ms for result in results]
+    backend_calls: Counter = sum((result.backend_calls for result in results), Counter())
+    return {
+        "runs": len(results),
+        "wall_ms": {
+            "min": min(wall_ms),
+            "median": statistics.median(wall_ms),
+            "mean": statistics.mean(wall_ms),
+            "max": max(wall_ms),
+        },
+        "delta_bytes": statistics.median(result.delta_bytes for result in results),
+        "backend_calls": {
+            operation: count / len(results) for operation, count in sorted(backend_calls.items())
+        },
+    }
+
+
+@pytest.fixture(scope="module")
+def benchmark_results():
+    results: List[Dict[str, Any]] = []
+    yield results
+    with open(BENCHMARK_RESULTS_PATH, "w") as f:
+        json.dump(
+            {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "dataset": {
+                    "topics": BENCHMARK_TOPICS,
+                    "articles_per_topic": BENCHMARK_ARTICLES_PER_TOPIC,
+                    "days": BENCHMARK_DAYS,
+                    "users": BENCHMARK_USERS,
+                    "subscriptions": BENCHMARK_SUBSCRIPTIONS,
+                    "summary_chars": BENCHMARK_SUMMARY_CHARS,
+                    "backend_latency_ms": BENCHMARK_BACKEND_LATENCY_MS,
+                },
+                "rounds": BENCHMARK_ROUNDS,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+
+@pytest.fixture(scope="module")
+def backend(benchmark_results):
+    monkeypatch = pytest.MonkeyPatch()
+    backend_calls = BackendCalls()
+    dataset = build_dataset(backend_calls)
+    for table in dataset.tables.values():
+        table.install(monkeypatch)
+    monkeypatch.setattr(InMemoryBatchWrite, "tables", dataset.tables)
+    monkeypatch.setattr(dynamodb_utils, "BatchWrite", InMemoryBatchWrite)
+    monkeypatch.setattr(summaries_utils, "get_object", dataset.bucket.get_object)
+    yield dataset, backend_calls
+    monkeypatch.undo()
+    clear_shared_caches()
+
+
+@pytest.mark.parametrize("mode", ["cold", "warm"])
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+def test_state_handlers(scenario: str, mode: str, backend, benchmark_results):
+    dataset, backend_calls = backend
+    logged_in, steps = SCENARIOS[scenario]
+    session_ids = iter(range(1_000_000))
+
+    def run(trace_allocations: bool) -> List[StepResult]:
+        session_idx = next(session_ids)
+        if mode == "cold":
+            clear_shared_caches()
+        user_id = dataset.user_ids[session_idx % len(dataset.user_ids)] if logged_in else None
+        return run_session(
+            State, steps, user_id, session_idx, backend_calls, trace_allocations=trace_allocations
+        )
+
+    if mode == "warm":
+        run(trace_allocations=False)
+    # the timed runs are not traced since tracing allocations slows everything down
+    timed_runs = [run(trace_allocations=False) for _ in range(BENCHMARK_ROUNDS)]
+    tracemalloc.start()
+    try:
+        traced_run = run(trace_allocations=True)
+    finally:
+        tracemalloc.stop()
+    for step_idx, traced_result in enumerate(traced_run):
+        step_results = [timed_run[step_idx] for timed_run in timed_runs]
+        assert all(result.handler == traced_result.handler for result in step_results)
+        benchmark_results.append(
+            {
+                "scenario": scenario,
+                "mode": mode,
+                "step": step_idx,
+                "handler": traced_result.handler,
+                **_summarize(step_results),
+                "alloc_peak_bytes": traced_result.alloc_peak_bytes,
+                "alloc_retained_bytes": traced_result.alloc_retained_bytes,
+            }
+        )
@@ -0,0 +1,201 @@
+"""Tests of the shared LRU cache: expiry, eviction, byte budget, loading and statistics."""
+
+from typing import Any, Dict, List, Tuple
+
+import os
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("CACHE_STATS_PUBLISH_INTERVAL_SECS", "0")
+
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from the_daily_bite_web_app.utils import cache as cache_module  # noqa: E402
+from the_daily_bite_web_app.utils.cache import (  # noqa: E402
+    LRUCache,
+    cache_stats,
+    publish_cache_stats,
+)
+
+
+class Clock:
+    """Stand-in for time.monotonic, moved forward by the tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordedMetrics:
+    """Stand-in for the metrics aggregator recording the metrics published."""
+
+    def __init__(self):
+        self.records: List[Tuple[str, Any, Dict[str, str]]] = []
+
+    def increment(self, name: str, value: Any = 1, dimensions: Dict[str, str] = {}) -> None:
+        self.records.append((name, value, dict(dimensions)))
+
+    def record(
+        self, name: str, value: Any, dimensions: Dict[str, str] = {}, unit: str = ""
+    ) -> None:
+        self.records.append((name, value, dict(dimensions)))
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = LRUCache("test", ttl_seconds=60)
+    cache.set("key", "value")
+
+    clock.now += 59
+    assert cache.get("key") == "value"
+    clock.now += 1
+    assert cache.get("key") is None
+    assert "key" not in cache
+    assert len(cache) == 0
+
+
+def test_setting_an_entry_again_restarts_its_ttl(clock):
+    cache = LRUCache("test", ttl_seconds=60)
+    cache.set("key", "old")
+    clock.now += 50
+    cache.set("key", "new")
+    clock.now += 50
+
+    assert cache.get("key") == "new"
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = LRUCache("test", max_entries=3)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+    # reading "a" makes "b" the least recently used
+    cache.get("a")
+
+    cache.set("d", "d")
+
+    assert [key for key in ["a", "b", "c", "d"] if key in cache] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_are_evicted_to_stay_within_the_byte_budget():
+    cache = LRUCache("test", max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+
+    cache.set("c", "xxxx")
+
+    assert "a" not in cache
+    assert cache.get("b") == "xxxx"
+    assert cache.get("c") == "xxxx"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_replacing_an_entry_updates_the_bytes_held():
+    cache = LRUCache("test", max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("a", "xx")
+    cache.invalidate("missing")
+
+    assert cache.stats()["bytes"] == 2
+    cache.invalidate("a")
+    assert cache.stats()["bytes"] == 0
+
+
+def test_values_over_the_byte_budget_are_not_cached():
+    cache = LRUCache("test", max_bytes=10, sizeof=len)
+    cache.set("small", "xxxx")
+
+    cache.set("large", "x" * 11)
+
+    assert "large" not in cache
+    assert cache.get("small") == "xxxx"
+
+
+def test_get_or_load_loads_on_a_miss_only():
+    cache = LRUCache("test", max_entries=10)
+    loads = []
+
+    def loader():
+        loads.append("key")
+        return "value"
+
+    assert cache.get_or_load("key", loader) == "value"
+    assert cache.get_or_load("key", loader) == "value"
+    assert loads == ["key"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_get_or_load_does_not_cache_when_the_loader_raises():
+    cache = LRUCache("test", max_entries=10)
+
+    def loader():
+        raise RuntimeError("load failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("key", loader)
+    assert "key" not in cache
+
+
+def test_stats_count_the_lookups_recorded():
+    cache = LRUCache("test", max_entries=10)
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("missing")
+    cache.get("missing", record_stats=False)
+    "key" in cache
+
+    stats = cache.stats()
+
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+    assert stats["entries"] == 1
+
+
+def test_publish_cache_stats_publishes_the_counts_since_the_last_publishing(monkeypatch):
+    recorded_metrics = RecordedMetrics()
+    monkeypatch.setattr(cache_module, "metrics", recorded_metrics)
+    cache = LRUCache("published", max_entries=1)
+    cache.set("a", "a")
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+
+    publish_cache_stats()
+    published = [
+        record for record in recorded_metrics.records if record[2] == {"Cache": "published"}
+    ]
+    assert published == [
+        ("CacheHit", 2, {"Cache": "published"}),
+        ("CacheMiss", 1, {"Cache": "published"}),
+        ("CacheEntries", 1, {"Cache": "published"}),
+    ]
+
+    recorded_metrics.records = []
+    cache.set("b", "b")
+    cache.get("a")
+
+    publish_cache_stats()
+    published = [
+        record for record in recorded_metrics.records if record[2] == {"Cache": "published"}
+    ]
+    assert published == [
+        ("CacheMiss", 1, {"Cache": "published"}),
+        ("CacheEviction", 1, {"Cache": "published"}),
+        ("CacheEntries", 1, {"Cache": "published"}),
+    ]
+
+
+def test_cache_stats_includes_every_cache():
+    cache = LRUCache("listed", max_entries=1)
+
+    assert cache.stats() in cache_stats()
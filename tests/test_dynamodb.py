@@ -0,0 +1,134 @@
+"""Tests of the DynamoDB batch writes against a stand-in for pynamodb's BatchWrite."""
+
+from typing import Dict, List, Set, Tuple
+
+import os
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+pytest.importorskip("pynamodb")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from pynamodb.attributes import UnicodeAttribute  # noqa: E402
+from pynamodb.exceptions import PutError  # noqa: E402
+from pynamodb.models import Model  # noqa: E402
+
+from the_daily_bite_web_app.utils import dynamodb  # noqa: E402
+from the_daily_bite_web_app.utils.dynamodb import BATCH_WRITE_MAX_ITEMS, batch_write  # noqa: E402
+
+
+class Subscription(Model):
+    class Meta:
+        table_name = "test-subscriptions"
+        region = "us-east-1"
+
+    user_id = UnicodeAttribute(hash_key=True)
+    topic_id = UnicodeAttribute(range_key=True)
+    date_subscribed = UnicodeAttribute(null=True)
+
+
+class StandInBatchWrites:
+    """Records the batches written, reporting the operations on the topics listed as unprocessed."""
+
+    def __init__(self):
+        self.batches: List[List[Tuple[str, str]]] = []
+        self.unprocessed_topic_ids: Set[str] = set()
+        self.error: Exception = None
+
+    def __call__(self, model, auto_commit=True):
+        return StandInBatchWrite(self)
+
+
+class StandInBatchWrite:
+    def __init__(self, batch_writes: StandInBatchWrites):
+        self.batch_writes = batch_writes
+        self.operations: List[Tuple[str, Subscription]] = []
+        self.failed_operations: List[Dict] = []
+
+    def save(self, item: Subscription) -> None:
+        self.operations.append(("save", item))
+
+    def delete(self, item: Subscription) -> None:
+        self.operations.append(("delete", item))
+
+    def commit(self) -> None:
+        self.batch_writes.batches.append(
+            [(action, item.topic_id) for action, item in self.operations]
+        )
+        if self.batch_writes.error is not None:
+            raise self.batch_writes.error
+        for action, item in self.operations:
+            if item.topic_id not in self.batch_writes.unprocessed_topic_ids:
+                continue
+            serialized_item = item.serialize()
+            if action == "save":
+                self.failed_operations.append({"PutRequest": {"Item": serialized_item}})
+            else:
+                key = {name: serialized_item[name] for name in ["user_id", "topic_id"]}
+                self.failed_operations.append({"DeleteRequest": {"Key": key}})
+        if self.failed_operations:
+            raise PutError("Failed to batch write items: max_retry_attempts exceeded")
+
+
+@pytest.fixture
+def batch_writes(monkeypatch) -> StandInBatchWrites:
+    batch_writes = StandInBatchWrites()
+    monkeypatch.setattr(dynamodb, "BatchWrite", batch_writes)
+    return batch_writes
+
+
+def subscriptions(topic_ids: List[str]) -> List[Subscription]:
+    return [Subscription("user", topic_id, date_subscribed="2023-07-01") for topic_id in topic_ids]
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_batch_write_writes_in_batches_of_25(batch_writes, concurrent):
+    topic_ids = [f"topic-{idx:02d}" for idx in range(60)]
+
+    result = batch_write(
+        Subscription,
+        subscriptions(topic_ids[:40]),
+        subscriptions(topic_ids[40:]),
+        concurrent=concurrent,
+    )
+
+    assert [len(batch) for batch in batch_writes.batches] == [BATCH_WRITE_MAX_ITEMS, 25, 10]
+    assert [operation for batch in batch_writes.batches for operation in batch] == [
+        ("save", topic_id) for topic_id in topic_ids[:40]
+    ] + [("delete", topic_id) for topic_id in topic_ids[40:]]
+    assert result.failed_saves == []
+    assert result.failed_deletes == []
+
+
+def test_batch_write_maps_the_unprocessed_operations_back_to_their_items(batch_writes):
+    items_to_save = subscriptions([f"save-{idx:02d}" for idx in range(30)])
+    items_to_delete = subscriptions([f"delete-{idx:02d}" for idx in range(10)])
+    batch_writes.unprocessed_topic_ids = {"save-03", "save-27", "delete-05"}
+
+    result = batch_write(Subscription, items_to_save, items_to_delete)
+
+    assert result.failed_saves == [items_to_save[3], items_to_save[27]]
+    assert result.failed_deletes == [items_to_delete[5]]
+
+
+def test_batch_write_fails_the_whole_batch_when_the_unprocessed_items_are_unknown(batch_writes):
+    items_to_save = subscriptions([f"topic-{idx:02d}" for idx in range(30)])
+    batch_writes.error = PutError("Failed to batch write items")
+
+    result = batch_write(Subscription, items_to_save, [])
+
+    assert result.failed_saves == items_to_save
+    assert result.failed_deletes == []
+
+
+def test_batch_write_fails_the_whole_batch_on_other_errors(batch_writes):
+    items_to_delete = subscriptions(["a", "b"])
+    batch_writes.error = RuntimeError("connection reset")
+
+    result = batch_write(Subscription, [], items_to_delete)
+
+    assert result.failed_saves == []
+    assert result.failed_deletes == items_to_delete
@@ -0,0 +1,93 @@
+"""Tests of the latency histograms' buckets and percentile estimates."""
+
+import os
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from the_daily_bite_web_app.utils.latency import (  # noqa: E402
+    BUCKET_UPPER_BOUNDS_MS,
+    LatencyHistogram,
+    LatencyHistograms,
+)
+
+
+def test_buckets_cover_a_tenth_of_a_millisecond_to_a_hundred_seconds():
+    assert BUCKET_UPPER_BOUNDS_MS[0] == pytest.approx(0.1)
+    assert BUCKET_UPPER_BOUNDS_MS[-1] <= 100_000 < BUCKET_UPPER_BOUNDS_MS[-1] * 1.25
+    for lower_bound, upper_bound in zip(BUCKET_UPPER_BOUNDS_MS, BUCKET_UPPER_BOUNDS_MS[1:]):
+        assert upper_bound == pytest.approx(lower_bound * 1.25)
+
+
+def test_latencies_are_counted_in_the_bucket_of_their_upper_bound():
+    histogram = LatencyHistogram()
+    histogram.record(0.05)
+    histogram.record(BUCKET_UPPER_BOUNDS_MS[0])
+    histogram.record(BUCKET_UPPER_BOUNDS_MS[0] * 1.1)
+    histogram.record(BUCKET_UPPER_BOUNDS_MS[-1] * 2)
+
+    assert histogram._counts[0] == 2
+    assert histogram._counts[1] == 1
+    assert histogram._counts[-1] == 1
+    assert sum(histogram._counts) == histogram.count == 4
+
+
+def test_percentiles_of_an_empty_histogram_are_zero():
+    assert LatencyHistogram().percentile(50) == 0.0
+    assert LatencyHistogram().summary()["mean_ms"] == 0.0
+
+
+@pytest.mark.parametrize("percentile", [50, 90, 95, 99])
+def test_percentiles_are_estimated_within_a_bucket_width(percentile):
+    histogram = LatencyHistogram()
+    for latency_ms in range(1, 1001):
+        histogram.record(latency_ms)
+
+    exact = percentile * 10
+    assert exact / 1.25 <= histogram.percentile(percentile) <= exact * 1.25
+
+
+def test_percentiles_never_exceed_the_maximum_recorded():
+    histogram = LatencyHistogram()
+    for _ in range(10):
+        histogram.record(3.0)
+
+    assert histogram.percentile(50) <= 3.0
+    assert histogram.percentile(100) == 3.0
+    assert histogram.summary()["max_ms"] == 3.0
+
+
+def test_percentiles_over_the_last_bucket_are_the_maximum():
+    histogram = LatencyHistogram()
+    histogram.record(10.0)
+    histogram.record(500_000.0)
+
+    assert histogram.percentile(99) == 500_000.0
+
+
+def test_summary_holds_the_count_mean_and_percentiles():
+    histogram = LatencyHistogram()
+    for latency_ms in [10.0, 20.0, 30.0, 40.0]:
+        histogram.record(latency_ms)
+
+    summary = histogram.summary()
+
+    assert summary["count"] == 4
+    assert summary["mean_ms"] == 25.0
+    assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"] <= summary["max_ms"] == 40.0
+
+
+def test_summaries_are_sorted_slowest_p99_first():
+    histograms = LatencyHistograms("test")
+    histograms.record("fast", 1.0)
+    histograms.record("slow", 100.0)
+    histograms.record("medium", 10.0)
+
+    assert list(histograms.summaries()) == ["slow", "medium", "fast"]
+
+    histograms.reset()
+    assert histograms.summaries() == {}
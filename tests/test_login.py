@@ -0,0 +1,118 @@
+"""Tests of the login's caches of the preview users looked up, against a stand-in for the table."""
+
+from typing import List
+
+import os
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("SUMMARY_URL_SIGNING_KEY", "test")
+
+pytest.importorskip("reflex")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from news_aggregator_data_access_layer.models.dynamodb import PreviewUsers  # noqa: E402
+from reflex.state import State  # noqa: E402
+
+from the_daily_bite_web_app.config import LOGIN_UNKNOWN_USER_CACHE_TTL_SECS  # noqa: E402
+from the_daily_bite_web_app.states import login  # noqa: E402
+from the_daily_bite_web_app.states.login import LoginState  # noqa: E402
+from the_daily_bite_web_app.utils import cache  # noqa: E402
+from the_daily_bite_web_app.utils.cache import LRUCache  # noqa: E402
+from the_daily_bite_web_app.utils.rate_limit import SlidingWindowRateLimiter  # noqa: E402
+
+
+class Clock:
+    """Stand-in for time.monotonic, moved forward by the tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StandInPreviewUsers:
+    """Stand-in for PreviewUsers.get, finding the users listed and recording the lookups."""
+
+    def __init__(self):
+        self.names = {"known": "Reader"}
+        self.lookups: List[str] = []
+
+    def __call__(self, user_id: str) -> PreviewUsers:
+        self.lookups.append(user_id)
+        if user_id not in self.names:
+            raise PreviewUsers.DoesNotExist()
+        return PreviewUsers(user_id, name=self.names[user_id])
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def preview_users(monkeypatch) -> StandInPreviewUsers:
+    preview_users = StandInPreviewUsers()
+    monkeypatch.setattr(login.PreviewUsers, "get", preview_users)
+    # empty caches and no rate limiting, to look up as often as the tests need
+    monkeypatch.setattr(
+        login,
+        "preview_users_cache",
+        LRUCache("preview_users", max_entries=10, ttl_seconds=300),
+    )
+    monkeypatch.setattr(
+        login,
+        "unknown_preview_users_cache",
+        LRUCache(
+            "unknown_preview_users", max_entries=10, ttl_seconds=LOGIN_UNKNOWN_USER_CACHE_TTL_SECS
+        ),
+    )
+    monkeypatch.setattr(
+        login,
+        "login_rate_limiter",
+        SlidingWindowRateLimiter("login", max_attempts=1000, window_seconds=60),
+    )
+    return preview_users
+
+
+def log_in(user_id: str) -> LoginState:
+    login_state = State().get_substate(LoginState.get_full_name().split("."))
+    login_state.user_id_field = user_id
+    login_state.log_in()
+    return login_state
+
+
+def test_unknown_user_ids_are_looked_up_again_once_their_negative_cache_expires(
+    clock, preview_users
+):
+    assert log_in("unknown").user is None
+    clock.now += LOGIN_UNKNOWN_USER_CACHE_TTL_SECS - 1
+    assert log_in("unknown").user is None
+    assert preview_users.lookups == ["unknown"]
+
+    clock.now += 1
+    assert log_in("unknown").user is None
+    assert preview_users.lookups == ["unknown", "unknown"]
+
+
+def test_a_user_id_added_after_a_failed_login_logs_in_once_the_negative_cache_expires(
+    clock, preview_users
+):
+    log_in("new")
+    preview_users.names["new"] = "New reader"
+
+    assert log_in("new").user is None
+    clock.now += LOGIN_UNKNOWN_USER_CACHE_TTL_SECS
+    assert log_in("new").user.name == "New reader"
+
+
+def test_known_users_are_looked_up_once(clock, preview_users):
+    assert log_in("known").user.name == "Reader"
+    assert log_in("known").user.name == "Reader"
+
+    assert preview_users.lookups == ["known"]
@@ -0,0 +1,102 @@
+"""Tests of the order of the app middleware and of the token required by the debug routes."""
+
+from typing import Dict
+
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+pytest.importorskip("reflex")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+import reflex as rx  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+from reflex.event import Event  # noqa: E402
+from reflex.state import State, StateUpdate  # noqa: E402
+
+from the_daily_bite_web_app import middleware  # noqa: E402
+from the_daily_bite_web_app.middleware import (  # noqa: E402
+    add_app_middleware,
+    caches,
+    event_delta_sizes,
+    event_latency_histograms,
+)
+from the_daily_bite_web_app.states import NewspaperState  # noqa: E402
+
+
+class StandInRequest:
+    """Stand-in for a fastapi request coming from a local address, as behind a proxy."""
+
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+        self.client = ("127.0.0.1", 50000)
+
+
+@pytest.fixture
+def app(monkeypatch) -> rx.App:
+    monkeypatch.setattr(middleware, "EVENT_LATENCY_ENABLED", True)
+    monkeypatch.setattr(middleware, "STATE_SIZE_ENABLED", True)
+    event_delta_sizes.reset()
+    event_latency_histograms.reset()
+    app = rx.App()
+    add_app_middleware(app)
+    return app
+
+
+def test_every_middleware_observes_the_updates_postprocessed_by_the_app(app):
+    state = State()
+    event = Event(
+        token="token",
+        name=f"{NewspaperState.get_full_name()}.load_more_articles",
+        payload={},
+    )
+    update = StateUpdate(
+        delta={NewspaperState.get_full_name(): {"is_loading_more_articles": False}}, final=True
+    )
+
+    assert asyncio.run(app.preprocess(state, event)) is None
+    assert asyncio.run(app.postprocess(state, event, update)) is update
+
+    assert event_delta_sizes.summaries()[event.name]["count"] == 1
+    assert event_latency_histograms.summaries()[event.name]["count"] == 1
+
+
+def test_the_middleware_observing_the_updates_are_added_first(app):
+    assert [type(app_middleware).__name__ for app_middleware in app.middleware] == [
+        "EventLatencyMiddleware",
+        "StateSizeMiddleware",
+        "CloseSidebarMiddleware",
+        "HydrateMiddleware",
+    ]
+
+
+def get_caches(headers: Dict[str, str]):
+    return asyncio.run(caches(StandInRequest(headers)))
+
+
+def test_debug_routes_are_served_with_the_token(monkeypatch):
+    monkeypatch.setattr(middleware, "DEBUG_ROUTES_TOKEN", "secret")
+
+    assert isinstance(get_caches({"authorization": "Bearer secret"}), list)
+
+
+@pytest.mark.parametrize(
+    "headers", [{}, {"authorization": "Bearer wrong"}, {"authorization": "secret"}]
+)
+def test_debug_routes_are_refused_to_local_requests_without_the_token(monkeypatch, headers):
+    monkeypatch.setattr(middleware, "DEBUG_ROUTES_TOKEN", "secret")
+
+    with pytest.raises(HTTPException) as e:
+        get_caches(headers)
+    assert e.value.status_code == 403
+
+
+def test_debug_routes_are_refused_when_no_token_is_set(monkeypatch):
+    monkeypatch.setattr(middleware, "DEBUG_ROUTES_TOKEN", "")
+
+    with pytest.raises(HTTPException):
+        get_caches({"authorization": "Bearer "})
@@ -0,0 +1,335 @@
+"""Tests of the newspaper's loading and warm-up of article pages, against stand-ins for the DynamoDB queries."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("SUMMARY_URL_SIGNING_KEY", "test")
+
+pytest.importorskip("reflex")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from reflex.state import State  # noqa: E402
+
+from the_daily_bite_web_app.config import ARTICLES_PER_PAGE  # noqa: E402
+from the_daily_bite_web_app.exceptions import StaleArticlesCursorException  # noqa: E402
+from the_daily_bite_web_app.states import newspaper  # noqa: E402
+from the_daily_bite_web_app.states.models import NewsArticle, NewspaperTopic  # noqa: E402
+from the_daily_bite_web_app.states.newspaper import (  # noqa: E402
+    ArticlesPage,
+    NewspaperState,
+    get_articles_page,
+    load_topic_first_page,
+)
+from the_daily_bite_web_app.utils.article_index import INDEX_CURSOR_KEY  # noqa: E402
+from the_daily_bite_web_app.utils.cache import LRUCache  # noqa: E402
+
+TOPIC_ID = "topic"
+
+
+def make_article(idx: int) -> NewsArticle:
+    return NewsArticle(
+        article_id=f"article-{idx:02d}",
+        article_key=f'{{"sorting_key": {idx}}}',
+        title=f"Article {idx}",
+        topic_id=TOPIC_ID,
+        source_urls=[f"https://example.com/{idx}"],
+        source_provider_names=["Provider"],
+        published_on_dt="2023-07-01 12:00:00",
+        date_published="2023/07/01",
+        short_summary_ref=f"{TOPIC_ID}/article-{idx:02d}/short",
+    )
+
+
+def article_key(idx: int) -> Dict[str, Dict[str, Any]]:
+    return {"topic_id": {"S": TOPIC_ID}, "sorting_key": {"N": str(idx)}}
+
+
+class StandInQueries:
+    """Stand-in for query_articles_page over the articles set, in publishing order."""
+
+    def __init__(self):
+        self.article_idxs: List[int] = []
+        self.calls: List[Tuple[Optional[Dict], int, bool]] = []
+
+    def __call__(
+        self,
+        topic_id: str,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]],
+        count: int,
+        latest_first: bool = True,
+    ) -> ArticlesPage:
+        self.calls.append((last_evaluated_key, count, latest_first))
+        idxs = sorted(self.article_idxs, reverse=latest_first)
+        if last_evaluated_key is not None:
+            after = int(last_evaluated_key["sorting_key"]["N"])
+            idxs = [idx for idx in idxs if (idx < after if latest_first else idx > after)]
+        page_idxs = idxs[:count]
+        return ArticlesPage(
+            articles=[make_article(idx) for idx in page_idxs],
+            article_keys=[article_key(idx) for idx in page_idxs],
+            last_evaluated_key=article_key(page_idxs[-1]) if len(idxs) > count else None,
+        )
+
+
+@pytest.fixture
+def queries(monkeypatch) -> StandInQueries:
+    queries = StandInQueries()
+    monkeypatch.setattr(newspaper, "query_articles_page", queries)
+    monkeypatch.setattr(newspaper, "approved_articles_index", None)
+    monkeypatch.setattr(
+        newspaper, "article_pages_cache", LRUCache("article_pages", max_entries=100, ttl_seconds=60)
+    )
+    monkeypatch.setattr(newspaper, "prefetch_summary_texts", lambda summary_refs: None)
+    return queries
+
+
+def test_latest_first_pages_are_served_from_the_cache(queries):
+    queries.article_idxs = [1, 2, 3]
+
+    get_articles_page(TOPIC_ID, None, 2)
+    articles_page = get_articles_page(TOPIC_ID, None, 2)
+
+    assert [article.article_id for article in articles_page.articles] == [
+        "article-03",
+        "article-02",
+    ]
+    assert len(queries.calls) == 1
+
+
+def test_oldest_first_pages_are_always_queried(queries):
+    queries.article_idxs = [1, 2]
+    assert get_articles_page(TOPIC_ID, article_key(2), 2, latest_first=False).articles == []
+
+    queries.article_idxs = [1, 2, 3]
+    articles_page = get_articles_page(TOPIC_ID, article_key(2), 2, latest_first=False)
+
+    assert [article.article_id for article in articles_page.articles] == ["article-03"]
+    assert len(queries.calls) == 2
+
+
+def test_load_newest_articles_picks_up_articles_published_since_the_last_refresh(queries):
+    newspaper_state = State().get_substate(NewspaperState.get_full_name().split("."))
+    newspaper_state.newspaper = {TOPIC_ID: {}}
+    newspaper_state._newspaper_article_index = {TOPIC_ID: {}}
+    newspaper_state._newest_fetched_newspaper_article_by_topic = {TOPIC_ID: article_key(0)}
+
+    newspaper_state.load_newest_articles(TOPIC_ID)
+    assert newspaper_state.newspaper[TOPIC_ID] == {}
+
+    new_idxs = list(range(1, ARTICLES_PER_PAGE + 2))
+    queries.article_idxs = new_idxs
+    newspaper_state.load_newest_articles(TOPIC_ID)
+
+    assert [
+        article.article_id for article in newspaper_state.newspaper[TOPIC_ID]["2023/07/01"]
+    ] == [f"article-{idx:02d}" for idx in reversed(new_idxs)]
+    assert newspaper_state._newest_fetched_newspaper_article_by_topic[TOPIC_ID] == article_key(
+        new_idxs[-1]
+    )
+
+
+class StandInUnsyncedIndex:
+    """Stand-in for an approved articles index that dropped the topic and fails to sync it again."""
+
+    def __init__(self):
+        self.synced_topic_ids: List[str] = []
+
+    def sync_untracked_topic(self, topic_id: str) -> bool:
+        self.synced_topic_ids.append(topic_id)
+        return False
+
+    def can_serve(self, topic_id: str, cursor: Optional[Dict[str, Any]]) -> bool:
+        return False
+
+
+def test_index_cursors_of_topics_the_index_cant_serve_are_never_queried(queries, monkeypatch):
+    index = StandInUnsyncedIndex()
+    monkeypatch.setattr(newspaper, "approved_articles_index", index)
+    index_cursor = {INDEX_CURSOR_KEY: "2023-07-01 12:00:00#article-01"}
+
+    with pytest.raises(StaleArticlesCursorException):
+        get_articles_page(TOPIC_ID, index_cursor, 2)
+
+    assert index.synced_topic_ids == [TOPIC_ID]
+    assert queries.calls == []
+
+
+def test_loading_more_articles_from_a_stale_index_cursor_reloads_the_first_page(
+    queries, monkeypatch
+):
+    monkeypatch.setattr(newspaper, "approved_articles_index", StandInUnsyncedIndex())
+    queries.article_idxs = [1, 2, 3]
+    newspaper_state = State().get_substate(NewspaperState.get_full_name().split("."))
+    newspaper_state.newspaper = {TOPIC_ID: {"2023/07/01": [make_article(9)]}}
+    newspaper_state._newspaper_article_index = {TOPIC_ID: {"article-09": make_article(9)}}
+    newspaper_state._last_fetched_newspaper_article_by_topic = {
+        TOPIC_ID: {INDEX_CURSOR_KEY: "2023-07-01 12:00:00#article-09"}
+    }
+    newspaper_state._newest_fetched_newspaper_article_by_topic = {TOPIC_ID: article_key(9)}
+
+    newspaper_state.load_articles_for_topic(TOPIC_ID, count=ARTICLES_PER_PAGE)
+
+    assert queries.calls == [(None, ARTICLES_PER_PAGE, True)]
+    assert list(newspaper_state._newspaper_article_index[TOPIC_ID]) == [
+        "article-03",
+        "article-02",
+        "article-01",
+    ]
+
+
+class StandInTopicPages:
+    """Stand-in for get_articles_page returning a one article page per topic once it's released."""
+
+    def __init__(self, topic_ids: List[str]):
+        self.released = {topic_id: threading.Event() for topic_id in topic_ids}
+        self.failing_topic_ids: List[str] = []
+        self.loaded_topic_ids: List[str] = []
+
+    def __call__(
+        self,
+        topic_id: str,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]],
+        count: int,
+        latest_first: bool = True,
+    ) -> ArticlesPage:
+        assert self.released[topic_id].wait(timeout=5)
+        self.loaded_topic_ids.append(topic_id)
+        if topic_id in self.failing_topic_ids:
+            raise RuntimeError(f"Throttled querying {topic_id}")
+        article = make_article(1).copy(update={"topic_id": topic_id})
+        return ArticlesPage(
+            articles=[article], article_keys=[article_key(1)], last_evaluated_key=None
+        )
+
+
+@pytest.fixture
+def topic_pages(monkeypatch) -> StandInTopicPages:
+    topic_pages = StandInTopicPages(["selected", "sports", "science"])
+    monkeypatch.setattr(newspaper, "get_articles_page", topic_pages)
+    monkeypatch.setattr(newspaper, "_topic_warm_up_pages", dict())
+    monkeypatch.setattr(newspaper, "prefetch_summary_texts", lambda summary_refs: None)
+    monkeypatch.setattr(newspaper, "TOPIC_WARM_UP_ENABLED", True)
+    yield topic_pages
+    # don't leave the executor's threads waiting on topics a test didn't release
+    for released in topic_pages.released.values():
+        released.set()
+
+
+def make_subscribed_newspaper_state(topic_ids: List[str]) -> NewspaperState:
+    newspaper_state = State().get_substate(NewspaperState.get_full_name().split("."))
+    newspaper_state.newspaper_topics = [
+        NewspaperTopic(topic_id=topic_id, topic=topic_id.title(), is_selected=idx == 0)
+        for idx, topic_id in enumerate(topic_ids)
+    ]
+    newspaper_state.selected_newspaper_topic_id = topic_ids[0]
+    for topic_id in topic_ids:
+        newspaper_state.newspaper[topic_id] = dict()
+        newspaper_state.topic_newspaper_refresh_status[topic_id] = False
+        newspaper_state._last_fetched_newspaper_article_by_topic[topic_id] = dict()
+        newspaper_state._newest_fetched_newspaper_article_by_topic[topic_id] = dict()
+        newspaper_state._newspaper_article_index[topic_id] = dict()
+        newspaper_state._newspaper_published_dates[topic_id] = []
+        newspaper_state._newspaper_published_date_labels[topic_id] = []
+        newspaper_state._last_newspaper_refresh_dt_by_topic[topic_id] = datetime.min.replace(
+            tzinfo=timezone.utc
+        )
+    return newspaper_state
+
+
+def test_warm_up_adds_each_topic_in_its_own_event(topic_pages):
+    newspaper_state = make_subscribed_newspaper_state(["selected", "sports", "science"])
+
+    follow_up = newspaper_state.warm_up_subscribed_topics_newspaper_articles()
+
+    # the event only starts the loads, the reader's events can run while they're in flight
+    assert follow_up == NewspaperState.add_warmed_up_topics_newspaper_articles
+    assert newspaper_state._warming_up_topic_ids == ["sports", "science"]
+    assert newspaper_state.topic_newspaper_refresh_status == {
+        "selected": False,
+        "sports": True,
+        "science": True,
+    }
+
+    topic_pages.released["science"].set()
+    follow_up = asyncio.run(newspaper_state.add_warmed_up_topics_newspaper_articles())
+
+    assert follow_up == NewspaperState.add_warmed_up_topics_newspaper_articles
+    assert newspaper_state._warming_up_topic_ids == ["sports"]
+    assert not newspaper_state.topic_newspaper_refresh_status["science"]
+    assert list(newspaper_state._newspaper_article_index["science"]) == ["article-01"]
+    assert newspaper_state.topic_newspaper_refresh_status["sports"]
+    assert newspaper_state.newspaper["sports"] == {}
+
+    topic_pages.released["sports"].set()
+    follow_up = asyncio.run(newspaper_state.add_warmed_up_topics_newspaper_articles())
+
+    assert follow_up is None
+    assert newspaper_state._warming_up_topic_ids == []
+    assert not newspaper_state.topic_newspaper_refresh_status["sports"]
+    assert list(newspaper_state._newspaper_article_index["sports"]) == ["article-01"]
+    assert not newspaper_state.is_topic_newspaper_stale("sports")
+    assert "selected" not in topic_pages.loaded_topic_ids
+
+
+def test_warm_up_clears_the_refresh_status_of_a_topic_that_failed_to_load(topic_pages):
+    newspaper_state = make_subscribed_newspaper_state(["selected", "sports"])
+    topic_pages.failing_topic_ids = ["sports"]
+    topic_pages.released["sports"].set()
+
+    newspaper_state.warm_up_subscribed_topics_newspaper_articles()
+    follow_up = asyncio.run(newspaper_state.add_warmed_up_topics_newspaper_articles())
+
+    assert follow_up is None
+    assert not newspaper_state.topic_newspaper_refresh_status["sports"]
+    assert newspaper_state.newspaper["sports"] == {}
+    assert newspaper_state.is_topic_newspaper_stale("sports")
+
+
+def test_sessions_warming_up_the_same_topic_share_its_load(topic_pages):
+    topic_page = load_topic_first_page("sports")
+
+    assert load_topic_first_page("sports") is topic_page
+
+    topic_pages.released["sports"].set()
+    topic_page.result(timeout=5)
+    assert topic_pages.loaded_topic_ids == ["sports"]
+
+
+def test_a_warm_up_whose_events_were_lost_is_resumed_when_the_newspaper_loads_again(topic_pages):
+    newspaper_state = make_subscribed_newspaper_state(["selected", "sports"])
+    newspaper_state.warm_up_subscribed_topics_newspaper_articles()
+    warm_up_started_at = newspaper_state._warm_up_started_at
+
+    follow_up = newspaper_state.warm_up_subscribed_topics_newspaper_articles()
+
+    assert follow_up == NewspaperState.add_warmed_up_topics_newspaper_articles
+    assert newspaper_state._warm_up_started_at == warm_up_started_at
+    topic_pages.released["sports"].set()
+    assert asyncio.run(newspaper_state.add_warmed_up_topics_newspaper_articles()) is None
+    assert not newspaper_state.topic_newspaper_refresh_status["sports"]
+    assert list(newspaper_state._newspaper_article_index["sports"]) == ["article-01"]
+
+
+def test_an_expired_warm_up_no_longer_keeps_its_topics_refreshing(topic_pages):
+    newspaper_state = make_subscribed_newspaper_state(["selected", "sports", "science"])
+    newspaper_state.warm_up_subscribed_topics_newspaper_articles()
+    # the reader selected a topic being warmed up before the page was reloaded
+    newspaper_state.selected_newspaper_topic_id = "sports"
+    assert not newspaper_state.is_topic_newspaper_stale("sports")
+
+    newspaper_state._warm_up_started_at -= timedelta(seconds=newspaper.TOPIC_WARM_UP_TIMEOUT_SECS)
+
+    assert newspaper_state.is_topic_newspaper_stale("sports")
+    follow_up = newspaper_state.warm_up_subscribed_topics_newspaper_articles()
+    assert follow_up == NewspaperState.add_warmed_up_topics_newspaper_articles
+    assert newspaper_state._warming_up_topic_ids == ["selected", "science"]
+    assert not newspaper_state.topic_newspaper_refresh_status["sports"]
+    assert not newspaper_state.is_topics_warm_up_expired()
@@ -0,0 +1,100 @@
+"""Tests of the sliding window rate limiter and of the client ip it is keyed on."""
+
+import pytest
+
+from the_daily_bite_web_app.utils import rate_limit
+from the_daily_bite_web_app.utils.rate_limit import SlidingWindowRateLimiter, client_ip
+
+
+class Clock:
+    """Stand-in for time.monotonic, moved forward by the tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_attempts_over_the_limit_are_refused_until_the_window_slides(clock):
+    limiter = SlidingWindowRateLimiter("test", max_attempts=2, window_seconds=60)
+    assert limiter.allow("client")
+    clock.now += 30
+    assert limiter.allow("client")
+    assert not limiter.allow("client")
+
+    # the first attempt leaves the window exactly window_seconds after it was made
+    clock.now += 29.9
+    assert not limiter.allow("client")
+    clock.now += 0.1
+    assert limiter.allow("client")
+    assert not limiter.allow("client")
+
+    assert limiter.stats() == {"name": "test", "allowed": 3, "limited": 3, "keys": 1}
+
+
+def test_refused_attempts_do_not_extend_the_window(clock):
+    limiter = SlidingWindowRateLimiter("test", max_attempts=1, window_seconds=60)
+    assert limiter.allow("client")
+    for _ in range(10):
+        clock.now += 5
+        assert not limiter.allow("client")
+
+    clock.now += 10
+    assert limiter.allow("client")
+
+
+def test_keys_are_limited_independently(clock):
+    limiter = SlidingWindowRateLimiter("test", max_attempts=1, window_seconds=60)
+
+    assert limiter.allow("client-a")
+    assert not limiter.allow("client-a")
+    assert limiter.allow("client-b")
+    assert not limiter.allow("client-b")
+
+
+def test_only_the_most_recently_seen_keys_are_tracked(clock):
+    limiter = SlidingWindowRateLimiter("test", max_attempts=1, window_seconds=60, max_keys=2)
+    limiter.allow("client-a")
+    limiter.allow("client-b")
+    # seeing "client-a" again makes "client-b" the least recently seen
+    limiter.allow("client-a")
+
+    limiter.allow("client-c")
+
+    assert limiter.stats()["keys"] == 2
+    assert limiter.allow("client-b")
+    assert not limiter.allow("client-c")
+
+
+def test_client_ip_is_the_peer_address_without_trusted_proxies():
+    headers = {"x-forwarded-for": "203.0.113.7"}
+
+    assert client_ip("10.0.0.5", headers, trusted_proxy_hops=0) == "10.0.0.5"
+
+
+@pytest.mark.parametrize(
+    "forwarded_for, trusted_proxy_hops, expected_ip",
+    [
+        ("203.0.113.7", 1, "203.0.113.7"),
+        # addresses set by the client are left of the ones the proxies appended
+        ("198.51.100.1, 203.0.113.7", 1, "203.0.113.7"),
+        ("198.51.100.1,203.0.113.7, 10.0.1.9", 2, "203.0.113.7"),
+        # fewer addresses than proxies: the request didn't come through them
+        ("203.0.113.7", 2, "10.0.0.5"),
+        ("", 1, "10.0.0.5"),
+    ],
+)
+def test_client_ip_is_read_from_the_right_of_x_forwarded_for(
+    forwarded_for, trusted_proxy_hops, expected_ip
+):
+    headers = {"x-forwarded-for": forwarded_for}
+
+    assert client_ip("10.0.0.5", headers, trusted_proxy_hops) == expected_ip
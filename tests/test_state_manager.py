@@ -0,0 +1,219 @@
+"""Tests of the session state snapshots and of the redis state manager on the in process redis."""
+
+from typing import List, Tuple
+
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("SUMMARY_URL_SIGNING_KEY", "test")
+
+pytest.importorskip("reflex")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from reflex.state import State  # noqa: E402
+
+from the_daily_bite_web_app import state_manager  # noqa: E402
+from the_daily_bite_web_app.exceptions import StateSchemaMismatchException  # noqa: E402
+from the_daily_bite_web_app.state_manager import (  # noqa: E402
+    LOCAL_REDIS_URL,
+    LocalRedis,
+    RedisStateManager,
+    decode_snapshot,
+    encode_snapshot,
+    models_schema_version,
+    restore_state,
+    snapshot_state,
+)
+from the_daily_bite_web_app.states import BaseState, NewspaperState  # noqa: E402
+from the_daily_bite_web_app.states.models import NewsArticle, NewspaperTopic, User  # noqa: E402
+
+REFRESHED_AT = datetime(2023, 7, 1, 12, tzinfo=timezone.utc)
+SCHEMA_VERSION = b"\x00" * 8
+
+
+def get_newspaper_state(state: State) -> NewspaperState:
+    return state.get_substate(NewspaperState.get_full_name().split("."))
+
+
+def make_state() -> State:
+    """A root state with the base, backend and dict vars of the newspaper state set."""
+    state = State()
+    base_state = state.get_substate(BaseState.get_full_name().split("."))
+    base_state.user = User(user_id="user", name="Reader")
+    newspaper_state = get_newspaper_state(state)
+    newspaper_state.newspaper_topics = [
+        NewspaperTopic(topic_id="topic", topic="Topic", is_selected=True)
+    ]
+    newspaper_state.selected_newspaper_topic_id = "topic"
+    newspaper_state.article_show_lengths = {"article-1": "medium", "article-2": "short"}
+    newspaper_state.article_summary_urls = {"article-1": "/summaries/topic/article-1/medium?s=1"}
+    newspaper_state._newspaper_published_dates = {"topic": ["2023/07/01", "2023/06/30"]}
+    newspaper_state._last_newspaper_refresh_dt_by_topic = {"topic": REFRESHED_AT}
+    state.clean()
+    return state
+
+
+def round_trip(state: State) -> State:
+    return restore_state(
+        State(),
+        decode_snapshot(encode_snapshot(snapshot_state(state), SCHEMA_VERSION), SCHEMA_VERSION),
+    )
+
+
+@pytest.mark.parametrize("compress_min_bytes", [0, 1024 * 1024])
+def test_snapshot_round_trip_restores_the_base_and_backend_vars(monkeypatch, compress_min_bytes):
+    monkeypatch.setattr(state_manager, "STATE_REDIS_COMPRESS_MIN_BYTES", compress_min_bytes)
+
+    restored = round_trip(make_state())
+
+    restored_newspaper_state = get_newspaper_state(restored)
+    user = restored_newspaper_state.user
+    assert (user.user_id, user.name) == ("user", "Reader")
+    assert [
+        (topic.topic_id, topic.topic, topic.is_selected)
+        for topic in restored_newspaper_state.newspaper_topics
+    ] == [("topic", "Topic", True)]
+    assert restored_newspaper_state.selected_newspaper_topic_id == "topic"
+    assert restored_newspaper_state.article_show_lengths == {
+        "article-1": "medium",
+        "article-2": "short",
+    }
+    assert restored_newspaper_state.article_summary_urls == {
+        "article-1": "/summaries/topic/article-1/medium?s=1"
+    }
+    assert restored_newspaper_state._newspaper_published_dates == {
+        "topic": ["2023/07/01", "2023/06/30"]
+    }
+    assert restored_newspaper_state._last_newspaper_refresh_dt_by_topic == {"topic": REFRESHED_AT}
+    assert not restored.dirty_vars
+    assert not restored.dirty_substates
+
+
+def test_restored_dict_vars_track_their_mutations():
+    restored = round_trip(make_state())
+    restored_newspaper_state = get_newspaper_state(restored)
+
+    restored_newspaper_state.article_show_lengths["article-3"] = "full"
+
+    assert "article_show_lengths" in restored_newspaper_state.dirty_vars
+
+
+def test_snapshot_holds_plain_values_only():
+    snapshot = snapshot_state(make_state())
+    newspaper_values = snapshot[NewspaperState.get_full_name()]
+
+    assert type(newspaper_values["article_show_lengths"]) is dict
+    assert type(newspaper_values["newspaper_topics"]) is list
+    assert type(newspaper_values["_newspaper_published_dates"]["topic"]) is list
+    # the vars of the base state are only in its own snapshot
+    assert "user" not in newspaper_values
+    assert "user" in snapshot[BaseState.get_full_name()]
+
+
+def test_encode_snapshot_compresses_over_the_threshold_only(monkeypatch):
+    snapshot = snapshot_state(make_state())
+
+    monkeypatch.setattr(state_manager, "STATE_REDIS_COMPRESS_MIN_BYTES", 0)
+    assert encode_snapshot(snapshot, SCHEMA_VERSION)[:1] == b"\x02"
+    monkeypatch.setattr(state_manager, "STATE_REDIS_COMPRESS_MIN_BYTES", 1024 * 1024)
+    assert encode_snapshot(snapshot, SCHEMA_VERSION)[:1] == b"\x01"
+
+
+def test_restore_state_ignores_the_states_and_vars_that_no_longer_exist():
+    snapshot = snapshot_state(make_state())
+    snapshot["state.removed_state"] = {"value": 1}
+    snapshot[NewspaperState.get_full_name()]["removed_var"] = 1
+
+    restored = restore_state(State(), snapshot)
+
+    assert get_newspaper_state(restored).selected_newspaper_topic_id == "topic"
+    assert "removed_var" not in vars(get_newspaper_state(restored))
+
+
+def test_decode_snapshot_rejects_unknown_formats():
+    with pytest.raises(ValueError):
+        decode_snapshot(b"\x09not a snapshot", SCHEMA_VERSION)
+
+
+def test_decode_snapshot_rejects_snapshots_of_other_models():
+    stored = encode_snapshot(snapshot_state(make_state()), SCHEMA_VERSION)
+
+    with pytest.raises(StateSchemaMismatchException):
+        decode_snapshot(stored, b"\x01" * 8)
+
+
+def test_models_schema_version_changes_with_the_fields_of_the_models_held(monkeypatch):
+    schema_version = models_schema_version(State())
+    assert models_schema_version(State()) == schema_version
+
+    # the articles are only held by backend vars
+    monkeypatch.setitem(NewsArticle.__fields__, "renamed_title", NewsArticle.__fields__["title"])
+
+    assert models_schema_version(State()) != schema_version
+
+
+class RecordingRedis(LocalRedis):
+    """The in process redis, recording the writes and expiration refreshes."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes: List[Tuple[str, str]] = []
+
+    def set(self, key, value, ex=None):
+        self.writes.append(("set", key))
+        return super().set(key, value, ex=ex)
+
+    def expire(self, key, time_secs):
+        self.writes.append(("expire", key))
+        return super().expire(key, time_secs)
+
+
+@pytest.fixture
+def manager(monkeypatch) -> RedisStateManager:
+    monkeypatch.setattr(state_manager, "STATE_REDIS_URL", LOCAL_REDIS_URL)
+    manager = RedisStateManager()
+    manager.setup(State)
+    manager.redis = RecordingRedis()
+    return manager
+
+
+def test_set_state_skips_the_write_of_an_unchanged_state(manager):
+    token = "unchanged-token"
+    key = state_manager.STATE_KEY_PREFIX + token
+    state = manager.get_state(token)
+    get_newspaper_state(state).article_show_lengths = {"article-1": "medium"}
+    manager.set_state(token, state)
+
+    manager.set_state(token, manager.get_state(token))
+
+    assert manager.redis.writes == [("set", key), ("expire", key)]
+
+
+def test_set_state_writes_a_changed_state(manager):
+    token = "changed-token"
+    key = state_manager.STATE_KEY_PREFIX + token
+    manager.set_state(token, manager.get_state(token))
+
+    state = manager.get_state(token)
+    get_newspaper_state(state).article_summary_urls = {"article-1": "/summaries/article-1"}
+    manager.set_state(token, state)
+
+    assert manager.redis.writes == [("set", key), ("set", key)]
+    assert get_newspaper_state(manager.get_state(token)).article_summary_urls == {
+        "article-1": "/summaries/article-1"
+    }
+
+
+def test_get_state_drops_a_state_stored_with_other_models(manager):
+    token = "other-models-token"
+    state = manager.get_state(token)
+    get_newspaper_state(state).selected_newspaper_topic_id = "topic"
+    manager.set_state(token, state)
+
+    manager.schema_version = b"\x01" * 8
+
+    assert get_newspaper_state(manager.get_state(token)).selected_newspaper_topic_id == ""
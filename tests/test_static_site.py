@@ -0,0 +1,202 @@
+"""Tests of the static site built from a stand-in frontend export: fingerprinting, precompression and
+the removal of the hydrate event of the public pages."""
+
+import gzip
+import hashlib
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from the_daily_bite_web_app import static_site  # noqa: E402
+from the_daily_bite_web_app.static_site import (  # noqa: E402
+    IMMUTABLE_CACHE_CONTROL,
+    build_static_site,
+    fingerprinted_name,
+    html_cache_control,
+    precompress,
+    remove_initial_hydrate_event,
+)
+
+LOGO = b"\x89PNG" + bytes(range(256)) * 8
+# long enough to be compressed
+PAGE_TEXT = "Read informative, well organized news, in easily digestible bites. " * 40
+
+
+# the initial state of a page as minified by next.js, queuing the hydrate event running its on_load
+# events, and the hydrate event sent after a client side navigation
+MINIFIED_PAGE_BUNDLE = (
+    'let[a,b]=(0,r.useState)({events:[{name:"state.hydrate"}],files:[],is_hydrated:!1});'
+    'let c=()=>d([(0,o.E)("state.hydrate",{})]);'
+)
+
+
+def page_html(bundle: str, body: str) -> str:
+    return f'<script src="/_next/static/chunks/pages/{bundle}" defer></script>{body}'
+
+
+def make_export(export_dir: Path) -> Path:
+    """A frontend export with the bundles, a public asset and the html of the public routes."""
+    (export_dir / "_next/static/chunks/pages").mkdir(parents=True)
+    (export_dir / "_next/static/chunks/main-0123abcd.js").write_text("console.log(1);" * 200)
+    for page in ["index", "login", "404", "newspaper"]:
+        (export_dir / f"_next/static/chunks/pages/{page}-0123abcd.js").write_text(
+            MINIFIED_PAGE_BUNDLE
+        )
+    (export_dir / "logo.png").write_bytes(LOGO)
+    (export_dir / "index.html").write_text(
+        page_html("index-0123abcd.js", f'<img src="/logo.png"><p>{PAGE_TEXT}</p>')
+    )
+    (export_dir / "login").mkdir()
+    (export_dir / "login/index.html").write_text(
+        page_html("login-0123abcd.js", '<img src="/logo.png"><p>Login</p>')
+    )
+    (export_dir / "404.html").write_text(page_html("404-0123abcd.js", "<p>Not found</p>"))
+    # a page of the app that isn't public
+    (export_dir / "newspaper.html").write_text(
+        page_html("newspaper-0123abcd.js", "<p>Newspaper</p>")
+    )
+    return export_dir
+
+
+@pytest.fixture
+def export_dir(tmp_path) -> Path:
+    return make_export(tmp_path / "export")
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(static_site, "brotli", None)
+
+
+def test_fingerprinted_name_holds_the_hash_of_the_content(tmp_path):
+    logo_path = tmp_path / "logo.png"
+    logo_path.write_bytes(LOGO)
+
+    assert fingerprinted_name(logo_path) == f"logo.{hashlib.sha256(LOGO).hexdigest()[:12]}.png"
+    logo_path.write_bytes(LOGO + b"\x00")
+    assert fingerprinted_name(logo_path) != f"logo.{hashlib.sha256(LOGO).hexdigest()[:12]}.png"
+
+
+def test_public_assets_are_fingerprinted_and_the_html_rewritten(export_dir, tmp_path, gzip_only):
+    output_dir = tmp_path / "site"
+
+    fingerprinted_url_paths = build_static_site(export_dir, output_dir, ["/", "/login", "/404"])
+
+    fingerprinted_logo = fingerprinted_name(export_dir / "logo.png")
+    assert fingerprinted_url_paths == {"/logo.png": f"/{fingerprinted_logo}"}
+    assert (output_dir / fingerprinted_logo).read_bytes() == LOGO
+    # still served under its name for the references the bundles make to it
+    assert (output_dir / "logo.png").read_bytes() == LOGO
+    assert f'src="/{fingerprinted_logo}"' in (output_dir / "index.html").read_text()
+    assert f'src="/{fingerprinted_logo}"' in (output_dir / "login/index.html").read_text()
+    assert (output_dir / "_next/static/chunks/main-0123abcd.js").exists()
+    assert not (output_dir / "newspaper.html").exists()
+
+
+def test_cache_control_is_immutable_for_the_fingerprinted_files_only(
+    export_dir, tmp_path, gzip_only
+):
+    output_dir = tmp_path / "site"
+
+    build_static_site(export_dir, output_dir, ["/", "/login"])
+
+    headers = (output_dir / "_headers").read_text().splitlines()
+    cache_controls = dict(zip(headers[::2], [line.strip() for line in headers[1::2]]))
+    fingerprinted_logo = fingerprinted_name(export_dir / "logo.png")
+    assert cache_controls["/_next/static/*"] == f"Cache-Control: {IMMUTABLE_CACHE_CONTROL}"
+    assert cache_controls[f"/{fingerprinted_logo}"] == f"Cache-Control: {IMMUTABLE_CACHE_CONTROL}"
+    for url_path in ["/logo.png", "/", "/index.html", "/login", "/login/index.html"]:
+        assert cache_controls[url_path] == f"Cache-Control: {html_cache_control()}"
+    nginx_config = (output_dir / "nginx.conf").read_text()
+    assert f"location = /{fingerprinted_logo} {{" in nginx_config
+    assert "gzip_static on;" in nginx_config
+
+
+def test_compressible_files_get_a_gzip_variant(export_dir, tmp_path, gzip_only):
+    output_dir = tmp_path / "site"
+
+    build_static_site(export_dir, output_dir, ["/", "/login", "/404"])
+
+    for path in [output_dir / "index.html", output_dir / "_next/static/chunks/main-0123abcd.js"]:
+        assert gzip.decompress(path.with_name(path.name + ".gz").read_bytes()) == path.read_bytes()
+        assert not path.with_name(path.name + ".br").exists()
+    # too small or not compressible
+    assert not (output_dir / "404.html.gz").exists()
+    assert not (output_dir / "logo.png.gz").exists()
+
+
+def test_precompress_skips_variants_that_are_not_smaller(tmp_path, gzip_only):
+    path = tmp_path / "random.js"
+    path.write_bytes(random.Random(0).randbytes(4096))
+
+    assert precompress(path) == []
+    assert not (tmp_path / "random.js.gz").exists()
+
+
+def test_precompress_is_deterministic(tmp_path, gzip_only):
+    path = tmp_path / "index.html"
+    path.write_text(PAGE_TEXT)
+
+    precompress(path)
+    first_build = (tmp_path / "index.html.gz").read_bytes()
+    precompress(path)
+
+    assert (tmp_path / "index.html.gz").read_bytes() == first_build
+
+
+def test_precompress_writes_a_brotli_variant_when_brotli_is_installed(tmp_path, monkeypatch):
+    class StandInBrotli:
+        @staticmethod
+        def compress(content: bytes, quality: int) -> bytes:
+            return gzip.compress(content, mtime=0)[:-1]
+
+    monkeypatch.setattr(static_site, "brotli", StandInBrotli)
+    path = tmp_path / "index.html"
+    path.write_text(PAGE_TEXT)
+
+    variants = precompress(path)
+
+    assert [variant.name for variant in variants] == ["index.html.gz", "index.html.br"]
+
+
+def test_build_fails_on_a_route_without_pre_rendered_html(export_dir, tmp_path, gzip_only):
+    with pytest.raises(FileNotFoundError):
+        build_static_site(export_dir, tmp_path / "site", ["/missing"])
+
+
+def test_the_public_pages_send_no_hydrate_event_on_load(export_dir, tmp_path, gzip_only):
+    output_dir = tmp_path / "site"
+
+    build_static_site(export_dir, output_dir, ["/", "/login", "/404"])
+
+    pages_dir = output_dir / "_next/static/chunks/pages"
+    for page in ["index", "login", "404"]:
+        bundle = (pages_dir / f"{page}-0123abcd.js").read_text()
+        assert "events:[]," in bundle
+        assert '{name:"state.hydrate"}' not in bundle
+        # the hydrate event of the navigations to the pages of the app is kept
+        assert '(0,o.E)("state.hydrate",{})' in bundle
+    # the pages the app serves still run their on_load events
+    assert '{name:"state.hydrate"}' in (pages_dir / "newspaper-0123abcd.js").read_text()
+
+
+def test_remove_initial_hydrate_event_of_a_json_initial_state(tmp_path):
+    bundle_path = tmp_path / "index.js"
+    bundle_path.write_text(
+        'useState({"events": [{"name": "state.hydrate"}], "files": []})'
+        'Event([E("state.hydrate", {})])'
+    )
+
+    assert remove_initial_hydrate_event(bundle_path)
+
+    assert bundle_path.read_text() == (
+        'useState({"events": [], "files": []})Event([E("state.hydrate", {})])'
+    )
+    assert not remove_initial_hydrate_event(bundle_path)
@@ -0,0 +1,101 @@
+"""Tests of the async logging queue handler passing the records unformatted to the listener."""
+
+from typing import List
+
+import io
+import json
+import logging
+import queue
+import threading
+from logging.handlers import QueueListener
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from the_daily_bite_web_app.utils.telemetry import (  # noqa: E402
+    JsonFormatter,
+    RawRecordQueueHandler,
+)
+
+
+class RecordingFormatter(logging.Formatter):
+    """Formats the records with the json formatter, recording the threads they're formatted on."""
+
+    def __init__(self):
+        super().__init__()
+        self.json_formatter = JsonFormatter()
+        self.thread_names: List[str] = []
+
+    def format(self, record: logging.LogRecord) -> str:
+        self.thread_names.append(threading.current_thread().name)
+        return self.json_formatter.format(record)
+
+
+def make_record(msg: str, args, exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.ERROR, __file__, 1, msg, args, exc_info)
+
+
+def test_records_with_immutable_arguments_are_queued_unformatted():
+    handler = RawRecordQueueHandler(queue.SimpleQueue())
+    record = make_record("Loaded %d articles for topic id %s", (5, "topic"))
+
+    prepared = handler.prepare(record)
+
+    assert prepared is record
+    assert (prepared.msg, prepared.args) == ("Loaded %d articles for topic id %s", (5, "topic"))
+
+
+def test_records_with_mutable_arguments_are_formatted_before_being_queued():
+    handler = RawRecordQueueHandler(queue.SimpleQueue())
+    topic_ids = ["a", "b"]
+    record = make_record("Warming up topic ids %s", (topic_ids,))
+
+    prepared = handler.prepare(record)
+    topic_ids.append("c")
+
+    assert (prepared.msg, prepared.args) == ("Warming up topic ids ['a', 'b']", None)
+    # the record the other handlers get is unchanged
+    assert record.args == (topic_ids,)
+
+
+def test_exc_info_is_kept_for_the_listener_to_format():
+    handler = RawRecordQueueHandler(queue.SimpleQueue())
+    try:
+        raise ValueError("bad value")
+    except ValueError as e:
+        record = make_record("Error: %s", (e,), exc_info=(type(e), e, e.__traceback__))
+
+    prepared = handler.prepare(record)
+
+    assert prepared.exc_info is not None
+    assert prepared.exc_text is None
+
+
+def test_records_are_formatted_by_the_listener_with_the_exception_in_its_own_field():
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream = io.StringIO()
+    stream_handler = logging.StreamHandler(stream)
+    formatter = RecordingFormatter()
+    stream_handler.setFormatter(formatter)
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    logger = logging.getLogger("test_telemetry")
+    logger.propagate = False
+    queue_handler = RawRecordQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    try:
+        try:
+            raise ValueError("bad value")
+        except ValueError as e:
+            logger.error("Error getting summary %s: %s", "ref", e, exc_info=True)
+    finally:
+        logger.removeHandler(queue_handler)
+        listener.stop()
+
+    log = json.loads(stream.getvalue())
+    assert log["message"] == "Error getting summary ref: bad value"
+    assert "Traceback" in log["exception"]
+    assert "ValueError: bad value" in log["exception"]
+    assert formatter.thread_names and threading.current_thread().name not in formatter.thread_names
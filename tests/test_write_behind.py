@@ -0,0 +1,168 @@
+"""Tests of the batch write buffer against an in-memory stand-in for DynamoDB batch writes."""
+
+from typing import Dict, List, Set, Tuple
+
+import atexit
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+pytest.importorskip("pynamodb")
+pytest.importorskip("news_aggregator_data_access_layer")
+
+from pynamodb.attributes import UnicodeAttribute  # noqa: E402
+from pynamodb.exceptions import PutError  # noqa: E402
+from pynamodb.models import Model  # noqa: E402
+
+from the_daily_bite_web_app.utils import dynamodb  # noqa: E402
+from the_daily_bite_web_app.utils.write_behind import BatchWriteBuffer  # noqa: E402
+
+
+class Suggestion(Model):
+    class Meta:
+        table_name = "test-suggestions"
+        region = "us-east-1"
+
+    user_id = UnicodeAttribute(hash_key=True)
+    topic = UnicodeAttribute(range_key=True)
+
+
+class InMemoryTable:
+    """The rows written by the stand-in batch writes, failing the writes of the topics listed."""
+
+    def __init__(self):
+        self.rows: Dict[Tuple[str, str], Suggestion] = {}
+        self.failing_topics: Set[str] = set()
+        self.batch_sizes: List[int] = []
+
+    def batch_write(self, model, auto_commit=True):
+        return InMemoryBatchWrite(self)
+
+
+class InMemoryBatchWrite:
+    """Stand-in for pynamodb's BatchWrite writing to an InMemoryTable."""
+
+    def __init__(self, table: InMemoryTable):
+        self.table = table
+        self.operations: List[Tuple[str, Suggestion]] = []
+        self.failed_operations: List[Dict] = []
+
+    def save(self, item: Suggestion) -> None:
+        self.operations.append(("save", item))
+
+    def delete(self, item: Suggestion) -> None:
+        self.operations.append(("delete", item))
+
+    def commit(self) -> None:
+        self.table.batch_sizes.append(len(self.operations))
+        for action, item in self.operations:
+            if item.topic in self.table.failing_topics:
+                self.failed_operations.append({"PutRequest": {"Item": item.serialize()}})
+            elif action == "save":
+                self.table.rows[(item.user_id, item.topic)] = item
+            else:
+                self.table.rows.pop((item.user_id, item.topic), None)
+        if self.failed_operations:
+            raise PutError("Failed to batch write items: max_retry_attempts exceeded")
+
+
+@pytest.fixture
+def table(monkeypatch) -> InMemoryTable:
+    table = InMemoryTable()
+    monkeypatch.setattr(dynamodb, "BatchWrite", table.batch_write)
+    return table
+
+
+@pytest.fixture
+def exit_handlers(monkeypatch) -> List:
+    # the handlers registered with atexit, called by the tests rather than at exit
+    handlers: List = []
+    monkeypatch.setattr(atexit, "register", handlers.append)
+    return handlers
+
+
+def make_buffer(max_attempts: int = 3) -> BatchWriteBuffer:
+    # flushed by the tests only
+    return BatchWriteBuffer(
+        "test_suggestions",
+        Suggestion,
+        max_items=1000,
+        flush_interval_secs=3600,
+        max_attempts=max_attempts,
+    )
+
+
+def test_exit_flush_writes_the_buffered_items_after_the_thread_pool_is_shut_down(
+    monkeypatch, table, exit_handlers
+):
+    buffer = make_buffer()
+    for idx in range(60):
+        buffer.add(Suggestion(f"user-{idx % 3}", f"topic {idx}"))
+    # as at exit, the thread pool of the batch writes is shut down before the atexit handlers run
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.shutdown()
+    monkeypatch.setattr(dynamodb, "_batch_write_executor", executor)
+
+    assert len(exit_handlers) == 1
+    exit_handlers[0]()
+
+    assert len(table.rows) == 60
+    assert table.batch_sizes == [25, 25, 10]
+    assert buffer.stats()["buffered"] == 0
+    assert buffer.stats()["written"] == 60
+
+
+def test_exit_flush_retries_failed_items_until_out_of_attempts(table, exit_handlers):
+    buffer = make_buffer(max_attempts=3)
+    buffer.add(Suggestion("user", "written"))
+    buffer.add(Suggestion("user", "failing"))
+    table.failing_topics = {"failing"}
+
+    exit_handlers[0]()
+
+    assert list(table.rows) == [("user", "written")]
+    assert buffer.stats()["buffered"] == 0
+    assert buffer.stats()["retried"] == 2
+    assert buffer.stats()["failed"] == 1
+
+
+def test_flush_puts_failed_items_back_in_the_buffer(table, exit_handlers):
+    buffer = make_buffer(max_attempts=2)
+    for topic in ["a", "b", "c"]:
+        buffer.add(Suggestion("user", topic))
+    table.failing_topics = {"b"}
+
+    buffer.flush()
+
+    assert set(table.rows) == {("user", "a"), ("user", "c")}
+    assert buffer.stats()["buffered"] == 1
+
+    table.failing_topics = set()
+    buffer.flush()
+
+    assert set(table.rows) == {("user", "a"), ("user", "b"), ("user", "c")}
+    assert buffer.stats() == {
+        "name": "test_suggestions",
+        "buffered": 0,
+        "deduped": 0,
+        "written": 3,
+        "retried": 1,
+        "failed": 0,
+    }
+
+
+def test_flush_drops_items_failing_max_attempts_times(table, exit_handlers):
+    buffer = make_buffer(max_attempts=2)
+    buffer.add(Suggestion("user", "failing"))
+    table.failing_topics = {"failing"}
+
+    buffer.flush()
+    buffer.flush()
+
+    assert table.rows == {}
+    assert buffer.stats()["buffered"] == 0
+    assert buffer.stats()["failed"] == 1
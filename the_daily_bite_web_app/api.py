@@ -0,0 +1,73 @@
+"""Routes of the backend api served alongside the app."""
+
+import hashlib
+import html
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import HTMLResponse
+
+from the_daily_bite_web_app import styles
+from the_daily_bite_web_app.config import SUMMARY_HTTP_CACHE_MAX_AGE_SECS
+from the_daily_bite_web_app.utils.summaries import get_summary_text, is_valid_summary_signature
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
+
+logger = setup_logger(__name__)
+
+# the summary texts are html (line breaks included) shown in an iframe of the article card. the
+# document posts its height to the page so the iframe is sized to the text (see the newspaper page)
+_SUMMARY_DOCUMENT = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+{stylesheets}
+<style>body {{ margin: 0; font-family: {font_family}, sans-serif; font-size: {font_size}; }}</style>
+</head>
+<body><p>{text}</p>
+<script>
+const postSummaryHeight = () =>
+  parent.postMessage({{ summaryHeight: document.documentElement.scrollHeight }}, "*");
+window.addEventListener("load", postSummaryHeight);
+new ResizeObserver(postSummaryHeight).observe(document.body);
+</script>
+</body>
+</html>
+"""
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    return any(tag.strip() in [etag, "*"] for tag in if_none_match.split(","))
+
+
+def summary(ref: str, signature: str, request: Request) -> Response:
+    """
+    Serve a summary text as an html document cacheable by browsers and CDNs.
+
+    Summaries never change for a given ref, so they are served with a strong ETag and a long
+    lived immutable Cache-Control; requests revalidating a cached copy get a 304.
+    Only the refs signed by the app (see summary_url) are served.
+    """
+    if not is_valid_summary_signature(ref, signature):
+        raise HTTPException(status_code=403)
+    try:
+        # sync route so fastapi runs it in its thread pool while the summary is read from S3
+        text = get_summary_text(ref)
+    except Exception as e:
+        logger.error("Error getting summary %s: %s", ref, e, exc_info=True)
+        metrics.increment("SummaryApiError")
+        raise HTTPException(status_code=502)
+    body = _SUMMARY_DOCUMENT.format(
+        stylesheets="\n".join(
+            f'<link rel="stylesheet" href="{html.escape(stylesheet)}">'
+            for stylesheet in styles.STYLESHEETS
+        ),
+        font_family=styles.TEXT_FONT_FAMILY,
+        font_size=styles.TEXT_FONT_SIZE,
+        text=text,
+    ).encode("utf-8")
+    headers = {
+        "ETag": f'"{hashlib.sha256(body).hexdigest()}"',
+        "Cache-Control": f"public, max-age={SUMMARY_HTTP_CACHE_MAX_AGE_SECS}, immutable",
+    }
+    if _etag_matches(headers["ETag"], request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(body, headers=headers)
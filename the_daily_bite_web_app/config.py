@@ -1,4 +1,6 @@
+import json
 import os
+import tempfile
 
 DEFAULT_LOGGER_NAME = "the-daily-bite-web-app"
 DEFAULT_NAMESPACE = "the-daily-bite-web-app"
@@ -10,3 +12,135 @@ DEFAULT_API_URL = "__API_URL__"
 API_URL = os.environ.get("API_URL", DEFAULT_API_URL)
 if "__" in API_URL:
     API_URL = "http://0.0.0.0:8000"
+# shared (process wide) cache of the pages of articles loaded for a topic
+ARTICLE_PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("ARTICLE_PAGE_CACHE_MAX_ENTRIES", 1000))
+ARTICLE_PAGE_CACHE_TTL_SECS = int(os.environ.get("ARTICLE_PAGE_CACHE_TTL_SECS", 60))
+# shared (process wide) cache of the article summary texts, which are immutable per s3 ref
+SUMMARY_TEXT_CACHE_MAX_BYTES = int(os.environ.get("SUMMARY_TEXT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# prefetch of the short summaries of each page of articles loaded
+SUMMARY_PREFETCH_ENABLED = os.environ.get("SUMMARY_PREFETCH_ENABLED", "true").lower() in ["true"]
+SUMMARY_PREFETCH_CONCURRENCY = int(os.environ.get("SUMMARY_PREFETCH_CONCURRENCY", 8))
+# background load of the first page of every subscribed topic when the newspaper loads
+TOPIC_WARM_UP_ENABLED = os.environ.get("TOPIC_WARM_UP_ENABLED", "true").lower() in ["true"]
+TOPIC_WARM_UP_CONCURRENCY = int(os.environ.get("TOPIC_WARM_UP_CONCURRENCY", 4))
+# a warm-up not done after the timeout (e.g. its events were lost with the page) is given up on
+TOPIC_WARM_UP_TIMEOUT_SECS = int(os.environ.get("TOPIC_WARM_UP_TIMEOUT_SECS", 60))
+# local index of the approved articles of each topic, kept in sync with DynamoDB in the background.
+# topics no session loaded for the topic ttl stop being synced and are dropped from the index.
+# with the name of a sourced articles attribute updated when an article changes (e.g. is approved)
+# and of an index on it (the topic id as hash key and that attribute as range key), only the articles
+# changed since the last sync are read. without them new articles are read from the newest indexed
+# and the topics are fully re-read every full sync interval to pick up the other changes
+ARTICLE_INDEX_ENABLED = os.environ.get("ARTICLE_INDEX_ENABLED", "false").lower() in ["true"]
+ARTICLE_INDEX_DB_PATH = os.environ.get("ARTICLE_INDEX_DB_PATH", ":memory:")
+ARTICLE_INDEX_SYNC_INTERVAL_SECS = int(os.environ.get("ARTICLE_INDEX_SYNC_INTERVAL_SECS", 60))
+ARTICLE_INDEX_FULL_SYNC_INTERVAL_SECS = int(
+    os.environ.get("ARTICLE_INDEX_FULL_SYNC_INTERVAL_SECS", 60 * 60)
+)
+ARTICLE_INDEX_TOPIC_TTL_SECS = int(os.environ.get("ARTICLE_INDEX_TOPIC_TTL_SECS", 60 * 60))
+ARTICLE_INDEX_CHANGED_AT_ATTRIBUTE = os.environ.get("ARTICLE_INDEX_CHANGED_AT_ATTRIBUTE", "")
+ARTICLE_INDEX_CHANGED_AT_INDEX = os.environ.get("ARTICLE_INDEX_CHANGED_AT_INDEX", "")
+# hit, miss and eviction counts and sizes of the shared (process wide) caches, published as metrics
+# every interval (0 to never publish them) and served by /debug/caches
+CACHE_STATS_PUBLISH_INTERVAL_SECS = int(os.environ.get("CACHE_STATS_PUBLISH_INTERVAL_SECS", 60))
+# shared (process wide) cache of the summary refs of the articles readers expanded
+ARTICLE_DETAILS_CACHE_MAX_ENTRIES = int(os.environ.get("ARTICLE_DETAILS_CACHE_MAX_ENTRIES", 5000))
+# shared (process wide) cache of the news topics metadata
+TOPIC_METADATA_CACHE_MAX_ENTRIES = int(os.environ.get("TOPIC_METADATA_CACHE_MAX_ENTRIES", 10000))
+TOPIC_METADATA_CACHE_TTL_SECS = int(os.environ.get("TOPIC_METADATA_CACHE_TTL_SECS", 5 * 60))
+# in memory catalog of the published news topics, refreshed in the background
+TOPIC_CATALOG_REFRESH_INTERVAL_SECS = int(
+    os.environ.get("TOPIC_CATALOG_REFRESH_INTERVAL_SECS", 5 * 60)
+)
+# number of DynamoDB batch write requests (of up to 25 items each) sent concurrently
+DYNAMODB_BATCH_WRITE_CONCURRENCY = int(os.environ.get("DYNAMODB_BATCH_WRITE_CONCURRENCY", 4))
+# shared (process wide) caches of the preview users looked up on login (found and not found)
+LOGIN_USER_CACHE_MAX_ENTRIES = int(os.environ.get("LOGIN_USER_CACHE_MAX_ENTRIES", 10000))
+LOGIN_USER_CACHE_TTL_SECS = int(os.environ.get("LOGIN_USER_CACHE_TTL_SECS", 5 * 60))
+LOGIN_UNKNOWN_USER_CACHE_TTL_SECS = int(os.environ.get("LOGIN_UNKNOWN_USER_CACHE_TTL_SECS", 60))
+# login attempts allowed per client in a sliding window. clients are told apart by the peer address
+# of their connection or, behind proxies (e.g. a load balancer), by the address the outermost of the
+# trusted proxy hops received the request from, read from the right of X-Forwarded-For. the
+# addresses left of it are set by the client and never trusted, so the number of hops must match
+# the deployment: with too many a client can pick its own ip, with 0 behind a proxy all the clients
+# share the proxy's address
+LOGIN_RATE_LIMIT_MAX_ATTEMPTS = int(os.environ.get("LOGIN_RATE_LIMIT_MAX_ATTEMPTS", 10))
+LOGIN_RATE_LIMIT_WINDOW_SECS = int(os.environ.get("LOGIN_RATE_LIMIT_WINDOW_SECS", 60))
+LOGIN_RATE_LIMIT_TRUSTED_PROXY_HOPS = int(os.environ.get("LOGIN_RATE_LIMIT_TRUSTED_PROXY_HOPS", 0))
+# background (write behind) queue of the writes the user doesn't need to wait on
+WRITE_BEHIND_QUEUE_MAX_SIZE = int(os.environ.get("WRITE_BEHIND_QUEUE_MAX_SIZE", 10000))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.environ.get("WRITE_BEHIND_MAX_ATTEMPTS", 3))
+# buffer of the news topic suggestions, deduplicated and written in batches
+TOPIC_SUGGESTIONS_FLUSH_MAX_ITEMS = int(os.environ.get("TOPIC_SUGGESTIONS_FLUSH_MAX_ITEMS", 25))
+TOPIC_SUGGESTIONS_FLUSH_INTERVAL_SECS = int(
+    os.environ.get("TOPIC_SUGGESTIONS_FLUSH_INTERVAL_SECS", 10)
+)
+TOPIC_SUGGESTIONS_DEDUPE_WINDOW_SECS = int(
+    os.environ.get("TOPIC_SUGGESTIONS_DEDUPE_WINDOW_SECS", 60 * 60)
+)
+# in process aggregation of the metrics, flushed in batches to the sinks (comma separated:
+# cloudwatch, emf and/or file) from a background thread
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ["true"]
+METRICS_FLUSH_INTERVAL_SECS = int(os.environ.get("METRICS_FLUSH_INTERVAL_SECS", 60))
+METRICS_SINKS = os.environ.get("METRICS_SINKS", "cloudwatch")
+# the file sink (and the cloudwatch sink when testing locally) appends to it, outside of the checkout
+METRICS_FILE_PATH = os.environ.get(
+    "METRICS_FILE_PATH", os.path.join(tempfile.gettempdir(), "the_daily_bite_metrics.jsonl")
+)
+# lambda invocations: concurrency, attempts (with exponential backoff and jitter) and timeout
+LAMBDA_INVOKE_MAX_CONCURRENCY = int(os.environ.get("LAMBDA_INVOKE_MAX_CONCURRENCY", 10))
+LAMBDA_INVOKE_MAX_ATTEMPTS = int(os.environ.get("LAMBDA_INVOKE_MAX_ATTEMPTS", 3))
+LAMBDA_INVOKE_BASE_BACKOFF_SECS = float(os.environ.get("LAMBDA_INVOKE_BASE_BACKOFF_SECS", 0.2))
+LAMBDA_INVOKE_TIMEOUT_SECS = int(os.environ.get("LAMBDA_INVOKE_TIMEOUT_SECS", 30))
+# logging: records handed to a queue drained by a background thread, json formatted output
+# (json or text) and sampling of the info and debug records of each logger (0 for no sampling)
+LOG_ASYNC_ENABLED = os.environ.get("LOG_ASYNC_ENABLED", "false").lower() in ["true"]
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_SAMPLING_MAX_RECORDS_PER_SEC = float(os.environ.get("LOG_SAMPLING_MAX_RECORDS_PER_SEC", 0))
+# the /debug routes serving the latency, state size, state store and cache statistics. they are only
+# served when a token is set, to the requests with an "Authorization: Bearer <token>" header
+DEBUG_ROUTES_TOKEN = os.environ.get("DEBUG_ROUTES_TOKEN", "")
+# latency histograms of the event handlers, logged every interval (0 to never log them)
+EVENT_LATENCY_ENABLED = os.environ.get("EVENT_LATENCY_ENABLED", "true").lower() in ["true"]
+EVENT_LATENCY_LOG_INTERVAL_SECS = int(os.environ.get("EVENT_LATENCY_LOG_INTERVAL_SECS", 5 * 60))
+# sizes of the state deltas sent for each event handler and of the full state of the handler's
+# state (measured every <sample rate> events of a handler), warned about when over budget.
+# <handler>: <bytes> overrides the delta budget of specific handlers
+# (e.g. {"state.base_state.newspaper_state.on_load_newspaper": 1048576}).
+# off by default since every delta is serialized once more to be measured
+STATE_SIZE_ENABLED = os.environ.get("STATE_SIZE_ENABLED", "false").lower() in ["true"]
+STATE_SIZE_DELTA_BUDGET_BYTES = int(os.environ.get("STATE_SIZE_DELTA_BUDGET_BYTES", 256 * 1024))
+STATE_SIZE_HANDLER_DELTA_BUDGETS = {
+    handler: int(budget_bytes)
+    for handler, budget_bytes in json.loads(
+        os.environ.get("STATE_SIZE_HANDLER_DELTA_BUDGETS", "{}")
+    ).items()
+}
+STATE_SIZE_STATE_BUDGET_BYTES = int(
+    os.environ.get("STATE_SIZE_STATE_BUDGET_BYTES", 2 * 1024 * 1024)
+)
+STATE_SIZE_STATE_SAMPLE_RATE = int(os.environ.get("STATE_SIZE_STATE_SAMPLE_RATE", 10))
+STATE_SIZE_LOG_INTERVAL_SECS = int(os.environ.get("STATE_SIZE_LOG_INTERVAL_SECS", 5 * 60))
+# the summaries served by the summaries api. the urls handed out are signed so that only summary refs
+# are served; the key is required (except when testing locally) and must be the same on every
+# instance so that the urls, and the caches in front of them, are shared across workers and restarts.
+# summaries never change for a given ref so they are cached for a year by default
+SUMMARY_URL_SIGNING_KEY = os.environ.get("SUMMARY_URL_SIGNING_KEY", "")
+SUMMARY_HTTP_CACHE_MAX_AGE_SECS = int(
+    os.environ.get("SUMMARY_HTTP_CACHE_MAX_AGE_SECS", 365 * 24 * 60 * 60)
+)
+# the static site built from the exported frontend (see static_site.py) with the public routes,
+# served with long lived caching and precompressed without going through the backend
+STATIC_SITE_ROUTES = os.environ.get("STATIC_SITE_ROUTES", "/,/login,/404").split(",")
+STATIC_SITE_EXPORT_DIR = os.environ.get("STATIC_SITE_EXPORT_DIR", ".web/_static")
+STATIC_SITE_OUTPUT_DIR = os.environ.get("STATIC_SITE_OUTPUT_DIR", "static_site")
+STATIC_SITE_HTML_MAX_AGE_SECS = int(os.environ.get("STATIC_SITE_HTML_MAX_AGE_SECS", 5 * 60))
+# the per session state kept in redis (redis://<host>:<port>/<db>) so that any backend worker can
+# serve any session and sessions survive restarts. "local" keeps it in an in process stand-in (for
+# tests and development) and an empty url in reflex's in memory state manager. snapshots of the state
+# over the compression threshold are zlib compressed
+STATE_REDIS_URL = os.environ.get("STATE_REDIS_URL", "")
+STATE_REDIS_EXPIRATION_SECS = int(os.environ.get("STATE_REDIS_EXPIRATION_SECS", 24 * 60 * 60))
+STATE_REDIS_COMPRESS_MIN_BYTES = int(os.environ.get("STATE_REDIS_COMPRESS_MIN_BYTES", 1024))
+STATE_REDIS_LOG_INTERVAL_SECS = int(os.environ.get("STATE_REDIS_LOG_INTERVAL_SECS", 5 * 60))
@@ -8,5 +8,7 @@ INDEX_PATH = "/"
 NEWSPAPER_PATH = "/newspaper"
 NEWS_TOPICS_PATH = "/news-topics"
 NEWSLETTER_PATH = "/newsletter"
+# the backend api route serving the summary texts
+SUMMARIES_API_PATH = "/summaries"
 DEFAULT_TITLE_SUFFIX = " | The Daily Bite: informative, bite-sized news."
 TITLE = "{page_name}%s" % DEFAULT_TITLE_SUFFIX
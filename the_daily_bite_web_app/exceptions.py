@@ -8,3 +8,39 @@ class InvokeFunctionException(Exception):
 
     def __str__(self):
         return self.message
+
+
+class MissingConfigurationException(Exception):
+    def __init__(self, setting: str, message: str = ""):
+        if not message:
+            self.message = f"{setting} must be set."
+        else:
+            self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+
+class StaleArticlesCursorException(Exception):
+    def __init__(self, topic_id: str, message: str = ""):
+        if not message:
+            self.message = f"The index cursor of topic {topic_id} can no longer be served."
+        else:
+            self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+
+class StateSchemaMismatchException(Exception):
+    def __init__(self, message: str = ""):
+        if not message:
+            self.message = "The state snapshot was stored with other models than the current ones."
+        else:
+            self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
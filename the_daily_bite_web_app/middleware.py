@@ -1,6 +1,31 @@
 """Application middleware."""
 
+from typing import Dict, Tuple
+
+import hmac
+import time
+
 import reflex as rx
+from fastapi import HTTPException, Request
+
+from the_daily_bite_web_app.config import (
+    DEBUG_ROUTES_TOKEN,
+    EVENT_LATENCY_ENABLED,
+    EVENT_LATENCY_LOG_INTERVAL_SECS,
+    STATE_SIZE_DELTA_BUDGET_BYTES,
+    STATE_SIZE_ENABLED,
+    STATE_SIZE_HANDLER_DELTA_BUDGETS,
+    STATE_SIZE_LOG_INTERVAL_SECS,
+    STATE_SIZE_STATE_BUDGET_BYTES,
+    STATE_SIZE_STATE_SAMPLE_RATE,
+)
+from the_daily_bite_web_app.state_manager import state_store_latencies, state_store_sizes
+from the_daily_bite_web_app.utils.cache import cache_stats
+from the_daily_bite_web_app.utils.latency import LatencyHistograms
+from the_daily_bite_web_app.utils.state_size import SizeTracker, serialized_size
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
+
+logger = setup_logger(__name__)
 
 
 class CloseSidebarMiddleware(rx.Middleware):
@@ -17,3 +42,199 @@ class CloseSidebarMiddleware(rx.Middleware):
         if event.name == rx.event.get_hydrate_event(state):
             state.get_substate(["navbar_state"]).sidebar_open = False
             state.get_substate(["index_state"]).show_c2a = True
+
+
+# <id of the event being processed>: (<start time>, <time of the last update>)
+_event_timings: Dict[int, Tuple[float, float]] = {}
+# events short circuited by a middleware preprocess never reach postprocess so the timings of the
+# events in progress are bounded
+_MAX_EVENT_TIMINGS = 10000
+
+event_latency_histograms = LatencyHistograms(
+    "event_handler", log_interval_secs=EVENT_LATENCY_LOG_INTERVAL_SECS
+)
+
+
+class EventLatencyMiddleware(rx.Middleware):
+    """Middleware recording the latency of every event handler in per handler histograms.
+
+    Each handler gets an end to end histogram, from the event being received to its final update,
+    and a "<handler>:update" histogram of the time to each of its updates (i.e. between yields).
+    """
+
+    def preprocess(self, app, state, event):
+        """Start timing the event.
+
+        Args:
+            app: The app to apply the middleware to.
+            state: The client state.
+            event: The event to preprocess.
+        """
+        if len(_event_timings) >= _MAX_EVENT_TIMINGS:
+            _event_timings.pop(next(iter(_event_timings)))
+        now = time.perf_counter()
+        _event_timings[id(event)] = (now, now)
+
+    def postprocess(self, app, state, event, update):
+        """Record the time to the update and, on the final update, the end to end latency.
+
+        Args:
+            app: The app to apply the middleware to.
+            state: The client state.
+            event: The event to postprocess.
+            update: The current state update.
+        """
+        timings = _event_timings.get(id(event))
+        if timings is None:
+            return
+        started_at, last_update_at = timings
+        now = time.perf_counter()
+        event_latency_histograms.record(f"{event.name}:update", (now - last_update_at) * 1000)
+        if update.final:
+            _event_timings.pop(id(event), None)
+            latency_ms = (now - started_at) * 1000
+            event_latency_histograms.record(event.name, latency_ms)
+            metrics.record(
+                "EventHandlerLatency",
+                latency_ms,
+                dimensions={"Handler": event.name},
+                unit="Milliseconds",
+            )
+        else:
+            _event_timings[id(event)] = (started_at, now)
+
+
+# the sizes of the deltas sent for each event handler, of the deltas of each state and of the full
+# state of the handlers' states
+event_delta_sizes = SizeTracker("event_delta", log_interval_secs=STATE_SIZE_LOG_INTERVAL_SECS)
+state_delta_sizes = SizeTracker("state_delta", log_interval_secs=STATE_SIZE_LOG_INTERVAL_SECS)
+state_sizes = SizeTracker("state", log_interval_secs=STATE_SIZE_LOG_INTERVAL_SECS)
+# <event handler>: <number of events processed> to measure the full state every sample rate events
+_state_size_sample_counts: Dict[str, int] = {}
+
+
+class StateSizeMiddleware(rx.Middleware):
+    """Middleware measuring the size of the state sent to the frontend by every event handler.
+
+    The delta of each update is measured per handler and per state, and the full state of the
+    handler's state once every STATE_SIZE_STATE_SAMPLE_RATE events of the handler since serializing
+    it is as expensive as a hydration. Sizes over their budget are logged as warnings and counted.
+    """
+
+    def postprocess(self, app, state, event, update):
+        """Measure the delta of the update and, on the final update, sample the full state size.
+
+        Args:
+            app: The app to apply the middleware to.
+            state: The client state.
+            event: The event to postprocess.
+            update: The current state update.
+        """
+        delta_bytes = 0
+        for state_name, state_delta in update.delta.items():
+            state_delta_bytes = serialized_size(state_delta)
+            state_delta_sizes.record(state_name, state_delta_bytes)
+            delta_bytes += state_delta_bytes
+        event_delta_sizes.record(event.name, delta_bytes)
+        metrics.record(
+            "EventDeltaSize", delta_bytes, dimensions={"Handler": event.name}, unit="Bytes"
+        )
+        delta_budget_bytes = STATE_SIZE_HANDLER_DELTA_BUDGETS.get(
+            event.name, STATE_SIZE_DELTA_BUDGET_BYTES
+        )
+        if delta_bytes > delta_budget_bytes:
+            logger.warning(
+                "The delta sent by %s is %d bytes, over its budget of %d bytes",
+                event.name,
+                delta_bytes,
+                delta_budget_bytes,
+            )
+            metrics.increment(
+                "StateSizeBudgetExceeded", dimensions={"Handler": event.name, "Size": "delta"}
+            )
+        if not update.final:
+            return
+        sample_count = _state_size_sample_counts.get(event.name, 0)
+        _state_size_sample_counts[event.name] = sample_count + 1
+        if sample_count % max(STATE_SIZE_STATE_SAMPLE_RATE, 1):
+            return
+        handler_state = state.get_substate(event.name.split(".")[:-1])
+        state_bytes = serialized_size(handler_state.dict(include_computed=False))
+        state_sizes.record(handler_state.get_full_name(), state_bytes)
+        metrics.record(
+            "StateSize",
+            state_bytes,
+            dimensions={"State": handler_state.get_full_name()},
+            unit="Bytes",
+        )
+        if state_bytes > STATE_SIZE_STATE_BUDGET_BYTES:
+            logger.warning(
+                "The state %s is %d bytes after %s, over its budget of %d bytes",
+                handler_state.get_full_name(),
+                state_bytes,
+                event.name,
+                STATE_SIZE_STATE_BUDGET_BYTES,
+            )
+            metrics.increment(
+                "StateSizeBudgetExceeded", dimensions={"Handler": event.name, "Size": "state"}
+            )
+
+
+def add_app_middleware(app: rx.App):
+    """Add the middleware of the application to the app.
+
+    Reflex stops postprocessing an update at the first middleware returning one, which the
+    middleware only defining a preprocess (and the app's hydrate middleware) do, so the middleware
+    observing the updates are added before them.
+
+    Args:
+        app: The app to add the middleware to.
+    """
+    app.add_middleware(CloseSidebarMiddleware(), index=0)
+    if STATE_SIZE_ENABLED:
+        app.add_middleware(StateSizeMiddleware(), index=0)
+    if EVENT_LATENCY_ENABLED:
+        # first so that the time spent in the other middleware is included
+        app.add_middleware(EventLatencyMiddleware(), index=0)
+
+
+def _is_authorized_request(request: Request) -> bool:
+    # behind a proxy every request comes from a local address, so a token is required instead
+    if not DEBUG_ROUTES_TOKEN:
+        return False
+    return hmac.compare_digest(
+        request.headers.get("authorization", "").encode("utf-8"),
+        f"Bearer {DEBUG_ROUTES_TOKEN}".encode("utf-8"),
+    )
+
+
+async def event_latency(request: Request):
+    """Get the latency percentiles of each event handler, slowest first. Requires the debug routes token."""
+    if not _is_authorized_request(request):
+        raise HTTPException(status_code=403)
+    return event_latency_histograms.summaries()
+
+
+async def state_size(request: Request):
+    """Get the delta and full state sizes by event handler and state, largest first. Requires the debug routes token."""
+    if not _is_authorized_request(request):
+        raise HTTPException(status_code=403)
+    return {
+        "event_deltas": event_delta_sizes.summaries(),
+        "state_deltas": state_delta_sizes.summaries(),
+        "states": state_sizes.summaries(),
+    }
+
+
+async def state_store(request: Request):
+    """Get the serialization and redis latencies and the stored sizes of the session states. Requires the debug routes token."""
+    if not _is_authorized_request(request):
+        raise HTTPException(status_code=403)
+    return {"latencies": state_store_latencies.summaries(), "sizes": state_store_sizes.summaries()}
+
+
+async def caches(request: Request):
+    """Get the hit/miss statistics and sizes of the shared caches. Requires the debug routes token."""
+    if not _is_authorized_request(request):
+        raise HTTPException(status_code=403)
+    return cache_stats()
@@ -27,27 +27,40 @@ def to_ui_newspaper_date_section(article_publishing_date: str, idx: int):
 def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
     title: str = newspaper_article.title
     published_dt: str = newspaper_article.published_on_dt
+    # the summarization length shown; empty when the article is not open
+    show_length: str = NewspaperState.article_show_lengths[newspaper_article.article_id]
+    summary_url: str = NewspaperState.article_summary_urls[newspaper_article.article_id]
     read_article_button_component: rx.Component = rx.center(
         rx.button(
             "Read Article",
             on_click=[
-                NewspaperState.set_show_article_property(newspaper_article, True),
-                NewspaperState.set_show_length_property(newspaper_article),
-                NewspaperState.populate_article_text(newspaper_article),
+                NewspaperState.set_show_article_property(
+                    newspaper_article.topic_id, newspaper_article.article_id, True
+                ),
+                NewspaperState.set_show_length_property(
+                    newspaper_article.topic_id, newspaper_article.article_id
+                ),
+                NewspaperState.populate_article_text(
+                    newspaper_article.topic_id, newspaper_article.article_id
+                ),
             ],
             **styles.BUTTON_LIGHT_NO_BACKGROUND,
         )
     )
     article_length_buttons: rx.Component = rx.flex(
         rx.cond(
-            newspaper_article.show_short_summary_text,
+            show_length == SummarizationLength.SHORT.value,
             rx.button(
                 "Short",
                 on_click=[
                     NewspaperState.set_show_length_property(
-                        newspaper_article, SummarizationLength.SHORT.value
+                        newspaper_article.topic_id,
+                        newspaper_article.article_id,
+                        SummarizationLength.SHORT.value,
+                    ),
+                    NewspaperState.populate_article_text(
+                        newspaper_article.topic_id, newspaper_article.article_id
                     ),
-                    NewspaperState.populate_article_text(newspaper_article),
                 ],
                 **styles.BUTTON_LIGHT_SELECTED,
                 margin_bottom=["0.25em", "0.25em", "0.25em", "0em", "0em", "0em"],
@@ -57,9 +70,13 @@ def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
                 "Short",
                 on_click=[
                     NewspaperState.set_show_length_property(
-                        newspaper_article, SummarizationLength.SHORT.value
+                        newspaper_article.topic_id,
+                        newspaper_article.article_id,
+                        SummarizationLength.SHORT.value,
+                    ),
+                    NewspaperState.populate_article_text(
+                        newspaper_article.topic_id, newspaper_article.article_id
                     ),
-                    NewspaperState.populate_article_text(newspaper_article),
                 ],
                 **styles.BUTTON_LIGHT_NO_BACKGROUND,
                 margin_bottom=["0.25em", "0.25em", "0.25em", "0em", "0em", "0em"],
@@ -67,14 +84,18 @@ def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
             ),
         ),
         rx.cond(
-            newspaper_article.show_medium_summary_text,
+            show_length == SummarizationLength.MEDIUM.value,
             rx.button(
                 "Medium",
                 on_click=[
                     NewspaperState.set_show_length_property(
-                        newspaper_article, SummarizationLength.MEDIUM.value
+                        newspaper_article.topic_id,
+                        newspaper_article.article_id,
+                        SummarizationLength.MEDIUM.value,
+                    ),
+                    NewspaperState.populate_article_text(
+                        newspaper_article.topic_id, newspaper_article.article_id
                     ),
-                    NewspaperState.populate_article_text(newspaper_article),
                 ],
                 **styles.BUTTON_LIGHT_SELECTED,
                 margin_bottom=["0.25em", "0.25em", "0.25em", "0em", "0em", "0em"],
@@ -84,9 +105,13 @@ def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
                 "Medium",
                 on_click=[
                     NewspaperState.set_show_length_property(
-                        newspaper_article, SummarizationLength.MEDIUM.value
+                        newspaper_article.topic_id,
+                        newspaper_article.article_id,
+                        SummarizationLength.MEDIUM.value,
+                    ),
+                    NewspaperState.populate_article_text(
+                        newspaper_article.topic_id, newspaper_article.article_id
                     ),
-                    NewspaperState.populate_article_text(newspaper_article),
                 ],
                 **styles.BUTTON_LIGHT_NO_BACKGROUND,
                 margin_bottom=["0.25em", "0.25em", "0.25em", "0em", "0em", "0em"],
@@ -94,14 +119,18 @@ def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
             ),
         ),
         rx.cond(
-            newspaper_article.show_full_summary_text,
+            show_length == SummarizationLength.FULL.value,
             rx.button(
                 "Full",
                 on_click=[
                     NewspaperState.set_show_length_property(
-                        newspaper_article, SummarizationLength.FULL.value
+                        newspaper_article.topic_id,
+                        newspaper_article.article_id,
+                        SummarizationLength.FULL.value,
+                    ),
+                    NewspaperState.populate_article_text(
+                        newspaper_article.topic_id, newspaper_article.article_id
                     ),
-                    NewspaperState.populate_article_text(newspaper_article),
                 ],
                 **styles.BUTTON_LIGHT_SELECTED,
                 margin_bottom=["0.25em", "0.25em", "0.25em", "0em", "0em", "0em"],
@@ -111,9 +140,13 @@ def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
                 "Full",
                 on_click=[
                     NewspaperState.set_show_length_property(
-                        newspaper_article, SummarizationLength.FULL.value
+                        newspaper_article.topic_id,
+                        newspaper_article.article_id,
+                        SummarizationLength.FULL.value,
+                    ),
+                    NewspaperState.populate_article_text(
+                        newspaper_article.topic_id, newspaper_article.article_id
                     ),
-                    NewspaperState.populate_article_text(newspaper_article),
                 ],
                 **styles.BUTTON_LIGHT_NO_BACKGROUND,
                 margin_bottom=["0.25em", "0.25em", "0.25em", "0em", "0em", "0em"],
@@ -122,7 +155,11 @@ def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
         ),
         rx.button(
             "Hide",
-            on_click=[NewspaperState.set_show_article_property(newspaper_article, False)],
+            on_click=[
+                NewspaperState.set_show_article_property(
+                    newspaper_article.topic_id, newspaper_article.article_id, False
+                )
+            ],
             **styles.BUTTON_LIGHT_NO_BACKGROUND,
             margin_bottom=["0.25em", "0.25em", "0.25em", "0em", "0em", "0em"],
             margin_right=["0em", "0em", "0em", "0.25em", "0.25em", "0.25em"],
@@ -136,24 +173,18 @@ def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
         rx.divider(),
         rx.box(
             rx.cond(
-                newspaper_article.show_article,
-                rx.cond(
-                    newspaper_article.show_short_summary_text,
-                    rx.html(newspaper_article.short_summary_text, element="p"),
-                ),
-            ),
-            rx.cond(
-                newspaper_article.show_article,
-                rx.cond(
-                    newspaper_article.show_medium_summary_text,
-                    rx.html(newspaper_article.medium_summary_text, element="p"),
-                ),
-            ),
-            rx.cond(
-                newspaper_article.show_article,
-                rx.cond(
-                    newspaper_article.show_full_summary_text,
-                    rx.html(newspaper_article.full_summary_text, element="p"),
+                summary_url,
+                # loaded by the browser from the summaries api, which browsers and CDNs cache
+                # scripts only run to post the height of the text, sized to by SUMMARY_FRAMES_SCRIPT;
+                # without allow-same-origin the document has no access to the api's origin
+                rx.el.iframe(
+                    src=summary_url,
+                    title=title,
+                    loading="lazy",
+                    sandbox="allow-scripts",
+                    width="100%",
+                    height="12em",
+                    border="none",
                 ),
             ),
             padding="1em",
@@ -175,7 +206,7 @@ def to_ui_article(newspaper_article: NewsArticle) -> rx.Component:
             ),
             rx.vstack(
                 rx.cond(
-                    newspaper_article.show_article,
+                    show_length,
                     article_length_buttons,
                     read_article_button_component,
                 ),
@@ -278,6 +309,19 @@ def option_menus():
     )
 
 
+# sizes the summary iframes of the article cards to the height their document posts
+SUMMARY_FRAMES_SCRIPT = """
+window.addEventListener("message", (event) => {
+  if (typeof event.data?.summaryHeight !== "number") return;
+  for (const frame of document.getElementsByTagName("iframe")) {
+    if (frame.contentWindow === event.source) {
+      frame.style.height = `${event.data.summaryHeight}px`;
+    }
+  }
+});
+"""
+
+
 @webpage(path=NEWSPAPER_PATH, title=TITLE.format(page_name="Newspaper"))
 def newspaper() -> rx.Component:
     """Get the news topics page."""
@@ -295,6 +339,7 @@ def newspaper() -> rx.Component:
                     topic_newspaper(),
                 ),
             ),
+            rx.script(SUMMARY_FRAMES_SCRIPT, id="summary-frames"),
             margin="1rem",
         ),
     )
@@ -0,0 +1,334 @@
+"""
+A state manager keeping the state of each session in redis, so that any backend worker can serve it.
+
+Rather than pickling the whole state tree (its handlers, computed vars and parent links included),
+only the values of the base and backend vars of each state are stored, as a pickle of plain lists,
+dicts and models, zlib compressed when over STATE_REDIS_COMPRESS_MIN_BYTES. The router data is not
+stored as it is set again from every event. States are rebuilt from their class and these values,
+so deploys adding or removing vars keep the sessions, with the new vars at their defaults.
+
+The models held by the vars (e.g. the newspaper's articles) are pickled with their fields though, so
+every snapshot carries a digest of the fields of these models. The sessions stored before a deploy
+changing them are dropped rather than restored into models of another shape.
+
+The time spent serializing, deserializing, reading and writing the state and the size stored per
+session are tracked and served by /debug/state-store.
+"""
+
+import typing
+from typing import Any, Dict, Iterator, Optional, Set, Tuple, Type
+
+import hashlib
+import pickle
+import threading
+import time
+import zlib
+
+import pydantic
+import reflex as rx
+from redis import Redis
+from reflex import constants
+from reflex.state import State, StateManager
+
+from the_daily_bite_web_app.config import (
+    STATE_REDIS_COMPRESS_MIN_BYTES,
+    STATE_REDIS_EXPIRATION_SECS,
+    STATE_REDIS_LOG_INTERVAL_SECS,
+    STATE_REDIS_URL,
+)
+from the_daily_bite_web_app.exceptions import StateSchemaMismatchException
+from the_daily_bite_web_app.utils.cache import LRUCache
+from the_daily_bite_web_app.utils.latency import LatencyHistograms
+from the_daily_bite_web_app.utils.state_size import SizeTracker
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
+
+logger = setup_logger(__name__)
+
+LOCAL_REDIS_URL = "local"
+STATE_KEY_PREFIX = "state:"
+# the first byte of a stored snapshot: the format of the rest of it
+_PICKLE_FORMAT = b"\x01"
+_ZLIB_PICKLE_FORMAT = b"\x02"
+# the length of the digest of the models' fields following the format byte
+_SCHEMA_VERSION_LENGTH = 8
+
+# the serialization, deserialization, read and write latencies and the sizes of the snapshots,
+# before ("snapshot") and after ("stored") compression
+state_store_latencies = LatencyHistograms(
+    "state_store", log_interval_secs=STATE_REDIS_LOG_INTERVAL_SECS
+)
+state_store_sizes = SizeTracker("state_store", log_interval_secs=STATE_REDIS_LOG_INTERVAL_SECS)
+# <token>: <digest of the snapshot last read or written> to skip writing back unchanged states
+_snapshot_digests = LRUCache("state_snapshot_digests", max_entries=10000)
+
+
+class LocalRedis:
+    """An in process stand-in for the few redis commands the state manager uses."""
+
+    def __init__(self):
+        # <key>: (<value>, <expires at monotonic time or None>)
+        self._entries: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def expire(self, key: str, time_secs: int) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            self._entries[key] = (entry[0], time.monotonic() + time_secs)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._entries.pop(key, None) is not None for key in keys)
+
+
+def _plain(value: Any) -> Any:
+    # the lists and dicts of the state are wrapped to track their mutations, with a reference back
+    # to their state; they are stored as plain lists and dicts
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def _iter_states(state: State) -> Iterator[State]:
+    yield state
+    for substate in state.substates.values():
+        yield from _iter_states(substate)
+
+
+def _model_classes(type_: Any, seen: Set[type]) -> Iterator[type]:
+    # the models in a var annotation (e.g. Dict[str, List[NewsArticle]]) and the models of their fields
+    if (
+        isinstance(type_, type)
+        and issubclass(type_, pydantic.BaseModel)
+        and not issubclass(type_, State)
+        and type_ not in seen
+    ):
+        seen.add(type_)
+        yield type_
+        for field in type_.__fields__.values():
+            yield from _model_classes(field.outer_type_, seen)
+    for arg in typing.get_args(type_):
+        yield from _model_classes(arg, seen)
+
+
+def models_schema_version(state: State) -> bytes:
+    """
+    Gets a digest of the fields of the models held by the vars of a state and its substates.
+
+    :param state: A root state.
+    :return: The digest, which changes when a field of these models is added, removed or retyped.
+    """
+    seen: Set[type] = set()
+    fields = set()
+    for substate in _iter_states(state):
+        for annotation in vars(type(substate)).get("__annotations__", {}).values():
+            for model in _model_classes(annotation, seen):
+                fields.update(
+                    f"{model.__module__}.{model.__qualname__}.{name}: {field.outer_type_}"
+                    for name, field in model.__fields__.items()
+                )
+    return hashlib.sha256("\n".join(sorted(fields)).encode("utf-8")).digest()[
+        :_SCHEMA_VERSION_LENGTH
+    ]
+
+
+def snapshot_state(state: State) -> Dict[str, Dict[str, Any]]:
+    """
+    Gets the values of the vars of a state and its substates.
+
+    :param state: The root state of a session.
+    :return: The full name of each state to the values of its own base and backend vars.
+    """
+    snapshot = {}
+    for substate in _iter_states(state):
+        values = {
+            name: _plain(getattr(substate, name))
+            for name in substate.base_vars
+            if name not in substate.inherited_vars and name != constants.ROUTER_DATA
+        }
+        values.update(
+            (name, _plain(value))
+            for name, value in substate._backend_vars.items()
+            if name not in substate.inherited_backend_vars
+        )
+        snapshot[substate.get_full_name()] = values
+    return snapshot
+
+
+def restore_state(state: State, snapshot: Dict[str, Dict[str, Any]]) -> State:
+    """
+    Sets the values of the vars of a state and its substates from a snapshot.
+
+    The states and vars of the snapshot which no longer exist are ignored.
+
+    :param state: A new root state.
+    :param snapshot: The snapshot taken by snapshot_state.
+    :return: The state, with no dirty vars.
+    """
+    for full_name, values in snapshot.items():
+        try:
+            substate = state.get_substate(full_name.split("."))
+        except ValueError:
+            continue
+        for name, value in values.items():
+            if name in substate.base_vars:
+                setattr(substate, name, value)
+            elif name in substate.backend_vars:
+                substate._backend_vars[name] = value
+    state.clean()
+    return state
+
+
+def encode_snapshot(snapshot: Dict[str, Dict[str, Any]], schema_version: bytes) -> bytes:
+    """
+    Serializes a snapshot, compressing it when over STATE_REDIS_COMPRESS_MIN_BYTES.
+
+    :param snapshot: The snapshot taken by snapshot_state.
+    :param schema_version: The digest of the models' fields, from models_schema_version.
+    :return: The format, the schema version and the serialized snapshot.
+    """
+    pickled = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+    state_store_sizes.record("snapshot", len(pickled))
+    if len(pickled) >= STATE_REDIS_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(pickled)
+        if len(compressed) < len(pickled):
+            return _ZLIB_PICKLE_FORMAT + schema_version + compressed
+    return _PICKLE_FORMAT + schema_version + pickled
+
+
+def decode_snapshot(stored: bytes, schema_version: bytes) -> Dict[str, Dict[str, Any]]:
+    """
+    Deserializes a snapshot serialized by encode_snapshot.
+
+    :param stored: The serialized snapshot.
+    :param schema_version: The digest of the current models' fields, from models_schema_version.
+    :return: The snapshot.
+    :raises StateSchemaMismatchException: When the snapshot was stored with other models' fields.
+    """
+    if stored[:1] not in [_PICKLE_FORMAT, _ZLIB_PICKLE_FORMAT]:
+        raise ValueError(f"Unknown state snapshot format {stored[:1]!r}")
+    if stored[1 : 1 + _SCHEMA_VERSION_LENGTH] != schema_version:
+        raise StateSchemaMismatchException()
+    pickled = stored[1 + _SCHEMA_VERSION_LENGTH :]
+    if stored[:1] == _ZLIB_PICKLE_FORMAT:
+        pickled = zlib.decompress(pickled)
+    return pickle.loads(pickled)
+
+
+def _elapsed_ms(started_at: float) -> float:
+    return (time.perf_counter() - started_at) * 1000
+
+
+class RedisStateManager(StateManager):
+    """A state manager keeping the state of each session in redis as a compact snapshot.
+
+    The redis client is created from STATE_REDIS_URL on setup. Two events of the same session
+    processed at the same time by different workers are not serialized: the last to finish
+    overwrites the state written by the other, as with reflex's own redis support.
+    """
+
+    def setup(self, state: Type[State]):
+        """Set up the state manager.
+
+        Args:
+            state: The state class to use.
+        """
+        self.state = state
+        self.token_expiration = STATE_REDIS_EXPIRATION_SECS
+        self.schema_version = models_schema_version(state())
+        if STATE_REDIS_URL == LOCAL_REDIS_URL:
+            self.redis = LocalRedis()  # type: ignore
+        else:
+            self.redis = Redis.from_url(STATE_REDIS_URL)
+        logger.info("Keeping the session states in redis at %s", STATE_REDIS_URL)
+
+    def get_state(self, token: str) -> State:
+        """Get the state of a session, a new one if it has none stored or it can't be read.
+
+        Args:
+            token: The token of the session.
+
+        Returns:
+            The state of the session.
+        """
+        started_at = time.perf_counter()
+        stored = self.redis.get(STATE_KEY_PREFIX + token)
+        state_store_latencies.record("read", _elapsed_ms(started_at))
+        state = self.state()
+        if stored is None:
+            return state
+        started_at = time.perf_counter()
+        try:
+            restore_state(state, decode_snapshot(stored, self.schema_version))
+        except StateSchemaMismatchException as e:
+            logger.info("Dropping the state of a session: %s", e)
+            metrics.increment("StateStoreSchemaMismatch")
+            return state
+        except Exception as e:
+            logger.error("Error restoring the state of a session: %s", e, exc_info=True)
+            metrics.increment("StateStoreRestoreError")
+            return self.state()
+        deserialize_ms = _elapsed_ms(started_at)
+        state_store_latencies.record("deserialize", deserialize_ms)
+        metrics.record(
+            "StateStoreSerializationTime",
+            deserialize_ms,
+            dimensions={"Operation": "deserialize"},
+            unit="Milliseconds",
+        )
+        _snapshot_digests.set(token, hashlib.sha256(stored).digest())
+        return state
+
+    def set_state(self, token: str, state: State):
+        """Store the state of a session, only refreshing its expiration when it is unchanged.
+
+        Args:
+            token: The token of the session.
+            state: The state of the session.
+        """
+        started_at = time.perf_counter()
+        stored = encode_snapshot(snapshot_state(state), self.schema_version)
+        serialize_ms = _elapsed_ms(started_at)
+        state_store_latencies.record("serialize", serialize_ms)
+        metrics.record(
+            "StateStoreSerializationTime",
+            serialize_ms,
+            dimensions={"Operation": "serialize"},
+            unit="Milliseconds",
+        )
+        state_store_sizes.record("stored", len(stored))
+        metrics.record("StateStoredSize", len(stored), unit="Bytes")
+        digest = hashlib.sha256(stored).digest()
+        started_at = time.perf_counter()
+        if _snapshot_digests.get(token, record_stats=False) == digest:
+            self.redis.expire(STATE_KEY_PREFIX + token, self.token_expiration)
+            metrics.increment("StateStoreUnchangedWrite")
+        else:
+            self.redis.set(STATE_KEY_PREFIX + token, stored, ex=self.token_expiration)
+            _snapshot_digests.set(token, digest)
+        state_store_latencies.record("write", _elapsed_ms(started_at))
+
+
+def use_redis_state_manager(app: rx.App) -> None:
+    """Keep the session states of the app in redis (see RedisStateManager)."""
+    app.state_manager = RedisStateManager()
+    app.state_manager.setup(state=app.state)
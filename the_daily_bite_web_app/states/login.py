@@ -1,15 +1,41 @@
 import reflex as rx
 from news_aggregator_data_access_layer.models.dynamodb import PreviewUsers
 
+from the_daily_bite_web_app.config import (
+    LOGIN_RATE_LIMIT_MAX_ATTEMPTS,
+    LOGIN_RATE_LIMIT_TRUSTED_PROXY_HOPS,
+    LOGIN_RATE_LIMIT_WINDOW_SECS,
+    LOGIN_UNKNOWN_USER_CACHE_TTL_SECS,
+    LOGIN_USER_CACHE_MAX_ENTRIES,
+    LOGIN_USER_CACHE_TTL_SECS,
+)
 from the_daily_bite_web_app.constants import INDEX_PATH
-from the_daily_bite_web_app.utils.aws_lambda import invoke_function
-from the_daily_bite_web_app.utils.telemetry import setup_logger
+from the_daily_bite_web_app.utils.aws_lambda import invoke_function_async
+from the_daily_bite_web_app.utils.cache import LRUCache
+from the_daily_bite_web_app.utils.rate_limit import SlidingWindowRateLimiter, client_ip
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
 
 from .base import BaseState
 from .models import User
 
 logger = setup_logger(__name__)
 
+# <user id>: <user name> of the preview users found
+preview_users_cache = LRUCache(
+    "preview_users", max_entries=LOGIN_USER_CACHE_MAX_ENTRIES, ttl_seconds=LOGIN_USER_CACHE_TTL_SECS
+)
+# <user id>: True for the user ids not found so repeated wrong ids don't reach the table
+unknown_preview_users_cache = LRUCache(
+    "unknown_preview_users",
+    max_entries=LOGIN_USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=LOGIN_UNKNOWN_USER_CACHE_TTL_SECS,
+)
+login_rate_limiter = SlidingWindowRateLimiter(
+    "login",
+    max_attempts=LOGIN_RATE_LIMIT_MAX_ATTEMPTS,
+    window_seconds=LOGIN_RATE_LIMIT_WINDOW_SECS,
+)
+
 
 class LoginState(BaseState):
     """State for the login form."""
@@ -17,7 +43,16 @@ class LoginState(BaseState):
     user_id_field: str = ""
 
     def log_in(self):
-        logger.info(f"Logging in with user id {self.user_id_field}...")
+        logger.info("Logging in with user id %s...", self.user_id_field)
+        # attempts are limited per client before anything is looked up
+        client_id = (
+            client_ip(self.get_client_ip(), self.get_headers(), LOGIN_RATE_LIMIT_TRUSTED_PROXY_HOPS)
+            or self.get_token()
+        )
+        if not login_rate_limiter.allow(client_id):
+            logger.warning("Too many login attempts from client %s", client_id)
+            metrics.increment("LoginRateLimited")
+            return rx.window_alert("Too many login attempts. Please try again later.")
         if self.user_id_field:
             # TODO - remove this. It is temporary and allows for local testing
             if self.user_id_field == "abc":  # "21286987-0dd3-44c1-88b6-a8361e37823c":
@@ -25,13 +60,22 @@ class LoginState(BaseState):
                 logger.info("Logged in as %s.", user.name)
                 self.user = user
                 return rx.redirect(INDEX_PATH)
+            if self.user_id_field in unknown_preview_users_cache:
+                return rx.window_alert(
+                    "Wrong user id. Make sure you have been added to the preview of the service."
+                )
             try:
-                preview_user = PreviewUsers.get(self.user_id_field)
-                user = User(user_id=preview_user.user_id, name=preview_user.name)
+                user_name = preview_users_cache.get(self.user_id_field)
+                if user_name is None:
+                    preview_user = PreviewUsers.get(self.user_id_field)
+                    user_name = preview_user.name
+                    preview_users_cache.set(self.user_id_field, user_name)
+                user = User(user_id=self.user_id_field, name=user_name)
                 logger.info("Logged in as %s.", user.name)
                 self.user = user
                 return rx.redirect(INDEX_PATH)
             except PreviewUsers.DoesNotExist:
+                unknown_preview_users_cache.set(self.user_id_field, True)
                 return rx.window_alert(
                     "Wrong user id. Make sure you have been added to the preview of the service."
                 )
@@ -18,6 +18,8 @@ class NewsTopic(rx.Model):
 
 class NewsArticle(rx.Model):
     article_id: str
+    # the serialized primary key of the sourced article, to read its details when it is expanded
+    article_key: str
     title: str
     topic_id: str
     source_urls: List[str]
@@ -26,16 +28,8 @@ class NewsArticle(rx.Model):
     published_on_dt: str
     # this is the publishing date of the newspaper it is part of (e.g. 2022/01/01)
     date_published: str
-    full_summary_text: Optional[str]
-    show_full_summary_text: bool = False
-    full_summary_ref: str
-    medium_summary_text: Optional[str]
-    show_medium_summary_text: bool = False
-    medium_summary_ref: str
-    short_summary_text: Optional[str]
-    show_short_summary_text: bool = False
+    # the medium and full summary refs are only read when the article is expanded
     short_summary_ref: str
-    show_article: bool = False
 
 
 class NewspaperTopic(rx.Model):
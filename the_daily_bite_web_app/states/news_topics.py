@@ -6,15 +6,23 @@ import asyncio
 
 import reflex as rx
 from news_aggregator_data_access_layer.models.dynamodb import (
-    NewsTopics,
     NewsTopicSuggestions,
     UserTopicSubscriptions,
     get_current_dt_utc_attribute,
 )
-from news_aggregator_data_access_layer.utils.telemetry import setup_logger
 
+from the_daily_bite_web_app.config import (
+    TOPIC_SUGGESTIONS_DEDUPE_WINDOW_SECS,
+    TOPIC_SUGGESTIONS_FLUSH_INTERVAL_SECS,
+    TOPIC_SUGGESTIONS_FLUSH_MAX_ITEMS,
+    WRITE_BEHIND_MAX_ATTEMPTS,
+)
 from the_daily_bite_web_app.constants import NEWSPAPER_PATH
-from the_daily_bite_web_app.utils.aws_lambda import invoke_function
+from the_daily_bite_web_app.utils.aws_lambda import invoke_function_async
+from the_daily_bite_web_app.utils.dynamodb import batch_write
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
+from the_daily_bite_web_app.utils.topics import topic_catalog
+from the_daily_bite_web_app.utils.write_behind import BatchWriteBuffer
 
 from .base import BaseState
 from .models import NewsTopic
@@ -22,6 +30,22 @@ from .models import NewsTopic
 logger = setup_logger(__name__)
 
 
+def normalize_news_topic_suggestion(news_topic_suggestion: NewsTopicSuggestions) -> str:
+    """Normalize the topic of a suggestion so that the same topic suggested differently is deduplicated."""
+    return " ".join(news_topic_suggestion.topic.lower().split())
+
+
+news_topic_suggestions_buffer = BatchWriteBuffer(
+    "news_topic_suggestions",
+    NewsTopicSuggestions,
+    max_items=TOPIC_SUGGESTIONS_FLUSH_MAX_ITEMS,
+    flush_interval_secs=TOPIC_SUGGESTIONS_FLUSH_INTERVAL_SECS,
+    dedupe_key=normalize_news_topic_suggestion,
+    dedupe_window_secs=TOPIC_SUGGESTIONS_DEDUPE_WINDOW_SECS,
+    max_attempts=WRITE_BEHIND_MAX_ATTEMPTS,
+)
+
+
 class NewsTopicsState(BaseState):
     """The news topics state."""
 
@@ -32,31 +56,38 @@ class NewsTopicsState(BaseState):
 
     def suggest_news_topic(self):
         if self.news_topic_suggestion:
-            NewsTopicSuggestions(
-                user_id=self.user.user_id,
-                topic=self.news_topic_suggestion,
-                created_at=get_current_dt_utc_attribute(),
-            ).save()
+            # buffered and written in batches in the background
+            news_topic_suggestions_buffer.add(
+                NewsTopicSuggestions(
+                    user_id=self.user.user_id,
+                    topic=self.news_topic_suggestion,
+                    created_at=get_current_dt_utc_attribute(),
+                )
+            )
             self.news_topic_suggestion = ""
             return rx.window_alert("Thank you for your suggestion!")
 
     def refresh_user_news_topics(self):
         """Get the news topics."""
-        logger.info(f"Refreshing news topics for user...")
+        logger.info("Refreshing news topics for user...")
         if self.user and self.user.user_id:
-            logger.info(f"Value: {self.is_refreshing_news_topics}")
+            logger.info("Value: %s", self.is_refreshing_news_topics)
             logger.info(
-                f"Refreshing news topics for user {self.user.user_id}. Value: {self.is_refreshing_news_topics}..."
+                "Refreshing news topics for user %s. Value: %s...",
+                self.user.user_id,
+                self.is_refreshing_news_topics,
             )
             self.set_is_refreshing_news_topics(True)
             yield
             try:
-                logger.info(f"Getting news topics for user {self.user.user_id}...")
+                logger.info("Getting news topics for user %s...", self.user.user_id)
                 user_news_topics = UserTopicSubscriptions.query(self.user.user_id)
-                user_news_topic_ids = [
+                user_news_topic_ids = {
                     user_news_topic.topic_id for user_news_topic in user_news_topics
-                ]
-                news_topics = NewsTopics.scan()
+                }
+                # the published topics are served from the in memory catalog and merged with the
+                # user's subscriptions
+                news_topics = topic_catalog.get_published_topics()
                 published_news_topics = [
                     {
                         "topic_id": news_topic.topic_id,
@@ -69,17 +100,16 @@ class NewsTopicsState(BaseState):
                         "is_user_subscribed": news_topic.topic_id in user_news_topic_ids,
                     }
                     for news_topic in news_topics
-                    if news_topic.is_published
                 ]
                 self.news_topics = [NewsTopic.parse_obj(r) for r in published_news_topics]
             except Exception as e:
-                logger.error(f"Error getting news topics: {e}", exc_info=True)
-                # TODO - emit metric
+                logger.error("Error getting news topics: %s", e, exc_info=True)
+                metrics.increment("NewsTopicsRefreshError")
                 self.news_topics = []
             self.set_is_refreshing_news_topics(False)
             yield
         else:
-            logger.warning(f"User is not logged in. Cannot get news topics")
+            logger.warning("User is not logged in. Cannot get news topics")
 
     def update_user_news_topic_subscriptions(self):
         """Update the user news topic subscriptions."""
@@ -99,42 +129,74 @@ class NewsTopicsState(BaseState):
             if not news_topics_to_unsubscribe and not news_topics_to_subscribe:
                 yield
             try:
-                for topic_id in news_topics_to_unsubscribe:
-                    logger.info(
-                        f"Unsubscribing user id {self.user.user_id} from topic id {topic_id}..."
-                    )
-                    try:
-                        UserTopicSubscriptions(self.user.user_id, topic_id).delete()
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to unsubscribe user id {self.user.user_id} from topic id {topic_id} with error: {e}",
-                            exc_info=True,
-                        )
-                        # TODO - emit metric
-                        continue
-                for topic_id in news_topics_to_subscribe:
-                    logger.info(f"Subscribing user id {self.user.user_id} to topic id {topic_id}")
-                    try:
+                logger.info(
+                    "Subscribing user id %s to topic ids %s and unsubscribing from topic ids %s...",
+                    self.user.user_id,
+                    news_topics_to_subscribe,
+                    news_topics_to_unsubscribe,
+                )
+                date_subscribed = get_current_dt_utc_attribute()
+                # all the changes are sent as concurrent batch writes rather than one write per topic
+                batch_write_result = batch_write(
+                    UserTopicSubscriptions,
+                    items_to_save=[
                         UserTopicSubscriptions(
-                            self.user.user_id,
-                            topic_id,
-                            date_subscribed=get_current_dt_utc_attribute(),
-                        ).save()
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to subscribe user id {self.user.user_id} to topic id {topic_id} with error: {e}",
-                            exc_info=True,
+                            self.user.user_id, topic_id, date_subscribed=date_subscribed
                         )
-                        # TODO - emit metric
-                        continue
+                        for topic_id in news_topics_to_subscribe
+                    ],
+                    items_to_delete=[
+                        UserTopicSubscriptions(self.user.user_id, topic_id)
+                        for topic_id in news_topics_to_unsubscribe
+                    ],
+                )
+                for user_topic_subscription in batch_write_result.failed_saves:
+                    logger.error(
+                        "Failed to subscribe user id %s to topic id %s",
+                        self.user.user_id,
+                        user_topic_subscription.topic_id,
+                    )
+                    metrics.increment("TopicSubscribeError")
+                for user_topic_subscription in batch_write_result.failed_deletes:
+                    logger.error(
+                        "Failed to unsubscribe user id %s from topic id %s",
+                        self.user.user_id,
+                        user_topic_subscription.topic_id,
+                    )
+                    metrics.increment("TopicUnsubscribeError")
+                failed_topic_ids = {
+                    user_topic_subscription.topic_id
+                    for user_topic_subscription in batch_write_result.failed_saves
+                    + batch_write_result.failed_deletes
+                }
+                # the topics written are shown with their new subscription, the others stay
+                # selected so the user can submit them again
+                for news_topic in self.news_topics:
+                    if news_topic.is_selected and news_topic.topic_id not in failed_topic_ids:
+                        news_topic.is_user_subscribed = not news_topic.is_user_subscribed
+                        news_topic.is_selected = False
+                self.news_topics = self.news_topics
                 self.set_is_updating_user_news_topic_subscriptions(False)
-                yield rx.redirect(NEWSPAPER_PATH)
+                if failed_topic_ids:
+                    failed_topics = ", ".join(
+                        sorted(
+                            news_topic.topic
+                            for news_topic in self.news_topics
+                            if news_topic.topic_id in failed_topic_ids
+                        )
+                    )
+                    yield rx.window_alert(
+                        f"Error updating your subscriptions to {failed_topics}. Please try again."
+                    )
+                else:
+                    yield rx.redirect(NEWSPAPER_PATH)
             except Exception as e:
-                logger.error(f"Error updating news topic subscriptions: {e}", exc_info=True)
-                # TODO - emit metric
+                logger.error("Error updating news topic subscriptions: %s", e, exc_info=True)
+                metrics.increment("TopicSubscriptionsUpdateError")
+                self.set_is_updating_user_news_topic_subscriptions(False)
                 yield rx.window_alert("Error updating news topic subscriptions. Please try again.")
         else:
-            logger.warning(f"User is not logged in. Cannot update news topic subscriptions")
+            logger.warning("User is not logged in. Cannot update news topic subscriptions")
 
     def get_news_topic_ref(self, news_topic: NewsTopic) -> NewsTopic:
         """Get the news topic ref."""
@@ -2,9 +2,39 @@ from typing import Optional
 
 import reflex as rx
 from news_aggregator_data_access_layer.models.dynamodb import PreviewUsers
+from pynamodb.exceptions import UpdateError
+
+from the_daily_bite_web_app.utils.telemetry import setup_logger
+from the_daily_bite_web_app.utils.write_behind import write_behind_queue
 
 from .base import BaseState
 
+logger = setup_logger(__name__)
+
+
+def save_newsletter_interest(user_id: str, email: str) -> None:
+    """
+    Saves the newsletter interest email of a preview user in a single conditional update.
+
+    :param user_id: The preview user id.
+    :param email: The email to send the newsletter to.
+    """
+    try:
+        PreviewUsers(user_id).update(
+            actions=[
+                PreviewUsers.newsletter_interest_email.set(email),
+            ],
+            # only update existing preview users rather than creating one with just an email
+            condition=PreviewUsers.user_id.exists(),
+        )
+    except UpdateError as e:
+        if e.cause_response_code == "ConditionalCheckFailedException":
+            logger.warning(
+                "Preview user id %s doesn't exist. Newsletter interest not saved", user_id
+            )
+            return
+        raise
+
 
 class NewsletterState(BaseState):
     email: str = ""
@@ -12,12 +42,13 @@ class NewsletterState(BaseState):
 
     def newsletter_interest_signup(self):
         if self.user and self.user.user_id and self.email:
-            user = PreviewUsers.get(self.user.user_id)
-            user.update(
-                actions=[
-                    PreviewUsers.newsletter_interest_email.set(self.email),
-                ]
-            )
+            user_id, email = self.user.user_id, self.email
+            # the signup is acknowledged right away and written in the background
+            if not write_behind_queue.submit(
+                lambda: save_newsletter_interest(user_id, email),
+                description=f"newsletter interest of user id {user_id}",
+            ):
+                save_newsletter_interest(user_id, email)
             self.email = ""
             self.newsletter_interest_signed_up = True
             return rx.window_alert("You're on the waitlist. Thank you for your interest!")
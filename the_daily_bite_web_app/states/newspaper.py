@@ -1,35 +1,195 @@
 """The News Topics application state."""
 
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import asyncio
+import copy
+import functools
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import reflex as rx
-from news_aggregator_data_access_layer.config import SOURCED_ARTICLES_S3_BUCKET
 from news_aggregator_data_access_layer.constants import ArticleApprovalStatus, SummarizationLength
 from news_aggregator_data_access_layer.models.dynamodb import (
-    NewsTopics,
     SourcedArticles,
     UserTopicSubscriptions,
 )
-from news_aggregator_data_access_layer.utils.s3 import (
-    get_object,
-    lexicographic_date_s3_prefix_to_dt,
-)
-from news_aggregator_data_access_layer.utils.telemetry import setup_logger
+from news_aggregator_data_access_layer.utils.s3 import lexicographic_date_s3_prefix_to_dt
 
 from the_daily_bite_web_app.config import (
+    ARTICLE_PAGE_CACHE_MAX_ENTRIES,
+    ARTICLE_PAGE_CACHE_TTL_SECS,
     ARTICLES_PER_PAGE,
-    MAX_SOURCES_PER_ARTICLE_IN_UI,
     NEWSPAPER_REFRESH_FREQUENCY_MINS,
+    TOPIC_WARM_UP_CONCURRENCY,
+    TOPIC_WARM_UP_ENABLED,
+    TOPIC_WARM_UP_TIMEOUT_SECS,
+)
+from the_daily_bite_web_app.exceptions import StaleArticlesCursorException
+from the_daily_bite_web_app.utils.article_index import approved_articles_index, is_index_cursor
+from the_daily_bite_web_app.utils.cache import LRUCache
+from the_daily_bite_web_app.utils.sourced_articles import (
+    SOURCED_ARTICLES_LISTING_ATTRIBUTES,
+    get_sourced_article_summary_refs,
+    sourced_article_key,
+    sourced_article_to_news_article_fields,
 )
+from the_daily_bite_web_app.utils.summaries import prefetch_summary_texts, summary_url
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
+from the_daily_bite_web_app.utils.topics import get_topics_metadata
 
 from .base import BaseState
 from .models import NewsArticle, NewspaperTopic
 
 logger = setup_logger(__name__)
 
+# shared across all sessions so that readers of the same topic page don't each pay for the same query
+article_pages_cache = LRUCache(
+    "article_pages",
+    max_entries=ARTICLE_PAGE_CACHE_MAX_ENTRIES,
+    ttl_seconds=ARTICLE_PAGE_CACHE_TTL_SECS,
+)
+
+_topic_warm_up_executor = ThreadPoolExecutor(
+    max_workers=TOPIC_WARM_UP_CONCURRENCY, thread_name_prefix="topic-warm-up"
+)
+# <topic_id>: <load of the first page of the topic> shared by the sessions warming up the same topic
+_topic_warm_up_pages: Dict[str, "Future[ArticlesPage]"] = dict()
+_topic_warm_up_pages_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4096)
+def published_date_label(date_published: str) -> str:
+    """
+    Get the label a publishing date is displayed with in the newspaper, e.g. "Monday, January 02, 2023".
+
+    :param date_published: The lexicographic publishing date of the articles.
+    :return: The display label.
+    """
+    return lexicographic_date_s3_prefix_to_dt(date_published).strftime("%A, %B %d, %Y")
+
+
+class ArticlesPage(NamedTuple):
+    """A page of approved articles for a topic."""
+
+    # the articles in the order they were queried in
+    articles: List[NewsArticle]
+    # the primary key of each article, usable as the last_evaluated_key of a query
+    article_keys: List[Dict[str, Dict[str, Any]]]
+    # the key to continue the query from; None when there are no more articles
+    last_evaluated_key: Optional[Dict[str, Dict[str, Any]]]
+
+
+def query_articles_page(
+    topic_id: str,
+    last_evaluated_key: Optional[Dict[str, Dict[str, Any]]],
+    count: int,
+    latest_first: bool = True,
+) -> ArticlesPage:
+    """
+    Query a page of approved articles for the given topic id.
+
+    :param topic_id: The topic id to query articles for.
+    :param last_evaluated_key: The key to resume the query from. None to start from the latest
+                               (or oldest when not latest_first) article.
+    :param count: The maximum number of articles in the page.
+    :param latest_first: Whether to query from the latest articles to the oldest or the other way around.
+    :return: The page of articles.
+    """
+    sourced_articles = SourcedArticles.query(
+        topic_id,
+        scan_index_forward=not latest_first,
+        filter_condition=SourcedArticles.article_approval_status == ArticleApprovalStatus.APPROVED,
+        last_evaluated_key=last_evaluated_key,
+        attributes_to_get=SOURCED_ARTICLES_LISTING_ATTRIBUTES,
+    )
+    articles: List[NewsArticle] = []
+    article_keys: List[Dict[str, Dict[str, Any]]] = []
+    for sourced_article in sourced_articles:
+        articles.append(NewsArticle(**sourced_article_to_news_article_fields(sourced_article)))
+        article_keys.append(sourced_article_key(sourced_article))
+        if len(articles) >= count:
+            break
+    return ArticlesPage(articles, article_keys, sourced_articles.last_evaluated_key)
+
+
+def get_articles_page(
+    topic_id: str,
+    last_evaluated_key: Optional[Dict[str, Dict[str, Any]]],
+    count: int,
+    latest_first: bool = True,
+) -> ArticlesPage:
+    """
+    Get a page of approved articles for the given topic id, served from the shared page cache when possible.
+
+    Topics kept in sync by the local approved articles index are read from it instead; pages
+    started from a DynamoDB last evaluated key keep being queried from DynamoDB. The pages read from
+    the oldest to the latest article are the newest articles a refresh looks for, which a cached
+    page would hide for its whole ttl, so they're always queried.
+
+    The articles returned are shared between sessions and must not be modified.
+
+    A cursor handed out by the index is never passed to DynamoDB: the topic is synced first when the
+    index dropped it or never synced it in this process, and StaleArticlesCursorException is raised
+    when it can't be, for the caller to load the topic again from its first page.
+    """
+    if is_index_cursor(last_evaluated_key) and (
+        approved_articles_index is None
+        or not approved_articles_index.sync_untracked_topic(topic_id)
+    ):
+        raise StaleArticlesCursorException(topic_id)
+    if approved_articles_index is not None and approved_articles_index.can_serve(
+        topic_id, last_evaluated_key
+    ):
+        articles_fields, article_cursors, next_cursor = approved_articles_index.get_page(
+            topic_id, last_evaluated_key, count, latest_first
+        )
+        return ArticlesPage(
+            articles=[NewsArticle(**article_fields) for article_fields in articles_fields],
+            article_keys=article_cursors,
+            last_evaluated_key=next_cursor,
+        )
+    if not latest_first:
+        return query_articles_page(topic_id, last_evaluated_key, count, latest_first)
+    cursor = json.dumps(last_evaluated_key, sort_keys=True) if last_evaluated_key else ""
+    articles_page = article_pages_cache.get_or_load(
+        (topic_id, count, latest_first, cursor),
+        lambda: query_articles_page(topic_id, last_evaluated_key, count, latest_first),
+    )
+    return ArticlesPage(
+        articles=list(articles_page.articles),
+        article_keys=copy.deepcopy(articles_page.article_keys),
+        last_evaluated_key=copy.deepcopy(articles_page.last_evaluated_key),
+    )
+
+
+def load_topic_first_page(topic_id: str) -> "Future[ArticlesPage]":
+    """
+    Load the first page of articles of a topic in the background, joining the load already in flight if any.
+
+    :param topic_id: The topic id to load the first page of.
+    :return: The future of the page.
+    """
+    with _topic_warm_up_pages_lock:
+        topic_page = _topic_warm_up_pages.get(topic_id)
+        if topic_page is not None:
+            return topic_page
+        topic_page = _topic_warm_up_executor.submit(
+            get_articles_page, topic_id, None, ARTICLES_PER_PAGE
+        )
+        _topic_warm_up_pages[topic_id] = topic_page
+    # outside of the lock since the callback runs right away when the load is done already
+    topic_page.add_done_callback(lambda _: _forget_topic_first_page_load(topic_id, topic_page))
+    return topic_page
+
+
+def _forget_topic_first_page_load(topic_id: str, topic_page: "Future[ArticlesPage]") -> None:
+    with _topic_warm_up_pages_lock:
+        if _topic_warm_up_pages.get(topic_id) is topic_page:
+            del _topic_warm_up_pages[topic_id]
+
 
 class NewspaperState(BaseState):
     """The newspaper state."""
@@ -45,26 +205,47 @@ class NewspaperState(BaseState):
     is_loading_more_articles: bool = False
     # <topic_id>: <last_evaluated_key> to allow us to page through results
     _last_fetched_newspaper_article_by_topic: Dict[str, Dict[str, Dict[str, Any]]] = dict()
+    # <topic_id>: <key of the newest article loaded> to allow us to load only the articles published since
+    _newest_fetched_newspaper_article_by_topic: Dict[str, Dict[str, Dict[str, Any]]] = dict()
+    # <topic_id>: <article_id>: <article in the newspaper> to look articles up without scanning the newspaper
+    _newspaper_article_index: Dict[str, Dict[str, NewsArticle]] = dict()
+    # <topic_id>: <published dates in the newspaper, latest first> maintained as articles are added
+    _newspaper_published_dates: Dict[str, List[str]] = dict()
+    # <topic_id>: <display label of each published date> aligned with _newspaper_published_dates
+    _newspaper_published_date_labels: Dict[str, List[str]] = dict()
     # <topic_id>: <datetime> to allow us to keep track of the last time we refreshed the newspaper per topic
     _last_newspaper_refresh_dt_by_topic: Dict[str, datetime] = dict()
+    # the topics whose first page is being loaded in the background and isn't in the newspaper yet
+    _warming_up_topic_ids: List[str] = []
+    # when the warm-up of the topics above started, to give up on it when its events are lost
+    _warm_up_started_at: datetime = datetime.min.replace(tzinfo=timezone.utc)
     selected_newspaper_topic_id: str = ""
+    # <article_id>: <summarization length shown> for the articles the reader has open.
+    # kept apart from the newspaper so that toggling an article only sends these small dicts to the frontend
+    article_show_lengths: Dict[str, str] = dict()
+    # <article_id>: <url of the summary shown> for the articles the reader has open. the text is loaded
+    # by the browser from the summaries api so it is cached by the browser and any CDN rather than
+    # being sent over the websocket and held in the session
+    article_summary_urls: Dict[str, str] = dict()
 
     def refresh_user_subscribed_newspaper_topics(self):
         # """Get the news topics."""
         if self.user and self.user.user_id:
-            logger.info(f"User Name: {self.user.name};")
+            logger.info("User Name: %s;", self.user.name)
             self.set_is_refreshing_newspaper_topics(True)
             yield
             logger.info(
-                f"Refreshing news topics for user {self.user.user_id}. Value: {self.is_refreshing_newspaper_topics}..."
+                "Refreshing news topics for user %s. Value: %s...",
+                self.user.user_id,
+                self.is_refreshing_newspaper_topics,
             )
             try:
-                logger.info(f"Getting newspaper topics for user {self.user.user_id}...")
+                logger.info("Getting newspaper topics for user %s...", self.user.user_id)
                 user_news_topics = UserTopicSubscriptions.query(self.user.user_id)
                 user_news_topic_ids = [
                     (user_news_topic.topic_id) for user_news_topic in user_news_topics
                 ]
-                news_topics = NewsTopics.batch_get(user_news_topic_ids)
+                news_topics = get_topics_metadata(user_news_topic_ids)
                 subscribed_newspaper_topics = [
                     {
                         "topic_id": news_topic.topic_id,
@@ -77,12 +258,16 @@ class NewspaperState(BaseState):
                 self.newspaper_topics = [
                     NewspaperTopic.parse_obj(r) for r in subscribed_newspaper_topics
                 ]
+                if approved_articles_index is not None:
+                    approved_articles_index.track_topics(
+                        newspaper_topic.topic_id for newspaper_topic in self.newspaper_topics
+                    )
             except Exception as e:
-                logger.error(f"Error getting news topics: {e}", exc_info=True)
-                # TODO - emit metric
+                logger.error("Error getting news topics: %s", e, exc_info=True)
+                metrics.increment("NewspaperTopicsRefreshError")
                 self.newspaper_topics = []
             finally:
-                logger.info(f"Done getting newspaper topics for user {self.user.user_id}...")
+                logger.info("Done getting newspaper topics for user %s...", self.user.user_id)
                 self.set_is_refreshing_newspaper_topics(False)
                 yield
                 if self.newspaper_topics:
@@ -104,19 +289,26 @@ class NewspaperState(BaseState):
                         self.topic_newspaper_refresh_status[topic_id] = False
                     if topic_id not in self._last_fetched_newspaper_article_by_topic:
                         self._last_fetched_newspaper_article_by_topic[topic_id] = dict()
+                    if topic_id not in self._newest_fetched_newspaper_article_by_topic:
+                        self._newest_fetched_newspaper_article_by_topic[topic_id] = dict()
+                    if topic_id not in self._newspaper_article_index:
+                        self._newspaper_article_index[topic_id] = dict()
+                    if topic_id not in self._newspaper_published_dates:
+                        self._newspaper_published_dates[topic_id] = []
+                        self._newspaper_published_date_labels[topic_id] = []
                     if topic_id not in self._last_newspaper_refresh_dt_by_topic:
                         self._last_newspaper_refresh_dt_by_topic[topic_id] = datetime.min.replace(
                             tzinfo=timezone.utc
                         )
                 return
         else:
-            logger.warning(f"User is not logged in. Cannot get news topics")
+            logger.warning("User is not logged in. Cannot get news topics")
 
-    @rx.var
+    @rx.cached_var
     def get_newspaper_topics(self) -> List[NewspaperTopic]:
         return [topic for topic in self.newspaper_topics]
 
-    @rx.var
+    @rx.cached_var
     def has_subscribed_newspaper_topics(self) -> bool:
         return len(self.newspaper_topics) > 0
 
@@ -128,6 +320,8 @@ class NewspaperState(BaseState):
                 self.selected_newspaper_topic_id = newspaper_topic.topic_id
             else:
                 newspaper_topic.is_selected = False
+        # NOTE - this is a temporary workaround to ensure the frontend receives the updated state
+        self.newspaper_topics = self.newspaper_topics
 
     def load_more_articles(self):
         """Load more articles for the selected newspaper topic."""
@@ -135,13 +329,13 @@ class NewspaperState(BaseState):
             self.set_is_loading_more_articles(True)
             yield
             logger.info(
-                f"Loading more articles for topic id: {self.selected_newspaper_topic_id}..."
+                "Loading more articles for topic id: %s...", self.selected_newspaper_topic_id
             )
             self.load_articles_for_topic(self.selected_newspaper_topic_id, count=ARTICLES_PER_PAGE)
             self.set_is_loading_more_articles(False)
             yield
 
-    @rx.var
+    @rx.cached_var
     def is_refreshing_selected_newspaper_topic(self) -> bool:
         """Get whether the selected newspaper topic is refreshing."""
         return self.topic_newspaper_refresh_status.get(self.selected_newspaper_topic_id, False)
@@ -152,23 +346,22 @@ class NewspaperState(BaseState):
         """
         selected_topic_id = self.selected_newspaper_topic_id
         if not selected_topic_id:
-            logger.info(f"No selected topic. Nothing to do.")
+            logger.info("No selected topic. Nothing to do.")
             return
-        logger.info(f"Refreshing newspaper articles {selected_topic_id}...")
+        logger.info("Refreshing newspaper articles %s...", selected_topic_id)
         # have refreshed within the last NEWSPAPER_REFRESH_FREQUENCY_MINS minutes
-        now_dt = datetime.now(tz=timezone.utc)
-        last_refresh_dt = self._last_newspaper_refresh_dt_by_topic[selected_topic_id]
-        timedelta_since_last_refresh = now_dt - last_refresh_dt
-        if timedelta_since_last_refresh < timedelta(minutes=NEWSPAPER_REFRESH_FREQUENCY_MINS):
-            logger.info(
-                f"Newspaper articles for topic id {selected_topic_id} were refreshed {timedelta_since_last_refresh} time ago. Skipping..."
+        if not self.is_topic_newspaper_stale(selected_topic_id):
+            return
+        if self._newest_fetched_newspaper_article_by_topic.get(selected_topic_id):
+            # the newspaper was already loaded; only add the articles published since
+            self.load_newest_articles(selected_topic_id)
+            self._last_newspaper_refresh_dt_by_topic[selected_topic_id] = datetime.now(
+                tz=timezone.utc
             )
             return
-        # TODO - here
         self.topic_newspaper_refresh_status[selected_topic_id] = True
         yield
-        self.newspaper[selected_topic_id] = dict()
-        self._last_fetched_newspaper_article_by_topic[selected_topic_id] = dict()
+        self.reset_topic_newspaper(selected_topic_id)
         self.load_articles_for_topic(selected_topic_id, count=ARTICLES_PER_PAGE)
         yield
         self._last_newspaper_refresh_dt_by_topic[selected_topic_id] = datetime.now(tz=timezone.utc)
@@ -176,191 +369,349 @@ class NewspaperState(BaseState):
         self.topic_newspaper_refresh_status[selected_topic_id] = False
         yield
 
-    def find_newspaper_article(self, article: NewsArticle) -> Optional[NewsArticle]:
-        if not isinstance(article, NewsArticle):
-            raise TypeError(f"Expected NewsArticle, got {type(article)}")
-        articles = self.newspaper[article.topic_id][article.date_published]
-        for a in articles:
-            if a.article_id == article.article_id:
-                return a
-        return None
-
-    def set_show_article_property(self, article: NewsArticle, show_article: bool):
-        article = NewsArticle.parse_obj(article)
+    def is_topic_newspaper_stale(self, topic_id: str) -> bool:
+        """
+        Whether the topic newspaper needs refreshing.
+        It doesn't if it was refreshed within the last NEWSPAPER_REFRESH_FREQUENCY_MINS minutes or is being refreshed.
+        """
+        if self.topic_newspaper_refresh_status.get(topic_id, False) and not (
+            topic_id in self._warming_up_topic_ids and self.is_topics_warm_up_expired()
+        ):
+            logger.info(
+                "Newspaper articles for topic id %s are being refreshed. Skipping...", topic_id
+            )
+            return False
+        now_dt = datetime.now(tz=timezone.utc)
+        last_refresh_dt = self._last_newspaper_refresh_dt_by_topic[topic_id]
+        timedelta_since_last_refresh = now_dt - last_refresh_dt
+        if timedelta_since_last_refresh < timedelta(minutes=NEWSPAPER_REFRESH_FREQUENCY_MINS):
+            logger.info(
+                "Newspaper articles for topic id %s were refreshed %s time ago. Skipping...",
+                topic_id,
+                timedelta_since_last_refresh,
+            )
+            return False
+        return True
+
+    def is_topics_warm_up_expired(self) -> bool:
+        """Whether the warm-up in progress started over TOPIC_WARM_UP_TIMEOUT_SECS seconds ago."""
+        return datetime.now(tz=timezone.utc) - self._warm_up_started_at >= timedelta(
+            seconds=TOPIC_WARM_UP_TIMEOUT_SECS
+        )
+
+    def warm_up_subscribed_topics_newspaper_articles(self):
+        """
+        Populate the newspaper dictionary for the subscribed topics other than the selected one.
+        The first page of each topic is loaded concurrently in the background, so that switching
+        topics afterwards renders without waiting on DynamoDB. The pages are added to the newspaper
+        as they're loaded by short follow-up events, so that the events of the reader aren't held
+        back until every topic is loaded. A warm-up whose follow-up events were lost with the page
+        is resumed when the newspaper loads again, or started over once it expired.
+        """
+        if not TOPIC_WARM_UP_ENABLED:
+            return
+        if self._warming_up_topic_ids:
+            # the follow-up events of the warm-up in progress are lost with the page they were sent to
+            if not self.is_topics_warm_up_expired():
+                return NewspaperState.add_warmed_up_topics_newspaper_articles
+            logger.warning(
+                "Warm-up of topic ids %s expired. Warming them up again...",
+                self._warming_up_topic_ids,
+            )
+            for topic_id in self._warming_up_topic_ids:
+                self.topic_newspaper_refresh_status[topic_id] = False
+            self._warming_up_topic_ids = []
+        topic_ids = [
+            newspaper_topic.topic_id
+            for newspaper_topic in self.newspaper_topics
+            if newspaper_topic.topic_id != self.selected_newspaper_topic_id
+            and self.is_topic_newspaper_stale(newspaper_topic.topic_id)
+        ]
+        if not topic_ids:
+            return
+        logger.info("Warming up newspaper articles for topic ids %s...", topic_ids)
+        for topic_id in topic_ids:
+            self.topic_newspaper_refresh_status[topic_id] = True
+            load_topic_first_page(topic_id)
+        self._warming_up_topic_ids = topic_ids
+        self._warm_up_started_at = datetime.now(tz=timezone.utc)
+        return NewspaperState.add_warmed_up_topics_newspaper_articles
+
+    async def add_warmed_up_topics_newspaper_articles(self):
+        """
+        Add the first pages of the topics being warmed up to the newspaper as soon as one is loaded,
+        then hand the remaining topics to a new event.
+        """
+        if not self._warming_up_topic_ids:
+            return
+        # the loads are started again if they're done already; the pages are then served from the cache
+        pending_topic_pages = {
+            asyncio.wrap_future(load_topic_first_page(topic_id)): topic_id
+            for topic_id in self._warming_up_topic_ids
+        }
+        done, _ = await asyncio.wait(pending_topic_pages, return_when=asyncio.FIRST_COMPLETED)
+        for topic_page in done:
+            topic_id = pending_topic_pages[topic_page]
+            try:
+                articles_page = topic_page.result()
+                self.reset_topic_newspaper(topic_id)
+                self.add_articles_page(topic_id, articles_page)
+                self._last_newspaper_refresh_dt_by_topic[topic_id] = datetime.now(tz=timezone.utc)
+            except Exception as e:
+                logger.error(
+                    "Error warming up newspaper articles for topic id %s: %s",
+                    topic_id,
+                    e,
+                    exc_info=True,
+                )
+                metrics.increment("TopicWarmUpError")
+            self.topic_newspaper_refresh_status[topic_id] = False
+        warmed_up_topic_ids = {pending_topic_pages[topic_page] for topic_page in done}
+        self._warming_up_topic_ids = [
+            topic_id
+            for topic_id in self._warming_up_topic_ids
+            if topic_id not in warmed_up_topic_ids
+        ]
+        if self._warming_up_topic_ids:
+            return NewspaperState.add_warmed_up_topics_newspaper_articles
+
+    def find_newspaper_article(self, topic_id: str, article_id: str) -> Optional[NewsArticle]:
+        newspaper_article = self._newspaper_article_index.get(topic_id, dict()).get(article_id)
+        if newspaper_article is None:
+            logger.warning(
+                "Article id %s not found in newspaper for topic id %s", article_id, topic_id
+            )
+        return newspaper_article
+
+    def set_show_article_property(self, topic_id: str, article_id: str, show_article: bool):
+        if self.find_newspaper_article(topic_id, article_id) is None:
+            return
         # could emit metrics here for the article
-        self.find_newspaper_article(article).show_article = show_article
-        # NOTE - this is a temporary workaround to ensure the frontend receives the updated state
-        self.newspaper = self.newspaper
+        if not show_article:
+            self.article_show_lengths.pop(article_id, None)
+            self.article_summary_urls.pop(article_id, None)
+        elif article_id not in self.article_show_lengths:
+            self.article_show_lengths[article_id] = SummarizationLength.SHORT.value
         return
 
-    def set_show_length_property(self, article: NewsArticle, show_length: Optional[str] = None):
-        article = NewsArticle.parse_obj(article)
-        newspaper_article = self.find_newspaper_article(article)
-        if (
-            not newspaper_article.show_short_summary_text
-            and not newspaper_article.show_medium_summary_text
-            and not newspaper_article.show_full_summary_text
-        ):
-            newspaper_article.show_short_summary_text = True
+    def set_show_length_property(
+        self, topic_id: str, article_id: str, show_length: Optional[str] = None
+    ):
+        if self.find_newspaper_article(topic_id, article_id) is None:
+            return
+        if article_id not in self.article_show_lengths:
+            self.article_show_lengths[article_id] = SummarizationLength.SHORT.value
         # has a value set; change it
-        elif show_length:
-            if show_length == SummarizationLength.SHORT.value:
-                newspaper_article.show_short_summary_text = True
-                newspaper_article.show_medium_summary_text = False
-                newspaper_article.show_full_summary_text = False
-            elif show_length == SummarizationLength.MEDIUM.value:
-                newspaper_article.show_medium_summary_text = True
-                newspaper_article.show_short_summary_text = False
-                newspaper_article.show_full_summary_text = False
-            elif show_length == SummarizationLength.FULL.value:
-                newspaper_article.show_full_summary_text = True
-                newspaper_article.show_short_summary_text = False
-                newspaper_article.show_medium_summary_text = False
-        # NOTE - this is a temporary workaround to ensure the frontend receives the updated state
-        self.newspaper = self.newspaper
+        elif show_length and show_length != self.article_show_lengths[article_id]:
+            if show_length in (
+                SummarizationLength.SHORT.value,
+                SummarizationLength.MEDIUM.value,
+                SummarizationLength.FULL.value,
+            ):
+                self.article_show_lengths[article_id] = show_length
         return
 
     def load_newest_articles(self, topic_id: str):
-        # an idea is to simply have a last evaluated key in the scan_index_forward=True direction as well
-        # This will be set to the newest article in the newspaper at the first refresh
-        # after that it will go on autopilot and keep the newest as the last evaluated key, until None is reached.
-        # Another option... we can also just
-        pass
-
-    def populate_article_text(self, article: NewsArticle) -> None:
-        def get_text(ref: str) -> str:
-            return get_object(
-                SOURCED_ARTICLES_S3_BUCKET,
-                ref,
-            )[
-                0
-            ].replace("\n", "<br>")
-
-        article = NewsArticle.parse_obj(article)
-        newspaper_article = self.find_newspaper_article(article)
-        if newspaper_article.show_short_summary_text:
-            if newspaper_article.short_summary_text:
-                return
-            text = get_text(newspaper_article.short_summary_ref)
-            newspaper_article.short_summary_text = text
-        elif newspaper_article.show_medium_summary_text:
-            if newspaper_article.medium_summary_text:
+        """
+        Load the articles published for the given topic id since the newest article in its newspaper.
+        The query runs from the oldest to the latest article, starting right after the newest article
+        loaded, so a refresh only reads the new articles and keeps the pages already loaded.
+        """
+        newest_article_key = self._newest_fetched_newspaper_article_by_topic.get(topic_id)
+        if not newest_article_key:
+            return
+        logger.info("Loading newest articles for topic id %s...", topic_id)
+        newspaper_article_ids = set(self._newspaper_article_index[topic_id])
+        # published date: newest articles, latest first
+        newest_articles: Dict[str, List[NewsArticle]] = dict()
+        while True:
+            try:
+                articles_page = get_articles_page(
+                    topic_id, newest_article_key, ARTICLES_PER_PAGE, latest_first=False
+                )
+            except StaleArticlesCursorException as e:
+                self.reload_topic_newspaper(topic_id, e)
                 return
-            text = get_text(newspaper_article.medium_summary_ref)
-            newspaper_article.medium_summary_text = text
-        elif newspaper_article.show_full_summary_text:
-            if newspaper_article.full_summary_text:
+            for article in articles_page.articles:
+                if article.article_id in newspaper_article_ids:
+                    continue
+                newspaper_article_ids.add(article.article_id)
+                if article.date_published not in newest_articles:
+                    newest_articles[article.date_published] = []
+                newest_articles[article.date_published].insert(0, article)
+            if articles_page.article_keys:
+                newest_article_key = articles_page.article_keys[-1]
+            if len(articles_page.articles) < ARTICLES_PER_PAGE:
+                break
+        for date_published, articles_on_date in newest_articles.items():
+            for article in articles_on_date:
+                self._newspaper_article_index[topic_id][article.article_id] = article
+            if date_published not in self.newspaper[topic_id]:
+                self._add_published_date(topic_id, date_published)
+            self.newspaper[topic_id][date_published] = [
+                *articles_on_date,
+                *self.newspaper[topic_id].get(date_published, []),
+            ]
+        self._newest_fetched_newspaper_article_by_topic[topic_id] = newest_article_key
+        # warm the shared summary cache so opening an article doesn't wait on S3
+        prefetch_summary_texts(
+            article.short_summary_ref
+            for articles_on_date in newest_articles.values()
+            for article in articles_on_date
+        )
+        logger.info(
+            "Loaded %d newest articles for topic id %s",
+            sum(len(articles) for articles in newest_articles.values()),
+            topic_id,
+        )
+
+    def populate_article_text(self, topic_id: str, article_id: str) -> None:
+        newspaper_article = self.find_newspaper_article(topic_id, article_id)
+        if newspaper_article is None:
+            return
+        show_length = self.article_show_lengths.get(article_id)
+        if show_length == SummarizationLength.SHORT.value:
+            summary_ref = newspaper_article.short_summary_ref
+        elif show_length in [SummarizationLength.MEDIUM.value, SummarizationLength.FULL.value]:
+            # the listing doesn't read the medium and full summary refs, they're read on expand
+            try:
+                summary_refs = get_sourced_article_summary_refs(newspaper_article.article_key)
+            except Exception as e:
+                logger.error(
+                    "Error getting summary refs for article id %s: %s", article_id, e, exc_info=True
+                )
+                metrics.increment("ArticleSummaryRefsError")
                 return
-            text = get_text(newspaper_article.full_summary_ref)
-            newspaper_article.full_summary_text = text
-        # NOTE - this is a temporary workaround to ensure the frontend receives the updated state
-        self.newspaper = self.newspaper
+            summary_ref = summary_refs[show_length]
+        else:
+            return
+        url = summary_url(summary_ref)
+        if self.article_summary_urls.get(article_id) != url:
+            self.article_summary_urls[article_id] = url
 
     def load_articles_for_topic(self, topic_id: str, count: int):
         """
         Load articles for the given topic id.
         NOTE - TODO - this approach is naive since it wouldn't work as expected with articles which are approved after the initial load.
-        Also currently load_newest_articles is not implemented.
+        Articles published after the initial load are picked up by load_newest_articles.
         An option is in the background to use PublishedArticles table and keep track of the expected and actual count
         and load articles in the newspaper to make sure that at some point these match.
         """
-        logger.info(f"Loading {count} articles for topic id {topic_id}...")
-        # TODO
-        # load_newest_articles(topic_id)
-
+        logger.info("Loading %d articles for topic id %s...", count, topic_id)
         last_evaluated_key = self._last_fetched_newspaper_article_by_topic[topic_id]
         # if it is None in the _last_fetched_newspaper_article_by_topic it means we've processed all articles for this topic
         # so we're done
         if last_evaluated_key is not None:
-            articles = dict()
             if last_evaluated_key == dict():
                 # means we've never loaded articles for this topic so we set last evaluated key to None to start
                 last_evaluated_key = None
-            sourced_articles = SourcedArticles.query(
-                topic_id,
-                scan_index_forward=False,
-                filter_condition=SourcedArticles.article_approval_status
-                == ArticleApprovalStatus.APPROVED,
-                last_evaluated_key=last_evaluated_key,
-            )
-            articles_loaded = 0
-            for sourced_article in sourced_articles:
-                date_published = sourced_article.date_published
-                if date_published not in articles:
-                    articles[date_published] = []
-                articles[date_published].append(
-                    NewsArticle(
-                        article_id=sourced_article.sourced_article_id,
-                        title=sourced_article.title,
-                        topic_id=sourced_article.topic_id,
-                        source_urls=sourced_article.source_article_urls[
-                            :MAX_SOURCES_PER_ARTICLE_IN_UI
-                        ],
-                        source_provider_names=sourced_article.providers[
-                            :MAX_SOURCES_PER_ARTICLE_IN_UI
-                        ],
-                        date_published=date_published,
-                        published_on_dt=sourced_article.dt_published.strftime("%Y-%m-%d %H:%M:%S"),
-                        full_summary_ref=sourced_article.full_summary_ref,
-                        medium_summary_ref=sourced_article.medium_summary_ref,
-                        short_summary_ref=sourced_article.short_summary_ref,
-                    )
-                )
-                articles_loaded += 1
-                if articles_loaded >= count:
-                    break
-            for date_published, articles_on_date in articles.items():
-                if date_published not in self.newspaper[topic_id]:
-                    self.newspaper[topic_id][date_published] = []
-                self.newspaper[topic_id][date_published].extend(articles_on_date)
-            last_evaluated_key = sourced_articles.last_evaluated_key
-            logger.info(
-                f"Topic Id: {topic_id}; Current Last Evaluated Key: {self._last_fetched_newspaper_article_by_topic.get(topic_id)} Last Evaluated Key: {last_evaluated_key}"
-            )
-            self._last_fetched_newspaper_article_by_topic[topic_id] = last_evaluated_key
+            try:
+                articles_page = get_articles_page(topic_id, last_evaluated_key, count)
+            except StaleArticlesCursorException as e:
+                self.reload_topic_newspaper(topic_id, e)
+                return
+            self.add_articles_page(topic_id, articles_page)
+
+    def reload_topic_newspaper(self, topic_id: str, e: StaleArticlesCursorException):
+        """Load the newspaper of the given topic id again from its first page, its cursor being stale."""
+        logger.warning("%s Loading the topic id %s again...", e, topic_id)
+        metrics.increment("StaleArticlesCursor")
+        self.reset_topic_newspaper(topic_id)
+        self.add_articles_page(topic_id, get_articles_page(topic_id, None, ARTICLES_PER_PAGE))
+
+    def add_articles_page(self, topic_id: str, articles_page: ArticlesPage):
+        """Add a page of articles loaded for the given topic id (latest first) to its newspaper."""
+        for article in articles_page.articles:
+            if article.date_published not in self.newspaper[topic_id]:
+                self.newspaper[topic_id][article.date_published] = []
+                self._add_published_date(topic_id, article.date_published)
+            self.newspaper[topic_id][article.date_published].append(article)
+            self._newspaper_article_index[topic_id][article.article_id] = article
+        if (
+            not self._newest_fetched_newspaper_article_by_topic.get(topic_id)
+            and articles_page.article_keys
+        ):
+            self._newest_fetched_newspaper_article_by_topic[topic_id] = articles_page.article_keys[
+                0
+            ]
+        # warm the shared summary cache so opening an article doesn't wait on S3
+        prefetch_summary_texts(article.short_summary_ref for article in articles_page.articles)
+        last_evaluated_key = articles_page.last_evaluated_key
+        # the keys are only logged when debugging, they're large and logged for every page
+        logger.debug(
+            "Topic Id: %s; Current Last Evaluated Key: %s Last Evaluated Key: %s",
+            topic_id,
+            self._last_fetched_newspaper_article_by_topic.get(topic_id),
+            last_evaluated_key,
+        )
+        self._last_fetched_newspaper_article_by_topic[topic_id] = last_evaluated_key
 
-    @rx.var
+    def reset_topic_newspaper(self, topic_id: str):
+        """Empty the newspaper of the given topic id so that it is loaded again from the latest article."""
+        self.newspaper[topic_id] = dict()
+        self._last_fetched_newspaper_article_by_topic[topic_id] = dict()
+        self._newest_fetched_newspaper_article_by_topic[topic_id] = dict()
+        for article_id in self._newspaper_article_index.get(topic_id, dict()):
+            self.article_show_lengths.pop(article_id, None)
+            self.article_summary_urls.pop(article_id, None)
+        self._newspaper_article_index[topic_id] = dict()
+        self._newspaper_published_dates[topic_id] = []
+        self._newspaper_published_date_labels[topic_id] = []
+        # reassigned so the computed vars reading the published dates are recomputed
+        self._newspaper_published_dates = self._newspaper_published_dates
+        self._newspaper_published_date_labels = self._newspaper_published_date_labels
+
+    def _add_published_date(self, topic_id: str, date_published: str):
+        """Insert a new published date of the given topic id in its sorted (latest first) dates."""
+        published_dates = self._newspaper_published_dates.setdefault(topic_id, [])
+        published_date_labels = self._newspaper_published_date_labels.setdefault(topic_id, [])
+        # binary search for the position of the date in the latest first order
+        lo, hi = 0, len(published_dates)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if published_dates[mid] > date_published:
+                lo = mid + 1
+            else:
+                hi = mid
+        published_dates.insert(lo, date_published)
+        published_date_labels.insert(lo, published_date_label(date_published))
+        # reassigned so the computed vars reading the published dates are recomputed
+        self._newspaper_published_dates = self._newspaper_published_dates
+        self._newspaper_published_date_labels = self._newspaper_published_date_labels
+
+    @rx.cached_var
     def get_selected_topic_name(self) -> str:
+        # NOTE - self is not referenced inside the comprehension so cached var dependencies are tracked
+        selected_newspaper_topic_id = self.selected_newspaper_topic_id
         selected_newspaper_topic = [
             newspaper_topic
             for newspaper_topic in self.newspaper_topics
-            if newspaper_topic.topic_id == self.selected_newspaper_topic_id
+            if newspaper_topic.topic_id == selected_newspaper_topic_id
         ]
         if not selected_newspaper_topic:
             return ""
         return selected_newspaper_topic[0].topic
 
-    @rx.var
+    @rx.cached_var
     def get_topic_newspaper_articles_no_date(self) -> List[List[NewsArticle]]:
         """Get the newspaper articles for the selected topic sorted by publishing date (latest first)."""
-        newspaper_articles = []
-        if not self.selected_newspaper_topic_id:
+        selected_newspaper_topic_id = self.selected_newspaper_topic_id
+        articles_by_date = self.newspaper.get(selected_newspaper_topic_id)
+        if not articles_by_date:
             return []
-        if self.selected_newspaper_topic_id not in self.newspaper:
-            return []
-        articles_by_date = self.newspaper[self.selected_newspaper_topic_id]
-        for published_date, articles in articles_by_date.items():
-            newspaper_articles.append([published_date, articles])
-        sorted_newspaper_articles = sorted(newspaper_articles, key=lambda x: x[0], reverse=True)
-        return [article for _, article in sorted_newspaper_articles]
+        # NOTE - the published dates are kept sorted as articles are added so no sorting is needed here
+        published_dates = self._newspaper_published_dates.get(selected_newspaper_topic_id, [])
+        return [articles_by_date[published_date] for published_date in published_dates]
 
-    @rx.var
+    @rx.cached_var
     def get_topic_newspaper_articles_published_dates(self) -> List[str]:
-        """Get the newspaper articles for the selected topic sorted by publishing date (latest first)."""
-        newspaper_published_dates: List[str] = []
-        if self.selected_newspaper_topic_id not in self.newspaper:
-            return newspaper_published_dates
-        articles_by_date = self.newspaper[self.selected_newspaper_topic_id]
-        for published_date, _ in articles_by_date.items():
-            newspaper_published_dates.append(published_date)
-        return [
-            lexicographic_date_s3_prefix_to_dt(dt_str).strftime("%A, %B %d, %Y")
-            for dt_str in sorted(newspaper_published_dates, reverse=True)
-        ]
+        """Get the display labels of the publishing dates of the selected topic (latest first)."""
+        return self._newspaper_published_date_labels.get(self.selected_newspaper_topic_id, [])
 
     def on_load_newspaper(self):
         """Load the news topics."""
-        logger.info(f"Loading newspaper state...")
+        logger.info("Loading newspaper state...")
         yield NewspaperState.refresh_user_subscribed_newspaper_topics()
         yield NewspaperState.refresh_selected_topic_newspaper_articles()
+        yield NewspaperState.warm_up_subscribed_topics_newspaper_articles()
         # TODO - is right?
@@ -0,0 +1,224 @@
+"""
+Builds the public routes of the exported frontend into a static site served without the backend.
+
+The html of the public routes is pre-rendered by the frontend export. It is copied along with the
+Next.js bundles, which are already fingerprinted, and the public assets, which get a content hash
+in their name. Gzip and (when the brotli package is installed) brotli variants of every
+compressible file are written next to it. The Cache-Control of each file is written both as a
+``_headers`` file (Netlify / Cloudflare Pages) and as an nginx snippet: fingerprinted files are
+cached for a year, the html for STATIC_SITE_HTML_MAX_AGE_SECS.
+
+The on_load events of the pages (e.g. the login verification of the landing page) are run by the
+backend when the page sends its initial hydrate event. That event is removed from the page bundles
+of the public routes, so viewing them sends no event to the backend; the pages served by the app
+keep it.
+
+Usage (see ``make static-site``)::
+
+    reflex export --frontend-only --no-zip
+    python -m the_daily_bite_web_app.static_site
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import gzip
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+
+from the_daily_bite_web_app.config import (
+    STATIC_SITE_EXPORT_DIR,
+    STATIC_SITE_HTML_MAX_AGE_SECS,
+    STATIC_SITE_OUTPUT_DIR,
+    STATIC_SITE_ROUTES,
+)
+from the_daily_bite_web_app.utils.telemetry import setup_logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = setup_logger(__name__)
+
+# the bundles next.js fingerprints itself
+NEXT_STATIC_DIR = "_next/static"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".css", ".json", ".map", ".svg", ".txt", ".xml", ".ico"}
+# smaller files aren't worth compressing
+MIN_COMPRESS_BYTES = 1024
+# the page bundles a pre-rendered page loads
+PAGE_BUNDLE_PATTERN = re.compile(rf'src="/({NEXT_STATIC_DIR}/chunks/pages/[^"]+\.js)"')
+# the hydrate event the initial state of a page queues (as json or as minified by next.js), running
+# the on_load events of the page on the backend
+INITIAL_HYDRATE_EVENT_PATTERN = re.compile(
+    r'("?events"?\s*:\s*\[)\s*\{\s*"?name"?\s*:\s*"state\.hydrate"\s*\}\s*(\])'
+)
+
+
+def route_html_path(export_dir: Path, route: str) -> Path:
+    """
+    Gets the pre-rendered html of a route in the frontend export.
+
+    :param export_dir: The directory of the frontend export.
+    :param route: The route (e.g. "/login").
+    :return: The path of the html file of the route.
+    """
+    name = route.strip("/") or "index"
+    html_path = export_dir / f"{name}.html"
+    if not html_path.exists():
+        html_path = export_dir / name / "index.html"
+    if not html_path.exists():
+        raise FileNotFoundError(f"No pre-rendered html for route {route} in {export_dir}")
+    return html_path
+
+
+def fingerprinted_name(path: Path) -> str:
+    """Gets the name of a file with the hash of its content (e.g. logo.0123456789ab.png)."""
+    content_hash = hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+    return f"{path.stem}.{content_hash}{path.suffix}"
+
+
+def html_cache_control() -> str:
+    return f"public, max-age={STATIC_SITE_HTML_MAX_AGE_SECS}, must-revalidate"
+
+
+def precompress(path: Path) -> List[Path]:
+    """
+    Writes the gzip and brotli variants of a file when it is compressible and they are smaller.
+
+    :param path: The file to compress.
+    :return: The variants written.
+    """
+    if path.suffix not in COMPRESSIBLE_SUFFIXES or path.stat().st_size < MIN_COMPRESS_BYTES:
+        return []
+    content = path.read_bytes()
+    # mtime=0 so that builds of the same content are identical
+    compressed_variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed_variants[".br"] = brotli.compress(content, quality=11)
+    variants = []
+    for suffix, compressed in compressed_variants.items():
+        if len(compressed) < len(content):
+            variant_path = path.with_name(path.name + suffix)
+            variant_path.write_bytes(compressed)
+            variants.append(variant_path)
+    return variants
+
+
+def remove_initial_hydrate_event(bundle_path: Path) -> bool:
+    """
+    Removes the hydrate event queued by the initial state of a page bundle, so that loading the page
+    doesn't run its on_load events on the backend.
+
+    :param bundle_path: The page bundle.
+    :return: Whether the bundle queued a hydrate event.
+    """
+    bundle = bundle_path.read_text()
+    bundle, count = INITIAL_HYDRATE_EVENT_PATTERN.subn(r"\1\2", bundle)
+    if count:
+        bundle_path.write_text(bundle)
+    return bool(count)
+
+
+def write_headers_file(output_dir: Path, cache_controls: Dict[str, str]) -> None:
+    """Writes the Cache-Control of each file in the ``_headers`` format of Netlify and Cloudflare."""
+    lines = [f"/{NEXT_STATIC_DIR}/*", f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}"]
+    for url_path, cache_control in sorted(cache_controls.items()):
+        lines += [url_path, f"  Cache-Control: {cache_control}"]
+    (output_dir / "_headers").write_text("\n".join(lines) + "\n")
+
+
+def write_nginx_config(output_dir: Path, fingerprinted_url_paths: Iterable[str]) -> None:
+    """Writes an nginx server snippet serving the site with its cache headers and precompressed files."""
+    lines = [
+        "# include in the server block serving the static site as its root",
+        "gzip_static on;",
+        "# requires the ngx_brotli module",
+        "# brotli_static on;",
+        "error_page 404 /404.html;",
+        f"location /{NEXT_STATIC_DIR}/ {{",
+        f'    add_header Cache-Control "{IMMUTABLE_CACHE_CONTROL}";',
+        "}",
+    ]
+    for url_path in sorted(fingerprinted_url_paths):
+        lines += [
+            f"location = {url_path} {{",
+            f'    add_header Cache-Control "{IMMUTABLE_CACHE_CONTROL}";',
+            "}",
+        ]
+    lines += [
+        "location / {",
+        "    try_files $uri $uri.html $uri/index.html =404;",
+        f'    add_header Cache-Control "{html_cache_control()}";',
+        "}",
+    ]
+    (output_dir / "nginx.conf").write_text("\n".join(lines) + "\n")
+
+
+def build_static_site(
+    export_dir: Path, output_dir: Path, routes: Optional[Iterable[str]] = None
+) -> Dict[str, str]:
+    """
+    Builds the static site of the public routes from the frontend export.
+
+    :param export_dir: The directory of the frontend export (reflex export --frontend-only --no-zip).
+    :param output_dir: The directory the static site is written to. Emptied first.
+    :param routes: The routes to include. Defaults to STATIC_SITE_ROUTES.
+    :return: The url path of each public asset fingerprinted to its fingerprinted url path.
+    """
+    routes = list(routes if routes is not None else STATIC_SITE_ROUTES)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    shutil.copytree(export_dir / NEXT_STATIC_DIR, output_dir / NEXT_STATIC_DIR)
+    # the public assets are copied under their name, for the references the bundles make to it,
+    # and under a fingerprinted name the pre-rendered html is rewritten to use
+    cache_controls: Dict[str, str] = {}
+    fingerprinted_url_paths: Dict[str, str] = {}
+    for asset_path in sorted(export_dir.iterdir()):
+        if asset_path.is_dir() or asset_path.suffix == ".html":
+            continue
+        shutil.copy2(asset_path, output_dir / asset_path.name)
+        fingerprinted_asset_name = fingerprinted_name(asset_path)
+        shutil.copy2(asset_path, output_dir / fingerprinted_asset_name)
+        fingerprinted_url_paths[f"/{asset_path.name}"] = f"/{fingerprinted_asset_name}"
+        cache_controls[f"/{asset_path.name}"] = html_cache_control()
+        cache_controls[f"/{fingerprinted_asset_name}"] = IMMUTABLE_CACHE_CONTROL
+    for route in routes:
+        html_path = route_html_path(export_dir, route)
+        html = html_path.read_text()
+        for url_path, fingerprinted_url_path in fingerprinted_url_paths.items():
+            html = html.replace(f'"{url_path}"', f'"{fingerprinted_url_path}"')
+        output_html_path = output_dir / html_path.relative_to(export_dir)
+        output_html_path.parent.mkdir(parents=True, exist_ok=True)
+        output_html_path.write_text(html)
+        for bundle in PAGE_BUNDLE_PATTERN.findall(html):
+            if not remove_initial_hydrate_event(output_dir / bundle):
+                logger.warning(
+                    "No initial hydrate event in the bundle %s of route %s", bundle, route
+                )
+        cache_controls[route] = html_cache_control()
+        cache_controls[
+            f"/{output_html_path.relative_to(output_dir).as_posix()}"
+        ] = html_cache_control()
+    compressed_files = 0
+    for directory, _, file_names in os.walk(output_dir):
+        for file_name in file_names:
+            compressed_files += bool(precompress(Path(directory) / file_name))
+    write_headers_file(output_dir, cache_controls)
+    write_nginx_config(output_dir, fingerprinted_url_paths.values())
+    logger.info(
+        "Built the static site of routes %s in %s: %d assets fingerprinted, %d files precompressed%s",
+        routes,
+        output_dir,
+        len(fingerprinted_url_paths),
+        compressed_files,
+        "" if brotli is not None else " (gzip only, brotli is not installed)",
+    )
+    return fingerprinted_url_paths
+
+
+if __name__ == "__main__":
+    build_static_site(Path(STATIC_SITE_EXPORT_DIR), Path(STATIC_SITE_OUTPUT_DIR))
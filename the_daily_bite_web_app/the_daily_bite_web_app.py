@@ -3,15 +3,30 @@
 import reflex as rx
 
 from the_daily_bite_web_app import styles
+from the_daily_bite_web_app.api import summary
+from the_daily_bite_web_app.config import (
+    DEBUG_ROUTES_TOKEN,
+    EVENT_LATENCY_ENABLED,
+    STATE_REDIS_URL,
+    STATE_SIZE_ENABLED,
+)
 from the_daily_bite_web_app.constants import (
     INDEX_PATH,
     LOGIN_PATH,
     NEWS_TOPICS_PATH,
     NEWSPAPER_PATH,
+    SUMMARIES_API_PATH,
     TITLE,
 )
-from the_daily_bite_web_app.middleware import CloseSidebarMiddleware
+from the_daily_bite_web_app.middleware import (
+    add_app_middleware,
+    caches,
+    event_latency,
+    state_size,
+    state_store,
+)
 from the_daily_bite_web_app.pages import index, login, news_topics, newsletter, newspaper, not_found
+from the_daily_bite_web_app.state_manager import use_redis_state_manager
 from the_daily_bite_web_app.states import BaseState, NewspaperState, NewsTopicsState
 
 on_load_all_pages = [BaseState.verify_login]
@@ -71,7 +86,18 @@ app.add_custom_404_page(
     title=TITLE.format(page_name="404"),
 )
 
-app.add_middleware(CloseSidebarMiddleware(), index=0)
+app.api.get(f"{SUMMARIES_API_PATH}/{{ref:path}}")(summary)
+add_app_middleware(app)
+if STATE_REDIS_URL:
+    use_redis_state_manager(app)
+if DEBUG_ROUTES_TOKEN:
+    app.api.get("/debug/caches")(caches)
+    if EVENT_LATENCY_ENABLED:
+        app.api.get("/debug/event-latency")(event_latency)
+    if STATE_SIZE_ENABLED:
+        app.api.get("/debug/state-size")(state_size)
+    if STATE_REDIS_URL:
+        app.api.get("/debug/state-store")(state_store)
 
 # Run the app.
 app.compile()
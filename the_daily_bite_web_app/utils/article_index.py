@@ -0,0 +1,371 @@
+"""A local SQLite index of the approved sourced articles of each topic."""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from news_aggregator_data_access_layer.constants import ArticleApprovalStatus
+from news_aggregator_data_access_layer.models.dynamodb import SourcedArticles
+
+from the_daily_bite_web_app.config import (
+    ARTICLE_INDEX_CHANGED_AT_ATTRIBUTE,
+    ARTICLE_INDEX_CHANGED_AT_INDEX,
+    ARTICLE_INDEX_DB_PATH,
+    ARTICLE_INDEX_ENABLED,
+    ARTICLE_INDEX_FULL_SYNC_INTERVAL_SECS,
+    ARTICLE_INDEX_SYNC_INTERVAL_SECS,
+    ARTICLE_INDEX_TOPIC_TTL_SECS,
+)
+from the_daily_bite_web_app.utils.sourced_articles import (
+    SOURCED_ARTICLES_LISTING_ATTRIBUTES,
+    sourced_article_key,
+    sourced_article_to_news_article_fields,
+)
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
+
+logger = setup_logger(__name__)
+
+# the key of the cursors handed out by the index, so they can be told apart from DynamoDB last evaluated keys
+INDEX_CURSOR_KEY = "approved_articles_index_sort_key"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS approved_articles (
+    topic_id TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    sort_key TEXT NOT NULL,
+    date_published TEXT NOT NULL,
+    article TEXT NOT NULL,
+    PRIMARY KEY (topic_id, article_id)
+);
+CREATE INDEX IF NOT EXISTS approved_articles_by_topic_sort_key
+    ON approved_articles (topic_id, sort_key);
+CREATE TABLE IF NOT EXISTS topic_sync_state (
+    topic_id TEXT PRIMARY KEY,
+    newest_article_key TEXT,
+    last_synced_at REAL NOT NULL,
+    last_full_synced_at REAL NOT NULL
+);
+"""
+
+
+def is_index_cursor(cursor: Optional[Dict[str, Any]]) -> bool:
+    """Whether a pagination cursor was handed out by the index (rather than by a DynamoDB query)."""
+    return bool(cursor) and INDEX_CURSOR_KEY in cursor  # type: ignore
+
+
+def _sort_key(article_fields: Dict[str, Any]) -> str:
+    # sorts the articles of a topic by publishing time, using the id as a tie breaker
+    return f"{article_fields['published_on_dt']}#{article_fields['article_id']}"
+
+
+class ApprovedArticlesIndex:
+    """
+    A local, SQLite backed, materialized index of the approved sourced articles of each topic.
+
+    A background thread keeps the topics tracked in sync with DynamoDB. Topics are tracked for
+    ``topic_ttl_secs`` after they were last passed to track_topics, and dropped from the index after.
+    When the sourced articles have a changed at attribute and an index on it, each sync only reads
+    the articles changed since the previous one, approved or not. Otherwise new articles are added
+    incrementally and the whole topic is re-read every full sync interval so that changes to the
+    approval status of older articles are picked up. Pages are then served by indexed local reads
+    which always return the number of articles asked for, unlike a filtered DynamoDB query.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        sync_interval_secs: float,
+        full_sync_interval_secs: float,
+        topic_ttl_secs: float,
+        changed_at_attribute: Optional[str] = None,
+        changed_at_index: Optional[str] = None,
+    ):
+        """
+        :param db_path: The path of the SQLite database. ":memory:" to keep it in memory.
+        :param sync_interval_secs: How often the topics tracked are synced.
+        :param full_sync_interval_secs: How often the topics tracked are fully re-read when there is
+                                        no changed at attribute.
+        :param topic_ttl_secs: How long a topic is tracked for after it was last passed to track_topics.
+        :param changed_at_attribute: The name of the sourced articles attribute updated when an article
+                                     changes (e.g. is approved).
+        :param changed_at_index: The name of the index with the topic id as hash key and the changed at
+                                 attribute as range key, projecting the article listing attributes.
+        """
+        self.sync_interval_secs = sync_interval_secs
+        self.full_sync_interval_secs = full_sync_interval_secs
+        self.topic_ttl_secs = topic_ttl_secs
+        if changed_at_attribute and (
+            not changed_at_index or changed_at_attribute not in SourcedArticles.get_attributes()
+        ):
+            logger.warning(
+                "No sourced articles attribute %s or no index %s on it. Fully re-reading the topics"
+                " every %s seconds instead",
+                changed_at_attribute,
+                changed_at_index,
+                full_sync_interval_secs,
+            )
+            changed_at_attribute, changed_at_index = None, None
+        self.changed_at_attribute = changed_at_attribute or None
+        self.changed_at_index = changed_at_index or None
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+        # the topics synced by this process, which can be read from the index
+        self._synced_topic_ids: Set[str] = set()
+        # <topic id>: <monotonic time it was last tracked at>
+        self._tracked_topics: Dict[str, float] = {}
+        self._sync_requested = threading.Event()
+        self._sync_thread: Optional[threading.Thread] = None
+
+    def track_topics(self, topic_ids: Iterable[str]) -> None:
+        """
+        Keep the given topics in sync in the background for the next topic ttl.
+
+        :param topic_ids: The topic ids to keep in sync.
+        """
+        now = time.monotonic()
+        with self._lock:
+            topic_ids = set(topic_ids)
+            new_topic_ids = topic_ids - set(self._tracked_topics)
+            for topic_id in topic_ids:
+                self._tracked_topics[topic_id] = now
+            if not new_topic_ids:
+                return
+            if self._sync_thread is None:
+                self._sync_thread = threading.Thread(
+                    target=self._sync_loop, name="approved-articles-index-sync", daemon=True
+                )
+                self._sync_thread.start()
+        self._sync_requested.set()
+
+    def untrack_idle_topics(self) -> List[str]:
+        """
+        Stop syncing the topics not tracked for the topic ttl and drop them from the index.
+
+        :return: The topic ids untracked.
+        """
+        tracked_before = time.monotonic() - self.topic_ttl_secs
+        with self._lock, self._connection:
+            idle_topic_ids = [
+                topic_id
+                for topic_id, tracked_at in self._tracked_topics.items()
+                if tracked_at <= tracked_before
+            ]
+            for topic_id in idle_topic_ids:
+                del self._tracked_topics[topic_id]
+                self._synced_topic_ids.discard(topic_id)
+                self._connection.execute(
+                    "DELETE FROM approved_articles WHERE topic_id = ?", (topic_id,)
+                )
+                self._connection.execute(
+                    "DELETE FROM topic_sync_state WHERE topic_id = ?", (topic_id,)
+                )
+        if idle_topic_ids:
+            logger.info("Untracked idle topic ids %s", idle_topic_ids)
+        return idle_topic_ids
+
+    def is_synced(self, topic_id: str) -> bool:
+        """Whether the topic was synced at least once and can be read from the index."""
+        return topic_id in self._synced_topic_ids
+
+    def sync_untracked_topic(self, topic_id: str) -> bool:
+        """
+        Track and sync a topic right away when it isn't synced, e.g. because it was untracked while
+        a session was still paging through it or because the session moved from another process.
+
+        :param topic_id: The topic id to sync.
+        :return: Whether the topic can be read from the index.
+        """
+        if self.is_synced(topic_id):
+            return True
+        self.track_topics([topic_id])
+        try:
+            self.sync_topic(topic_id)
+        except Exception as e:
+            logger.error(
+                "Error syncing approved articles for topic id %s: %s", topic_id, e, exc_info=True
+            )
+            metrics.increment("ArticleIndexSyncError")
+        return self.is_synced(topic_id)
+
+    def can_serve(self, topic_id: str, cursor: Optional[Dict[str, Any]]) -> bool:
+        """Whether a page of the topic starting at the given cursor can be read from the index."""
+        return self.is_synced(topic_id) and (not cursor or is_index_cursor(cursor))
+
+    def get_page(
+        self,
+        topic_id: str,
+        cursor: Optional[Dict[str, Any]],
+        count: int,
+        latest_first: bool = True,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Read a page of approved articles of a topic.
+
+        :param topic_id: The topic id to read articles for.
+        :param cursor: The cursor to resume reading from. None to start from the latest
+                       (or oldest when not latest_first) article.
+        :param count: The number of articles in the page.
+        :param latest_first: Whether to read from the latest articles to the oldest or the other way around.
+        :return: The NewsArticle fields of the articles in the page, the cursor of each article and
+                 the cursor to read the next page from (None when there are no more articles).
+        """
+        sort_key = cursor[INDEX_CURSOR_KEY] if is_index_cursor(cursor) else None  # type: ignore
+        if latest_first:
+            query = (
+                "SELECT sort_key, article FROM approved_articles WHERE topic_id = ? AND sort_key < ?"
+                " ORDER BY sort_key DESC LIMIT ?"
+            )
+            sort_key = sort_key if sort_key is not None else "\uffff"
+        else:
+            query = (
+                "SELECT sort_key, article FROM approved_articles WHERE topic_id = ? AND sort_key > ?"
+                " ORDER BY sort_key ASC LIMIT ?"
+            )
+            sort_key = sort_key if sort_key is not None else ""
+        with self._lock:
+            # one more row than asked for tells us whether there is a next page
+            rows = self._connection.execute(query, (topic_id, sort_key, count + 1)).fetchall()
+        articles = [json.loads(article) for _, article in rows[:count]]
+        cursors = [{INDEX_CURSOR_KEY: row_sort_key} for row_sort_key, _ in rows[:count]]
+        next_cursor = cursors[-1] if len(rows) > count else None
+        return articles, cursors, next_cursor
+
+    def sync_topic(self, topic_id: str) -> None:
+        """
+        Sync the topic with DynamoDB.
+
+        The topic is fully read when it was never synced. Otherwise only the articles changed since
+        the last sync are read when there is a changed at attribute, and the articles newer than the
+        newest one indexed when there is none, unless the topic was fully synced more than the full
+        sync interval ago, in which case all of it is re-read.
+
+        :param topic_id: The topic id to sync.
+        """
+        with self._lock:
+            sync_state = self._connection.execute(
+                "SELECT newest_article_key, last_synced_at, last_full_synced_at FROM topic_sync_state"
+                " WHERE topic_id = ?",
+                (topic_id,),
+            ).fetchone()
+        now = time.time()
+        full_sync = sync_state is None or (
+            self.changed_at_attribute is None
+            and now - sync_state[2] >= self.full_sync_interval_secs
+        )
+        newest_article_key = json.loads(sync_state[0]) if sync_state and sync_state[0] else None
+        changes_only = not full_sync and self.changed_at_attribute is not None
+        if changes_only:
+            # approved or not, so that the articles no longer approved are removed. the changes made
+            # during the previous sync are read again in case they weren't in the index yet
+            changed_since = datetime.fromtimestamp(
+                sync_state[1] - self.sync_interval_secs, tz=timezone.utc
+            )
+            sourced_articles = SourcedArticles.query(
+                topic_id,
+                range_key_condition=getattr(SourcedArticles, self.changed_at_attribute)
+                > changed_since,
+                index_name=self.changed_at_index,
+                attributes_to_get=[
+                    *SOURCED_ARTICLES_LISTING_ATTRIBUTES,
+                    SourcedArticles.article_approval_status,
+                ],
+            )
+        else:
+            # read from the oldest article to the latest so the last article read is the newest
+            sourced_articles = SourcedArticles.query(
+                topic_id,
+                scan_index_forward=True,
+                filter_condition=SourcedArticles.article_approval_status
+                == ArticleApprovalStatus.APPROVED,
+                last_evaluated_key=None if full_sync else newest_article_key,
+                attributes_to_get=SOURCED_ARTICLES_LISTING_ATTRIBUTES,
+            )
+        rows = []
+        removed_article_ids = []
+        for sourced_article in sourced_articles:
+            article_fields = sourced_article_to_news_article_fields(sourced_article)
+            if changes_only and sourced_article.article_approval_status not in [
+                ArticleApprovalStatus.APPROVED,
+                ArticleApprovalStatus.APPROVED.value,
+            ]:
+                removed_article_ids.append((topic_id, article_fields["article_id"]))
+                continue
+            rows.append(
+                (
+                    topic_id,
+                    article_fields["article_id"],
+                    _sort_key(article_fields),
+                    article_fields["date_published"],
+                    json.dumps(article_fields),
+                )
+            )
+            if not changes_only:
+                newest_article_key = sourced_article_key(sourced_article)
+        with self._lock, self._connection:
+            if full_sync:
+                self._connection.execute(
+                    "DELETE FROM approved_articles WHERE topic_id = ?", (topic_id,)
+                )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO approved_articles VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._connection.executemany(
+                "DELETE FROM approved_articles WHERE topic_id = ? AND article_id = ?",
+                removed_article_ids,
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO topic_sync_state VALUES (?, ?, ?, ?)",
+                (
+                    topic_id,
+                    json.dumps(newest_article_key) if newest_article_key else None,
+                    now,
+                    now if full_sync else sync_state[2],
+                ),
+            )
+            self._synced_topic_ids.add(topic_id)
+        logger.info(
+            "Synced %d approved and %d removed articles for topic id %s. Full sync: %s",
+            len(rows),
+            len(removed_article_ids),
+            topic_id,
+            full_sync,
+        )
+
+    def _sync_loop(self) -> None:
+        while True:
+            self._sync_requested.wait(timeout=self.sync_interval_secs)
+            self._sync_requested.clear()
+            self.untrack_idle_topics()
+            with self._lock:
+                topic_ids = list(self._tracked_topics)
+            for topic_id in topic_ids:
+                try:
+                    self.sync_topic(topic_id)
+                except Exception as e:
+                    logger.error(
+                        "Error syncing approved articles for topic id %s: %s",
+                        topic_id,
+                        e,
+                        exc_info=True,
+                    )
+                    metrics.increment("ArticleIndexSyncError")
+
+
+approved_articles_index: Optional[ApprovedArticlesIndex] = (
+    ApprovedArticlesIndex(
+        ARTICLE_INDEX_DB_PATH,
+        sync_interval_secs=ARTICLE_INDEX_SYNC_INTERVAL_SECS,
+        full_sync_interval_secs=ARTICLE_INDEX_FULL_SYNC_INTERVAL_SECS,
+        topic_ttl_secs=ARTICLE_INDEX_TOPIC_TTL_SECS,
+        changed_at_attribute=ARTICLE_INDEX_CHANGED_AT_ATTRIBUTE,
+        changed_at_index=ARTICLE_INDEX_CHANGED_AT_INDEX,
+    )
+    if ARTICLE_INDEX_ENABLED
+    else None
+)
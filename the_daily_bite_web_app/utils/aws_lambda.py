@@ -1,15 +1,58 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import asyncio
+import functools
 import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
 import requests
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
 from news_aggregator_data_access_layer.config import LOCAL_TESTING, REGION_NAME
+from requests.adapters import HTTPAdapter
 
+from the_daily_bite_web_app.config import (
+    LAMBDA_INVOKE_BASE_BACKOFF_SECS,
+    LAMBDA_INVOKE_MAX_ATTEMPTS,
+    LAMBDA_INVOKE_MAX_CONCURRENCY,
+    LAMBDA_INVOKE_TIMEOUT_SECS,
+)
 from the_daily_bite_web_app.exceptions import InvokeFunctionException
-from the_daily_bite_web_app.utils.telemetry import setup_logger
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
 
 logger = setup_logger(__name__)
 
+# the lambda error codes worth retrying, the other client errors (e.g. bad parameters) are not
+RETRYABLE_LAMBDA_ERROR_CODES = {
+    "TooManyRequestsException",
+    "ServiceException",
+    "ResourceNotReadyException",
+    "EC2ThrottledException",
+    "ENILimitReachedException",
+    "ThrottlingException",
+}
+# the connection errors and timeouts botocore retries by default, retried by the invoker instead
+RETRYABLE_CONNECTION_ERRORS = (
+    EndpointConnectionError,
+    ConnectTimeoutError,
+    ReadTimeoutError,
+    ConnectionClosedError,
+)
+
+
+class RetryableInvokeError(Exception):
+    """A failed invocation that may succeed if retried."""
+
 
 def process_lambda_response(function_name: str, response: dict) -> dict:
     """
@@ -25,11 +68,249 @@ def process_lambda_response(function_name: str, response: dict) -> dict:
     return response
 
 
+class LambdaInvoker:
+    """
+    Invokes Lambda functions with a long lived client, bounded concurrency and retries.
+
+    In local testing the functions are invoked over HTTP (e.g. the Lambda runtime interface
+    emulator) with a pooled session, with the same concurrency limit and retries.
+    """
+
+    def __init__(
+        self,
+        region_name: str,
+        local_testing: bool,
+        max_concurrency: int,
+        max_attempts: int,
+        base_backoff_secs: float,
+        timeout_secs: float,
+    ):
+        """
+        :param region_name: The region of the Lambda functions.
+        :param local_testing: Whether to invoke the functions over HTTP at their function url.
+        :param max_concurrency: The maximum number of invocations in progress at once.
+        :param max_attempts: The number of times an invocation is attempted when it fails with a
+                             retryable error.
+        :param base_backoff_secs: The maximum backoff before the second attempt, doubled after each attempt.
+        :param timeout_secs: The timeout of a single attempt.
+        """
+        self.region_name = region_name
+        self.local_testing = local_testing
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_backoff_secs = base_backoff_secs
+        self.timeout_secs = timeout_secs
+        self._concurrency = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="lambda-invoke"
+        )
+        self._lock = threading.Lock()
+        self._lambda_client: Any = None
+        self._session: Optional[requests.Session] = None
+
+    @property
+    def lambda_client(self) -> Any:
+        if self._lambda_client is None:
+            with self._lock:
+                if self._lambda_client is None:
+                    # retries are done by the invoker so they're counted against max_attempts
+                    self._lambda_client = boto3.client(
+                        "lambda",
+                        region_name=self.region_name,
+                        config=Config(
+                            max_pool_connections=self.max_concurrency,
+                            read_timeout=self.timeout_secs,
+                            retries={"total_max_attempts": 1},
+                        ),
+                    )
+        return self._lambda_client
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_maxsize=self.max_concurrency)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def invoke(
+        self,
+        function_name: str,
+        function_params: dict,
+        function_url: str = "",
+        get_log: bool = False,
+    ) -> dict:
+        """
+        Invokes a Lambda function, retrying throttling, service and connection errors.
+
+        :param function_name: The name of the function to invoke.
+        :param function_params: The parameters of the function as a dict. This dict
+                                is serialized to JSON before it is sent to Lambda.
+        :param function_url: The url of the function, only used in local testing.
+        :param get_log: When true, the last 4 KB of the execution log are included in
+                        the response.
+        :return: The response from the function invocation.
+        :raises InvokeFunctionException: When the invocation fails.
+        """
+        logger.info("Invoking function %s with params %s", function_name, function_params)
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with self._concurrency, metrics.timer(
+                    "LambdaInvokeLatency", dimensions={"Function": function_name}
+                ):
+                    if self.local_testing:
+                        response = self._invoke_local(function_name, function_params, function_url)
+                    else:
+                        response = self._invoke_lambda(function_name, function_params, get_log)
+                return process_lambda_response(function_name, response)
+            except RetryableInvokeError as e:
+                if attempt == self.max_attempts:
+                    logger.error(
+                        "Couldn't invoke function %s after %s attempts. Error: %s",
+                        function_name,
+                        attempt,
+                        e,
+                    )
+                    metrics.increment("LambdaInvokeError", dimensions={"Function": function_name})
+                    raise InvokeFunctionException(function_name)
+                backoff_secs = random.uniform(0, self.base_backoff_secs * 2 ** (attempt - 1))
+                logger.warning(
+                    "Retrying function %s in %.2fs after attempt %s failed. Error: %s",
+                    function_name,
+                    backoff_secs,
+                    attempt,
+                    e,
+                )
+                time.sleep(backoff_secs)
+            except Exception as e:
+                logger.error("Couldn't invoke function %s. Error: %s", function_name, e)
+                metrics.increment("LambdaInvokeError", dimensions={"Function": function_name})
+                raise InvokeFunctionException(function_name)
+        raise InvokeFunctionException(function_name)
+
+    def invoke_many(
+        self, invocations: Sequence[Tuple[str, dict]], function_url: str = ""
+    ) -> List[Union[dict, InvokeFunctionException]]:
+        """
+        Invokes Lambda functions concurrently, up to the invoker's max concurrency.
+
+        :param invocations: The (function name, function params) of each invocation.
+        :param function_url: The url of the functions, only used in local testing.
+        :return: The response or the exception of each invocation, in the order of the invocations.
+        """
+        futures = [
+            self._executor.submit(self.invoke, function_name, function_params, function_url)
+            for function_name, function_params in invocations
+        ]
+        results: List[Union[dict, InvokeFunctionException]] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except InvokeFunctionException as e:
+                results.append(e)
+        return results
+
+    async def invoke_async(
+        self,
+        function_name: str,
+        function_params: dict,
+        function_url: str = "",
+        get_log: bool = False,
+    ) -> dict:
+        """
+        Invokes a Lambda function on the invoker's threads so that the event loop isn't blocked. See invoke.
+
+        :param function_name: The name of the function to invoke.
+        :param function_params: The parameters of the function as a dict.
+        :param function_url: The url of the function, only used in local testing.
+        :param get_log: When true, the last 4 KB of the execution log are included in the response.
+        :return: The response from the function invocation.
+        :raises InvokeFunctionException: When the invocation fails.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(self.invoke, function_name, function_params, function_url, get_log),
+        )
+
+    async def invoke_many_async(
+        self, invocations: Sequence[Tuple[str, dict]], function_url: str = ""
+    ) -> List[Union[dict, InvokeFunctionException]]:
+        """
+        Invokes Lambda functions concurrently without blocking the event loop. See invoke_many.
+
+        :param invocations: The (function name, function params) of each invocation.
+        :param function_url: The url of the functions, only used in local testing.
+        :return: The response or the exception of each invocation, in the order of the invocations.
+        """
+        return list(
+            await asyncio.gather(
+                *[
+                    self.invoke_async(function_name, function_params, function_url)
+                    for function_name, function_params in invocations
+                ],
+                return_exceptions=True,
+            )
+        )
+
+    def _invoke_lambda(self, function_name: str, function_params: dict, get_log: bool) -> dict:
+        try:
+            response = self.lambda_client.invoke(
+                FunctionName=function_name,
+                Payload=json.dumps(function_params),
+                LogType="Tail" if get_log else "None",
+            )
+        except RETRYABLE_CONNECTION_ERRORS as e:
+            raise RetryableInvokeError(str(e)) from e
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in RETRYABLE_LAMBDA_ERROR_CODES:
+                raise RetryableInvokeError(str(e)) from e
+            raise
+        if response["StatusCode"] != 200:
+            raise RuntimeError(
+                "%s returned status code %d." % (function_name, response["StatusCode"])
+            )
+        return json.loads(response["Payload"].read())
+
+    def _invoke_local(self, function_name: str, function_params: dict, function_url: str) -> dict:
+        url = f"{function_url}/2015-03-31/functions/function/invocations"
+        logger.info(
+            "Invoking function in local testing at url %s with params %s", url, function_params
+        )
+        try:
+            response = self.session.post(url, json=function_params, timeout=self.timeout_secs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableInvokeError(str(e)) from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableInvokeError(
+                f"{function_name} returned status code {response.status_code}. Response text {response.text}."
+            )
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"{function_name} returned status code {response.status_code}. Response text {response.text}."
+            )
+        return response.json()
+
+
+lambda_invoker = LambdaInvoker(
+    region_name=REGION_NAME,
+    local_testing=LOCAL_TESTING,
+    max_concurrency=LAMBDA_INVOKE_MAX_CONCURRENCY,
+    max_attempts=LAMBDA_INVOKE_MAX_ATTEMPTS,
+    base_backoff_secs=LAMBDA_INVOKE_BASE_BACKOFF_SECS,
+    timeout_secs=LAMBDA_INVOKE_TIMEOUT_SECS,
+)
+
+
 def invoke_function(
     function_name: str, function_params: dict, function_url: str = "", get_log: bool = False
 ) -> dict:
     """
-    Invokes a Lambda function.
+    Invokes a Lambda function with the shared invoker.
 
     :param function_name: The name of the function to invoke.
     :param function_params: The parameters of the function as a dict. This dict
@@ -38,41 +319,21 @@ def invoke_function(
                     the response.
     :return: The response from the function invocation.
     """
-    try:
-        logger.info(f"Invoking function {function_name} with params {function_params}")
-        if not LOCAL_TESTING:
-            lambda_client = boto3.client("lambda", region_name=REGION_NAME)
-            response = lambda_client.invoke(
-                FunctionName=function_name,
-                Payload=json.dumps(function_params),
-                LogType="Tail" if get_log else "None",
-            )
-            if response["StatusCode"] != 200:
-                raise RuntimeError(
-                    "%s returned status code %d." % (function_name, response["StatusCode"])
-                )
-            processed_response = json.loads(response["Payload"].read())
-            return process_lambda_response(function_name, processed_response)
-        else:
-            url = f"{function_url}/2015-03-31/functions/function/invocations"
-            logger.info(
-                f"Invoking function in local testing at url {url} with params {function_params}"
-            )
-            response = requests.post(
-                url,
-                json=function_params,
-                timeout=30,
-            )
-            if response.status_code != 200:
-                raise RuntimeError(
-                    f"{function_name} returned status code {response.status_code}. Response text {response.text}."
-                )
-            processed_response = response.json()
-            return process_lambda_response(function_name, processed_response)
-    except ClientError as e:
-        logger.error(f"Couldn't invoke function {function_name}. Error: {e}")
-        raise InvokeFunctionException(function_name)
-    except Exception as e:
-        logger.error(f"Couldn't invoke function {function_name}. Error: {e}")
-        raise InvokeFunctionException(function_name)
-    return processed_response
+    return lambda_invoker.invoke(function_name, function_params, function_url, get_log)
+
+
+async def invoke_function_async(
+    function_name: str, function_params: dict, function_url: str = "", get_log: bool = False
+) -> dict:
+    """
+    Invokes a Lambda function with the shared invoker without blocking the event loop, for the
+    async event handlers.
+
+    :param function_name: The name of the function to invoke.
+    :param function_params: The parameters of the function as a dict. This dict
+                            is serialized to JSON before it is sent to Lambda.
+    :param get_log: When true, the last 4 KB of the execution log are included in
+                    the response.
+    :return: The response from the function invocation.
+    """
+    return await lambda_invoker.invoke_async(function_name, function_params, function_url, get_log)
@@ -0,0 +1,203 @@
+"""Process-wide in-memory caches shared across client sessions."""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from the_daily_bite_web_app.config import CACHE_STATS_PUBLISH_INTERVAL_SECS
+from the_daily_bite_web_app.utils.telemetry import metrics
+
+_MISSING = object()
+
+# every cache created, to publish and serve their statistics
+_caches: "weakref.WeakSet[LRUCache]" = weakref.WeakSet()
+# <cache>: (<hits>, <misses>, <evictions>) at the last publishing, to publish the counts since
+_published_counts: "weakref.WeakKeyDictionary[LRUCache, Tuple[int, int, int]]" = (
+    weakref.WeakKeyDictionary()
+)
+_publisher_lock = threading.Lock()
+_publisher_thread: Optional[threading.Thread] = None
+
+
+class LRUCache:
+    """
+    A thread safe least recently used cache with an optional time to live and byte budget.
+
+    Entries are evicted least recently used first once either ``max_entries`` or ``max_bytes``
+    is exceeded. Expired entries are dropped lazily when they are read.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        """
+        :param name: The name of the cache, used when reporting statistics.
+        :param max_entries: The maximum number of entries to hold. No limit when None.
+        :param ttl_seconds: How long an entry is served for after being set. No expiry when None.
+        :param max_bytes: The maximum total size of the entries. No limit when None.
+        :param sizeof: Returns the size of a value in bytes. Defaults to sys.getsizeof.
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or sys.getsizeof
+        # <key>: (<value>, <expires at monotonic time or None>, <size in bytes>)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        _caches.add(self)
+        if CACHE_STATS_PUBLISH_INTERVAL_SECS and _publisher_thread is None:
+            _start_publisher_thread()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, record_stats=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, record_stats: bool = True) -> Any:
+        """
+        Get a value from the cache.
+
+        :param key: The key of the entry.
+        :param default: The value returned when the key is missing or expired.
+        :param record_stats: Whether the lookup counts towards the hit/miss statistics.
+        :return: The cached value or the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    if record_stats:
+                        self._hits += 1
+                    return value
+                self._remove(key)
+            if record_stats:
+                self._misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Set a value in the cache, evicting the least recently used entries if needed.
+
+        Values larger than the byte budget on their own are not cached.
+
+        :param key: The key of the entry.
+        :param value: The value to cache.
+        """
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._total_bytes += size
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Get a value from the cache, loading and caching it on a miss.
+
+        The loader is called outside of the cache lock so a slow load does not block other keys.
+
+        :param key: The key of the entry.
+        :param loader: Called with no arguments to produce the value on a miss.
+        :return: The cached or freshly loaded value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove an entry from the cache if present."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache. Statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the hit/miss statistics and the current size of the cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "name": self.name,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._total_bytes -= size
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """Get the statistics of every cache, by name."""
+    return sorted((cache.stats() for cache in list(_caches)), key=lambda stats: stats["name"])
+
+
+def publish_cache_stats() -> None:
+    """Publish the hits, misses and evictions of every cache since the last call, and their sizes."""
+    for cache in list(_caches):
+        stats = cache.stats()
+        counts = (stats["hits"], stats["misses"], stats["evictions"])
+        published_counts = _published_counts.get(cache, (0, 0, 0))
+        _published_counts[cache] = counts
+        dimensions = {"Cache": cache.name}
+        for metric_name, count, published_count in zip(
+            ["CacheHit", "CacheMiss", "CacheEviction"], counts, published_counts
+        ):
+            if count > published_count:
+                metrics.increment(metric_name, count - published_count, dimensions=dimensions)
+        metrics.record("CacheEntries", stats["entries"], dimensions=dimensions)
+        if cache.max_bytes is not None:
+            metrics.record("CacheSize", stats["bytes"], dimensions=dimensions, unit="Bytes")
+
+
+def _start_publisher_thread() -> None:
+    global _publisher_thread
+    with _publisher_lock:
+        if _publisher_thread is None:
+            _publisher_thread = threading.Thread(
+                target=_publish_loop, name="cache-stats-publish", daemon=True
+            )
+            _publisher_thread.start()
+
+
+def _publish_loop() -> None:
+    while True:
+        time.sleep(CACHE_STATS_PUBLISH_INTERVAL_SECS)
+        publish_cache_stats()
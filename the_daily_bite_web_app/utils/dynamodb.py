@@ -0,0 +1,128 @@
+"""Helpers to write to DynamoDB in batches."""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple, Type
+
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from pynamodb.exceptions import PutError
+from pynamodb.models import BatchWrite, Model
+
+from the_daily_bite_web_app.config import DYNAMODB_BATCH_WRITE_CONCURRENCY
+from the_daily_bite_web_app.utils.telemetry import setup_logger
+
+logger = setup_logger(__name__)
+
+# the maximum number of items in a single BatchWriteItem request
+BATCH_WRITE_MAX_ITEMS = 25
+
+_batch_write_executor = ThreadPoolExecutor(
+    max_workers=DYNAMODB_BATCH_WRITE_CONCURRENCY, thread_name_prefix="dynamodb-batch-write"
+)
+
+
+class BatchWriteResult(NamedTuple):
+    """The items of a batch write that could not be written."""
+
+    failed_saves: List[Model]
+    failed_deletes: List[Model]
+
+
+def _serialized_key(model: Type[Model], serialized_item: Dict[str, Any]) -> str:
+    # the primary key of a serialized item, comparable with the keys of unprocessed items
+    return json.dumps(
+        {
+            attribute.attr_name: serialized_item.get(attribute.attr_name)
+            for attribute in model.get_attributes().values()
+            if attribute.is_hash_key or attribute.is_range_key
+        },
+        sort_keys=True,
+    )
+
+
+def _write_chunk(
+    model: Type[Model], operations: Sequence[Tuple[str, Model]]
+) -> List[Tuple[str, Model]]:
+    """
+    Writes up to BATCH_WRITE_MAX_ITEMS items in a single batch, retrying the unprocessed items.
+
+    :param model: The model of the items.
+    :param operations: The ("save" or "delete", item) operations to write.
+    :return: The operations that could not be written.
+    """
+    batch = BatchWrite(model, auto_commit=False)
+    for action, item in operations:
+        if action == "save":
+            batch.save(item)
+        else:
+            batch.delete(item)
+    try:
+        # unprocessed items are retried with a backoff up to the model's max_retry_attempts
+        batch.commit()
+    except PutError as e:
+        unprocessed_keys = {
+            _serialized_key(
+                model,
+                failed_operation["PutRequest"]["Item"]
+                if "PutRequest" in failed_operation
+                else failed_operation["DeleteRequest"]["Key"],
+            )
+            for failed_operation in batch.failed_operations or []
+        }
+        logger.error(
+            "Failed to write %s %s items in a batch: %s",
+            len(unprocessed_keys),
+            model.__name__,
+            e,
+            exc_info=True,
+        )
+        if not unprocessed_keys:
+            return list(operations)
+        return [
+            (action, item)
+            for action, item in operations
+            if _serialized_key(model, item.serialize(null_check=False)) in unprocessed_keys
+        ]
+    except Exception as e:
+        logger.error("Failed to write %s items in a batch: %s", model.__name__, e, exc_info=True)
+        return list(operations)
+    return []
+
+
+def batch_write(
+    model: Type[Model],
+    items_to_save: Iterable[Model],
+    items_to_delete: Iterable[Model],
+    concurrent: bool = True,
+) -> BatchWriteResult:
+    """
+    Saves and deletes items in BatchWriteItem requests of up to BATCH_WRITE_MAX_ITEMS items,
+    sending up to DYNAMODB_BATCH_WRITE_CONCURRENCY requests concurrently.
+
+    The same item (primary key) must not be both saved and deleted.
+
+    :param model: The model of the items.
+    :param items_to_save: The items to save.
+    :param items_to_delete: The items to delete.
+    :param concurrent: Whether the requests are sent concurrently from the thread pool. False to send
+                       them one after the other from the calling thread, e.g. at exit, once the
+                       thread pool is shut down.
+    :return: The items that could not be saved or deleted.
+    """
+    operations = [("save", item) for item in items_to_save] + [
+        ("delete", item) for item in items_to_delete
+    ]
+    chunks = [
+        operations[idx : idx + BATCH_WRITE_MAX_ITEMS]
+        for idx in range(0, len(operations), BATCH_WRITE_MAX_ITEMS)
+    ]
+    failed_saves: List[Model] = []
+    failed_deletes: List[Model] = []
+    write_chunk = functools.partial(_write_chunk, model)
+    for failed_operations in (
+        _batch_write_executor.map(write_chunk, chunks) if concurrent else map(write_chunk, chunks)
+    ):
+        for action, item in failed_operations:
+            (failed_saves if action == "save" else failed_deletes).append(item)
+    return BatchWriteResult(failed_saves, failed_deletes)
@@ -0,0 +1,131 @@
+"""Latency histograms with percentile estimates."""
+
+from typing import Any, Dict, List, Optional
+
+import bisect
+import math
+import threading
+import time
+
+from the_daily_bite_web_app.utils.telemetry import setup_logger
+
+logger = setup_logger(__name__)
+
+# the upper bounds, in milliseconds, of the histogram buckets: 0.1ms to ~100s, each bucket 25% wider
+# than the previous one
+_BUCKET_GROWTH = 1.25
+BUCKET_UPPER_BOUNDS_MS: List[float] = [
+    0.1 * _BUCKET_GROWTH**idx for idx in range(int(math.log(1e6, _BUCKET_GROWTH)) + 1)
+]
+
+
+class LatencyHistogram:
+    """A fixed size histogram of latencies in log spaced buckets."""
+
+    def __init__(self):
+        self._counts = [0] * (len(BUCKET_UPPER_BOUNDS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float) -> None:
+        self._counts[bisect.bisect_left(BUCKET_UPPER_BOUNDS_MS, latency_ms)] += 1
+        self.count += 1
+        self.sum_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Estimate a percentile of the latencies recorded.
+
+        :param percentile: The percentile, between 0 and 100.
+        :return: The estimated percentile, interpolated within its bucket, in milliseconds.
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percentile / 100)
+        seen = 0
+        for idx, count in enumerate(self._counts):
+            if seen + count >= rank:
+                if idx == len(BUCKET_UPPER_BOUNDS_MS):
+                    return self.max_ms
+                lower_bound = BUCKET_UPPER_BOUNDS_MS[idx - 1] if idx else 0.0
+                upper_bound = BUCKET_UPPER_BOUNDS_MS[idx]
+                estimate = lower_bound + (upper_bound - lower_bound) * (rank - seen) / count
+                return min(estimate, self.max_ms)
+            seen += count
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.sum_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
+
+
+class LatencyHistograms:
+    """Thread safe latency histograms by name, optionally logged periodically."""
+
+    def __init__(self, name: str, log_interval_secs: float = 0):
+        """
+        :param name: The name of the histograms, used in the logs.
+        :param log_interval_secs: How often the summaries are logged. Never when 0.
+        """
+        self.name = name
+        self.log_interval_secs = log_interval_secs
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._logger_thread: Optional[threading.Thread] = None
+
+    def record(self, name: str, latency_ms: float) -> None:
+        """
+        Record a latency.
+
+        :param name: The name of the histogram (e.g. the event handler).
+        :param latency_ms: The latency in milliseconds.
+        """
+        if self.log_interval_secs and self._logger_thread is None:
+            self._start_logger_thread()
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(latency_ms)
+
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        """Get the count, mean, p50, p95, p99 and max latency of each histogram, slowest p99 first."""
+        with self._lock:
+            summaries = {name: histogram.summary() for name, histogram in self._histograms.items()}
+        return dict(sorted(summaries.items(), key=lambda item: item[1]["p99_ms"], reverse=True))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {}
+
+    def _start_logger_thread(self) -> None:
+        with self._lock:
+            if self._logger_thread is None:
+                self._logger_thread = threading.Thread(
+                    target=self._log_loop, name=f"{self.name}-latency-log", daemon=True
+                )
+                self._logger_thread.start()
+
+    def _log_loop(self) -> None:
+        while True:
+            time.sleep(self.log_interval_secs)
+            for name, summary in self.summaries().items():
+                logger.info(
+                    "%s latency of %s: count=%d mean=%.1fms p50=%.1fms p95=%.1fms p99=%.1fms max=%.1fms",
+                    self.name,
+                    name,
+                    summary["count"],
+                    summary["mean_ms"],
+                    summary["p50_ms"],
+                    summary["p95_ms"],
+                    summary["p99_ms"],
+                    summary["max_ms"],
+                )
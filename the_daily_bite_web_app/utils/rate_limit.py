@@ -0,0 +1,94 @@
+"""Process-wide rate limiting of client actions."""
+
+from typing import Any, Deque, Dict, Hashable, Mapping
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class SlidingWindowRateLimiter:
+    """
+    A thread safe rate limiter allowing each key a maximum number of attempts in a sliding window.
+
+    Only the most recently seen ``max_keys`` keys are tracked so memory stays bounded.
+    """
+
+    def __init__(self, name: str, max_attempts: int, window_seconds: float, max_keys: int = 100000):
+        """
+        :param name: The name of the rate limiter, used when reporting statistics.
+        :param max_attempts: The number of attempts allowed per key in the window.
+        :param window_seconds: The length of the sliding window.
+        :param max_keys: The maximum number of keys tracked.
+        """
+        self.name = name
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        # <key>: <monotonic times of the attempts in the window>
+        self._attempts: "OrderedDict[Hashable, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._limited = 0
+
+    def allow(self, key: Hashable) -> bool:
+        """
+        Record an attempt for the key if it is within its limit.
+
+        :param key: The key to rate limit on (e.g. the client ip).
+        :return: Whether the attempt is allowed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts is None:
+                attempts = deque()
+                self._attempts[key] = attempts
+                if len(self._attempts) > self.max_keys:
+                    self._attempts.popitem(last=False)
+            else:
+                self._attempts.move_to_end(key)
+            while attempts and attempts[0] <= now - self.window_seconds:
+                attempts.popleft()
+            if len(attempts) >= self.max_attempts:
+                self._limited += 1
+                return False
+            attempts.append(now)
+            self._allowed += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of attempts allowed and limited."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "allowed": self._allowed,
+                "limited": self._limited,
+                "keys": len(self._attempts),
+            }
+
+
+def client_ip(peer_ip: str, headers: Mapping[str, str], trusted_proxy_hops: int) -> str:
+    """
+    Get the ip of a client, from the X-Forwarded-For header when the app is behind trusted proxies.
+
+    Each proxy appends the address it received the request from to X-Forwarded-For, so behind n
+    trusted proxies the n-th address from the right is the one the outermost of them saw. The
+    addresses left of it are set by the client and are never used.
+
+    :param peer_ip: The address of the connection to the app.
+    :param headers: The request headers, with lowercase names.
+    :param trusted_proxy_hops: The number of proxies in front of the app. 0 to use the peer address.
+    :return: The client ip. The peer address when the header holds fewer addresses than hops, as the
+             request didn't come through the proxies.
+    """
+    if trusted_proxy_hops <= 0:
+        return peer_ip
+    forwarded_for = [
+        address.strip()
+        for address in headers.get("x-forwarded-for", "").split(",")
+        if address.strip()
+    ]
+    if len(forwarded_for) < trusted_proxy_hops:
+        return peer_ip
+    return forwarded_for[-trusted_proxy_hops]
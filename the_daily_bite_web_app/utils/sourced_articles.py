@@ -0,0 +1,124 @@
+"""Conversions of the sourced articles stored in DynamoDB to what the newspaper displays."""
+
+from typing import Any, Dict, List
+
+import json
+
+from news_aggregator_data_access_layer.constants import SummarizationLength
+from news_aggregator_data_access_layer.models.dynamodb import SourcedArticles
+
+from the_daily_bite_web_app.config import (
+    ARTICLE_DETAILS_CACHE_MAX_ENTRIES,
+    MAX_SOURCES_PER_ARTICLE_IN_UI,
+)
+from the_daily_bite_web_app.utils.cache import LRUCache
+
+# the attribute names making up the primary key of a sourced article; used to build query start keys
+SOURCED_ARTICLES_KEY_ATTRIBUTE_NAMES = [
+    attribute.attr_name
+    for attribute in SourcedArticles.get_attributes().values()
+    if attribute.is_hash_key or attribute.is_range_key
+]
+
+# the attributes read when listing articles: only what the article card renders (the first sources
+# shown in the ui included) and the short summary ref so it can be prefetched. the remaining
+# summary refs are read when the reader expands an article
+SOURCED_ARTICLES_LISTING_ATTRIBUTES: List[Any] = [
+    *[
+        attribute
+        for attribute in SourcedArticles.get_attributes().values()
+        if attribute.is_hash_key or attribute.is_range_key
+    ],
+    SourcedArticles.sourced_article_id,
+    SourcedArticles.title,
+    SourcedArticles.topic_id,
+    SourcedArticles.date_published,
+    SourcedArticles.dt_published,
+    SourcedArticles.short_summary_ref,
+    *[SourcedArticles.source_article_urls[idx] for idx in range(MAX_SOURCES_PER_ARTICLE_IN_UI)],
+    *[SourcedArticles.providers[idx] for idx in range(MAX_SOURCES_PER_ARTICLE_IN_UI)],
+]
+
+# <article key>: <summarization length>: <summary ref> of the articles readers expanded
+sourced_article_details_cache = LRUCache(
+    "sourced_article_details", max_entries=ARTICLE_DETAILS_CACHE_MAX_ENTRIES
+)
+
+
+def sourced_article_key(sourced_article: SourcedArticles) -> Dict[str, Dict[str, Any]]:
+    """
+    Gets the primary key of a sourced article in the format of a query last evaluated key.
+
+    :param sourced_article: The sourced article.
+    :return: The serialized primary key, usable as the last_evaluated_key of a query.
+    """
+    serialized_sourced_article = sourced_article.serialize(null_check=False)
+    return {
+        attribute_name: serialized_sourced_article[attribute_name]
+        for attribute_name in SOURCED_ARTICLES_KEY_ATTRIBUTE_NAMES
+    }
+
+
+def sourced_article_to_news_article_fields(sourced_article: SourcedArticles) -> Dict[str, Any]:
+    """
+    Gets the fields of the NewsArticle displayed in the newspaper for a sourced article.
+
+    The sourced article only needs the SOURCED_ARTICLES_LISTING_ATTRIBUTES to be read.
+
+    :param sourced_article: The sourced article.
+    :return: The NewsArticle fields.
+    """
+    return dict(
+        article_id=sourced_article.sourced_article_id,
+        article_key=json.dumps(sourced_article_key(sourced_article), sort_keys=True),
+        title=sourced_article.title,
+        topic_id=sourced_article.topic_id,
+        source_urls=(sourced_article.source_article_urls or [])[:MAX_SOURCES_PER_ARTICLE_IN_UI],
+        source_provider_names=(sourced_article.providers or [])[:MAX_SOURCES_PER_ARTICLE_IN_UI],
+        date_published=sourced_article.date_published,
+        published_on_dt=sourced_article.dt_published.strftime("%Y-%m-%d %H:%M:%S"),
+        short_summary_ref=sourced_article.short_summary_ref,
+    )
+
+
+def fetch_sourced_article_summary_refs(article_key: str) -> Dict[str, str]:
+    """
+    Fetches the summary refs of a sourced article from DynamoDB.
+
+    :param article_key: The serialized primary key of the sourced article (the NewsArticle article_key).
+    :return: The summary ref of each summarization length.
+    """
+    # the key is deserialized into a model instance to get the typed hash and range key values
+    key = SourcedArticles.from_raw_data(json.loads(article_key))
+    hash_key, range_key = None, None
+    for attribute_name, attribute in SourcedArticles.get_attributes().items():
+        if attribute.is_hash_key:
+            hash_key = getattr(key, attribute_name)
+        elif attribute.is_range_key:
+            range_key = getattr(key, attribute_name)
+    sourced_article = SourcedArticles.get(
+        hash_key,
+        range_key,
+        attributes_to_get=[
+            SourcedArticles.short_summary_ref,
+            SourcedArticles.medium_summary_ref,
+            SourcedArticles.full_summary_ref,
+        ],
+    )
+    return {
+        SummarizationLength.SHORT.value: sourced_article.short_summary_ref,
+        SummarizationLength.MEDIUM.value: sourced_article.medium_summary_ref,
+        SummarizationLength.FULL.value: sourced_article.full_summary_ref,
+    }
+
+
+def get_sourced_article_summary_refs(article_key: str) -> Dict[str, str]:
+    """
+    Gets the summary refs of a sourced article, served from the shared details cache when possible.
+
+    :param article_key: The serialized primary key of the sourced article (the NewsArticle article_key).
+    :return: The summary ref of each summarization length.
+    """
+    return sourced_article_details_cache.get_or_load(
+        article_key, lambda: fetch_sourced_article_summary_refs(article_key)
+    )
@@ -0,0 +1,107 @@
+"""Sizes of the state sent to the frontend."""
+
+from typing import Any, Dict, Optional
+
+import json
+import threading
+import time
+
+from the_daily_bite_web_app.utils.telemetry import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def serialized_size(value: Any) -> int:
+    """
+    Gets the size of a value serialized the way reflex sends it to the frontend.
+
+    :param value: The value (e.g. the delta or the dict of a state).
+    :return: The size of the serialized value in bytes.
+    """
+    return len(json.dumps(value, ensure_ascii=False, default=list).encode("utf-8"))
+
+
+class SizeStats:
+    """The count, mean, last and max of the sizes recorded."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_bytes = 0
+        self.last_bytes = 0
+        self.max_bytes = 0
+
+    def record(self, size_bytes: int) -> None:
+        self.count += 1
+        self.total_bytes += size_bytes
+        self.last_bytes = size_bytes
+        self.max_bytes = max(self.max_bytes, size_bytes)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_bytes": self.total_bytes / self.count if self.count else 0.0,
+            "last_bytes": self.last_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class SizeTracker:
+    """Thread safe size statistics by name, optionally logged periodically."""
+
+    def __init__(self, name: str, log_interval_secs: float = 0):
+        """
+        :param name: The name of the statistics, used in the logs.
+        :param log_interval_secs: How often the summaries are logged. Never when 0.
+        """
+        self.name = name
+        self.log_interval_secs = log_interval_secs
+        self._stats: Dict[str, SizeStats] = {}
+        self._lock = threading.Lock()
+        self._logger_thread: Optional[threading.Thread] = None
+
+    def record(self, name: str, size_bytes: int) -> None:
+        """
+        Record a size.
+
+        :param name: The name of the statistics (e.g. the event handler).
+        :param size_bytes: The size in bytes.
+        """
+        if self.log_interval_secs and self._logger_thread is None:
+            self._start_logger_thread()
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = SizeStats()
+            stats.record(size_bytes)
+
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        """Get the count, mean, last and max size of each statistics, largest max first."""
+        with self._lock:
+            summaries = {name: stats.summary() for name, stats in self._stats.items()}
+        return dict(sorted(summaries.items(), key=lambda item: item[1]["max_bytes"], reverse=True))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def _start_logger_thread(self) -> None:
+        with self._lock:
+            if self._logger_thread is None:
+                self._logger_thread = threading.Thread(
+                    target=self._log_loop, name=f"{self.name}-size-log", daemon=True
+                )
+                self._logger_thread.start()
+
+    def _log_loop(self) -> None:
+        while True:
+            time.sleep(self.log_interval_secs)
+            for name, summary in self.summaries().items():
+                logger.info(
+                    "%s size of %s: count=%d mean=%.0fB last=%dB max=%dB",
+                    self.name,
+                    name,
+                    summary["count"],
+                    summary["mean_bytes"],
+                    summary["last_bytes"],
+                    summary["max_bytes"],
+                )
@@ -0,0 +1,137 @@
+"""Access to the article summary texts stored in S3."""
+
+from typing import Dict, Iterable, List
+
+import hashlib
+import hmac
+import secrets
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import quote
+
+from news_aggregator_data_access_layer.config import LOCAL_TESTING, SOURCED_ARTICLES_S3_BUCKET
+from news_aggregator_data_access_layer.utils.s3 import get_object
+
+from the_daily_bite_web_app.config import (
+    API_URL,
+    SUMMARY_PREFETCH_CONCURRENCY,
+    SUMMARY_PREFETCH_ENABLED,
+    SUMMARY_TEXT_CACHE_MAX_BYTES,
+    SUMMARY_URL_SIGNING_KEY,
+)
+from the_daily_bite_web_app.constants import SUMMARIES_API_PATH
+from the_daily_bite_web_app.exceptions import MissingConfigurationException
+from the_daily_bite_web_app.utils.cache import LRUCache
+from the_daily_bite_web_app.utils.telemetry import setup_logger
+
+logger = setup_logger(__name__)
+
+if not SUMMARY_URL_SIGNING_KEY and not LOCAL_TESTING:
+    # a key of each process' own would make the urls signed by a worker invalid on the others
+    raise MissingConfigurationException(
+        "SUMMARY_URL_SIGNING_KEY",
+        "SUMMARY_URL_SIGNING_KEY must be set to the same secret on every instance.",
+    )
+# a single process is run when testing locally, which can sign with a key of its own
+_summary_url_signing_key = (SUMMARY_URL_SIGNING_KEY or secrets.token_hex(32)).encode("utf-8")
+
+# summaries never change for a given ref so entries are only evicted to respect the byte budget
+summary_texts_cache = LRUCache(
+    "summary_texts",
+    max_bytes=SUMMARY_TEXT_CACHE_MAX_BYTES,
+    sizeof=lambda text: len(text.encode("utf-8")),
+)
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=SUMMARY_PREFETCH_CONCURRENCY, thread_name_prefix="summary-prefetch"
+)
+# <ref>: <future> for the prefetches in progress so a reader opening the article waits on it
+# rather than sending a second request for the same summary
+_prefetches_in_flight: Dict[str, "Future[str]"] = dict()
+_prefetches_in_flight_lock = threading.Lock()
+
+
+def fetch_summary_text(ref: str) -> str:
+    """
+    Fetches a summary text from S3 formatted for display.
+
+    :param ref: The S3 key of the summary (e.g. the short_summary_ref of a sourced article).
+    :return: The summary text with line breaks converted to html.
+    """
+    return get_object(SOURCED_ARTICLES_S3_BUCKET, ref)[0].replace("\n", "<br>")
+
+
+def get_summary_text(ref: str) -> str:
+    """
+    Gets a summary text formatted for display, served from the shared summary cache when possible.
+
+    :param ref: The S3 key of the summary (e.g. the short_summary_ref of a sourced article).
+    :return: The summary text with line breaks converted to html.
+    """
+    with _prefetches_in_flight_lock:
+        prefetch = _prefetches_in_flight.get(ref)
+    if prefetch is not None:
+        try:
+            return prefetch.result()
+        except Exception:
+            # the prefetch failure was already logged; fall back to fetching it here
+            pass
+    return summary_texts_cache.get_or_load(ref, lambda: fetch_summary_text(ref))
+
+
+def _prefetch_summary_text(ref: str) -> str:
+    try:
+        return summary_texts_cache.get_or_load(ref, lambda: fetch_summary_text(ref))
+    except Exception as e:
+        logger.warning("Failed to prefetch summary %s. Error: %s", ref, e)
+        raise
+    finally:
+        with _prefetches_in_flight_lock:
+            _prefetches_in_flight.pop(ref, None)
+
+
+def prefetch_summary_texts(refs: Iterable[str]) -> List["Future[str]"]:
+    """
+    Fetches summary texts into the shared summary cache in the background.
+
+    At most SUMMARY_PREFETCH_CONCURRENCY summaries are fetched at the same time. Summaries
+    already cached or being prefetched are skipped. Does nothing if SUMMARY_PREFETCH_ENABLED is off.
+
+    :param refs: The S3 keys of the summaries to prefetch.
+    :return: The futures of the prefetches submitted.
+    """
+    if not SUMMARY_PREFETCH_ENABLED:
+        return []
+    prefetches = []
+    with _prefetches_in_flight_lock:
+        for ref in refs:
+            if not ref or ref in _prefetches_in_flight or ref in summary_texts_cache:
+                continue
+            prefetch = _prefetch_executor.submit(_prefetch_summary_text, ref)
+            _prefetches_in_flight[ref] = prefetch
+            prefetches.append(prefetch)
+    return prefetches
+
+
+def summary_signature(ref: str) -> str:
+    """
+    Signs a summary ref so that the summaries api only serves the refs handed out by the app.
+
+    :param ref: The S3 key of the summary.
+    :return: The signature of the ref.
+    """
+    return hmac.new(_summary_url_signing_key, ref.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def is_valid_summary_signature(ref: str, signature: str) -> bool:
+    """Whether the signature is the signature of the summary ref."""
+    return hmac.compare_digest(summary_signature(ref), signature)
+
+
+def summary_url(ref: str) -> str:
+    """
+    Gets the url the browser loads a summary text from.
+
+    :param ref: The S3 key of the summary.
+    :return: The signed url of the summary on the summaries api.
+    """
+    return f"{API_URL}{SUMMARIES_API_PATH}/{quote(ref)}?signature={summary_signature(ref)}"
@@ -1,17 +1,148 @@
-from typing import Union
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple, Union
 
+import atexit
+import contextlib
+import copy
+import json
 import logging
+import queue
 import sys
+import threading
+import time
 from collections.abc import Mapping
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
 import boto3
 from news_aggregator_data_access_layer.config import LOCAL_TESTING, REGION_NAME
 
-from the_daily_bite_web_app.config import DEFAULT_LOGGER_NAME, DEFAULT_NAMESPACE
+from the_daily_bite_web_app.config import (
+    DEFAULT_LOGGER_NAME,
+    DEFAULT_NAMESPACE,
+    LOG_ASYNC_ENABLED,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_SAMPLING_MAX_RECORDS_PER_SEC,
+    METRICS_ENABLED,
+    METRICS_FILE_PATH,
+    METRICS_FLUSH_INTERVAL_SECS,
+    METRICS_SINKS,
+)
 
 loggers: Mapping[str, logging.Logger] = {}
 
+TEXT_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats log records as single line json objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            log["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through at most ``max_records_per_sec`` records of each logger below WARNING, with a
+    token bucket refilled continuously. Warnings and errors are never dropped.
+    """
+
+    def __init__(self, max_records_per_sec: float):
+        super().__init__()
+        self.max_records_per_sec = max_records_per_sec
+        # <logger name>: (<tokens left>, <monotonic time of the last refill>)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, last_refill = self._buckets.get(record.name, (self.max_records_per_sec, now))
+            tokens = min(
+                self.max_records_per_sec, tokens + (now - last_refill) * self.max_records_per_sec
+            )
+            if tokens < 1:
+                self._buckets[record.name] = (tokens, now)
+                self.dropped += 1
+                return False
+            self._buckets[record.name] = (tokens - 1, now)
+            return True
+
+
+# the types of the log arguments which can't change between the call and the record being formatted
+_IMMUTABLE_LOG_ARG_TYPES = (str, bytes, int, float, bool, type(None), datetime, BaseException)
+
+
+class RawRecordQueueHandler(QueueHandler):
+    """
+    Puts the records on the queue unformatted, for the listener to format them in the background.
+
+    QueueHandler formats the message (and the traceback into it) on the logging thread so records
+    can be pickled to other processes. The queue is in process so the records are passed as they are,
+    their exc_info included, which the json formatter writes to its own field. Only the messages with
+    arguments which could be mutated before the listener formats them (e.g. lists) are formatted here.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args.values() if isinstance(record.args, Mapping) else record.args or ()
+        if all(isinstance(arg, _IMMUTABLE_LOG_ARG_TYPES) for arg in args):
+            return record
+        # a copy so that the other handlers of the record are unaffected
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _log_formatter() -> logging.Formatter:
+    return JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_LOG_FORMAT)
+
+
+_log_queue_handler: Optional[QueueHandler] = None
+_log_queue_listener: Optional[QueueListener] = None
+_log_queue_lock = threading.Lock()
+
+
+def _get_log_queue_handler() -> QueueHandler:
+    """
+    Gets the handler shared by every logger in async mode: records are put on a queue and written
+    to stdout by a background listener so logging never blocks on I/O.
+    """
+    global _log_queue_handler, _log_queue_listener
+
+    with _log_queue_lock:
+        if _log_queue_handler is None:
+            log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(_log_formatter())
+            _log_queue_listener = QueueListener(
+                log_queue, stream_handler, respect_handler_level=True
+            )
+            _log_queue_listener.start()
+            # the records still queued are written before the process exits
+            atexit.register(_log_queue_listener.stop)
+            _log_queue_handler = RawRecordQueueHandler(log_queue)
+        return _log_queue_handler
+
+
+_log_sampling_filter = (
+    SamplingFilter(LOG_SAMPLING_MAX_RECORDS_PER_SEC)
+    if LOG_SAMPLING_MAX_RECORDS_PER_SEC > 0
+    else None
+)
+
 
 def setup_logger(name: str = DEFAULT_LOGGER_NAME) -> logging.Logger:
     global loggers
@@ -20,16 +151,300 @@ def setup_logger(name: str = DEFAULT_LOGGER_NAME) -> logging.Logger:
         return loggers[name]
     else:
         logger = logging.getLogger(name)
-        logger.setLevel(logging.INFO)
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(logging.INFO)
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        handler.setFormatter(formatter)
+        logger.setLevel(LOG_LEVEL)
+        if LOG_ASYNC_ENABLED:
+            handler: logging.Handler = _get_log_queue_handler()
+        else:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(_log_formatter())
+        handler.setLevel(LOG_LEVEL)
+        if _log_sampling_filter is not None:
+            # on the logger rather than the shared handler so dropped records aren't even formatted
+            logger.addFilter(_log_sampling_filter)
         logger.addHandler(handler)
         loggers[name] = logger  # type: ignore
         return logger
 
 
+# the maximum number of metrics in a single PutMetricData request
+PUT_METRIC_DATA_MAX_METRICS = 1000
+
+
+class AggregatedMetric:
+    """The statistics of the values recorded for a metric since the last flush."""
+
+    __slots__ = (
+        "namespace",
+        "name",
+        "dimensions",
+        "unit",
+        "sample_count",
+        "sum",
+        "minimum",
+        "maximum",
+    )
+
+    def __init__(self, namespace: str, name: str, dimensions: Mapping[str, str], unit: str):
+        self.namespace = namespace
+        self.name = name
+        self.dimensions = dimensions
+        self.unit = unit
+        self.sample_count = 0
+        self.sum: float = 0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+
+    def add(self, value: Union[int, float]) -> None:
+        self.sample_count += 1
+        self.sum += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+
+class CloudWatchMetricsSink:
+    """Sends aggregated metrics to CloudWatch with as few PutMetricData requests as possible."""
+
+    def __init__(self, region_name: str = REGION_NAME):
+        self.region_name = region_name
+        self._cloudwatch_client = None
+
+    def write(self, timestamp: datetime, metrics: Sequence[AggregatedMetric]) -> None:
+        if self._cloudwatch_client is None:
+            # one client is reused by every flush
+            self._cloudwatch_client = boto3.client("cloudwatch", region_name=self.region_name)
+        metric_data_by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+        for metric in metrics:
+            metric_data_by_namespace.setdefault(metric.namespace, []).append(
+                {
+                    "MetricName": metric.name,
+                    "Dimensions": [
+                        {"Name": key, "Value": value} for key, value in metric.dimensions.items()
+                    ],
+                    "Timestamp": timestamp,
+                    "StatisticValues": {
+                        "SampleCount": metric.sample_count,
+                        "Sum": metric.sum,
+                        "Minimum": metric.minimum,
+                        "Maximum": metric.maximum,
+                    },
+                    "Unit": metric.unit,
+                }
+            )
+        for namespace, metric_data in metric_data_by_namespace.items():
+            for idx in range(0, len(metric_data), PUT_METRIC_DATA_MAX_METRICS):
+                self._cloudwatch_client.put_metric_data(
+                    Namespace=namespace,
+                    MetricData=metric_data[idx : idx + PUT_METRIC_DATA_MAX_METRICS],
+                )
+
+
+class EmfMetricsSink:
+    """
+    Writes aggregated metrics to stdout in the CloudWatch embedded metric format, so they're
+    extracted from the logs rather than sent with API calls.
+    """
+
+    def __init__(self, stream: Any = None):
+        self.stream = stream or sys.stdout
+
+    def write(self, timestamp: datetime, metrics: Sequence[AggregatedMetric]) -> None:
+        for metric in metrics:
+            emf_log = {
+                "_aws": {
+                    "Timestamp": int(timestamp.timestamp() * 1000),
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": metric.namespace,
+                            "Dimensions": [list(metric.dimensions.keys())],
+                            "Metrics": [{"Name": metric.name, "Unit": metric.unit}],
+                        }
+                    ],
+                },
+                **metric.dimensions,
+                # counts are reported as their total and other units as their average
+                metric.name: metric.sum
+                if metric.unit == "Count"
+                else metric.sum / metric.sample_count,
+                f"{metric.name}.SampleCount": metric.sample_count,
+                f"{metric.name}.Minimum": metric.minimum,
+                f"{metric.name}.Maximum": metric.maximum,
+            }
+            self.stream.write(json.dumps(emf_log) + "\n")
+        self.stream.flush()
+
+
+class FileMetricsSink:
+    """Appends aggregated metrics as json lines to a local file, for local testing."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, timestamp: datetime, metrics: Sequence[AggregatedMetric]) -> None:
+        with open(self.path, "a") as f:
+            for metric in metrics:
+                f.write(
+                    json.dumps(
+                        {
+                            "namespace": metric.namespace,
+                            "timestamp": timestamp.isoformat(),
+                            "name": metric.name,
+                            "dimensions": dict(metric.dimensions),
+                            "unit": metric.unit,
+                            "sample_count": metric.sample_count,
+                            "sum": metric.sum,
+                            "minimum": metric.minimum,
+                            "maximum": metric.maximum,
+                        }
+                    )
+                    + "\n"
+                )
+
+
+class MetricsAggregator:
+    """
+    Aggregates the metrics recorded in process and flushes them to sinks from a background thread.
+
+    Recording a metric only updates in memory statistics (sample count, sum, minimum and maximum)
+    per metric name, dimensions and unit, so it is cheap enough for event handlers. The statistics
+    are flushed every ``flush_interval_secs`` and when the process exits.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        sinks: Sequence[Any],
+        flush_interval_secs: float,
+        default_dimensions: Optional[Mapping[str, str]] = None,
+    ):
+        """
+        :param namespace: The default namespace of the metrics.
+        :param sinks: Written the aggregated metrics to on each flush.
+        :param flush_interval_secs: How often the metrics are flushed.
+        :param default_dimensions: Dimensions added to every metric.
+        """
+        self.namespace = namespace
+        self.sinks = list(sinks)
+        self.flush_interval_secs = flush_interval_secs
+        self.default_dimensions = dict(default_dimensions or {})
+        self._metrics: Dict[Tuple[str, str, FrozenSet[Tuple[str, str]], str], AggregatedMetric] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def record(
+        self,
+        name: str,
+        value: Union[int, float],
+        dimensions: Mapping[str, str] = {},
+        unit: str = "Count",
+        namespace: Optional[str] = None,
+    ) -> None:
+        """
+        Record a value of a metric.
+
+        :param name: The name of the metric.
+        :param value: The value recorded.
+        :param dimensions: The dimensions of the metric.
+        :param unit: The CloudWatch unit of the metric.
+        :param namespace: The namespace of the metric. Defaults to the aggregator's namespace.
+        """
+        if not self.sinks:
+            return
+        self._ensure_flusher()
+        namespace = namespace or self.namespace
+        key = (namespace, name, frozenset(dimensions.items()), unit)
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = AggregatedMetric(
+                    namespace, name, {**self.default_dimensions, **dimensions}, unit
+                )
+                self._metrics[key] = metric
+            metric.add(value)
+
+    def increment(
+        self, name: str, value: Union[int, float] = 1, dimensions: Mapping[str, str] = {}
+    ) -> None:
+        """Increment a count metric."""
+        self.record(name, value, dimensions={"Type": "count", **dimensions}, unit="Count")
+
+    @contextlib.contextmanager
+    def timer(self, name: str, dimensions: Mapping[str, str] = {}) -> Iterator[None]:
+        """Record the time spent in the block, in milliseconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(
+                name,
+                (time.perf_counter() - start) * 1000,
+                dimensions={"Type": "timing", **dimensions},
+                unit="Milliseconds",
+            )
+
+    def flush(self) -> None:
+        """Write the metrics aggregated since the last flush to the sinks."""
+        with self._lock:
+            metrics, self._metrics = list(self._metrics.values()), {}
+        if not metrics:
+            return
+        timestamp = datetime.now(timezone.utc)
+        for sink in self.sinks:
+            try:
+                sink.write(timestamp, metrics)
+            except Exception as e:
+                logger = setup_logger(__name__)
+                logger.error(
+                    "Failed to write %s metrics to %s: %s",
+                    len(metrics),
+                    type(sink).__name__,
+                    e,
+                    exc_info=True,
+                )
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="metrics-flush", daemon=True
+                )
+                self._flusher.start()
+                atexit.register(self.flush)
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval_secs)
+            self.flush()
+
+
+def _metrics_sinks_from_config() -> List[Any]:
+    if not METRICS_ENABLED:
+        return []
+    sinks: List[Any] = []
+    for sink_name in [name.strip() for name in METRICS_SINKS.split(",") if name.strip()]:
+        if sink_name == "cloudwatch":
+            # metrics are kept local when testing
+            sinks.append(
+                FileMetricsSink(METRICS_FILE_PATH) if LOCAL_TESTING else CloudWatchMetricsSink()
+            )
+        elif sink_name == "emf":
+            sinks.append(EmfMetricsSink())
+        elif sink_name == "file":
+            sinks.append(FileMetricsSink(METRICS_FILE_PATH))
+        else:
+            raise ValueError(f"Unknown metrics sink {sink_name}")
+    return sinks
+
+
+metrics = MetricsAggregator(
+    namespace=DEFAULT_NAMESPACE,
+    sinks=_metrics_sinks_from_config(),
+    flush_interval_secs=METRICS_FLUSH_INTERVAL_SECS,
+    default_dimensions={"Metric Type": "Custom"},
+)
+
+
 def publish_metric_data(
     name: str,
     value: Union[int, float],
@@ -38,32 +453,9 @@ def publish_metric_data(
     namespace: str = DEFAULT_NAMESPACE,
 ) -> None:
     """
-    Publishes a metric to CloudWatch
+    Publishes a metric to CloudWatch through the metrics aggregator
     """
-    default_dimensions = {"Metric Type": "Custom"}
-    metric_dimensions = {**default_dimensions, **dimensions}
-    if LOCAL_TESTING:
-        logger = setup_logger(__name__)
-        logger.info(f"Metric: {name} - {value} - {metric_dimensions}")
-        return
-    cloudwatch_client = boto3.client("cloudwatch", region_name=REGION_NAME)
-    try:
-        cloudwatch_client.put_metric_data(
-            Namespace=namespace,
-            MetricData=[
-                {
-                    "MetricName": name,
-                    "Dimensions": [
-                        {"Name": key, "Value": value} for key, value in metric_dimensions.items()
-                    ],
-                    "Timestamp": datetime.now(timezone.utc),
-                    "Value": value,
-                    "Unit": unit,
-                },
-            ],
-        )
-    except Exception as e:
-        raise Exception(f"Failed to publish metric data: {e}")
+    metrics.record(name, value, dimensions=dimensions, unit=unit, namespace=namespace)
 
 
 def publish_count_metric(
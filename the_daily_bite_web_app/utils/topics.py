@@ -0,0 +1,137 @@
+"""Access to the news topics metadata shared by every user."""
+
+from typing import Iterable, List, NamedTuple, Optional
+
+import threading
+import time
+from datetime import datetime
+
+from news_aggregator_data_access_layer.models.dynamodb import NewsTopics
+
+from the_daily_bite_web_app.config import (
+    TOPIC_CATALOG_REFRESH_INTERVAL_SECS,
+    TOPIC_METADATA_CACHE_MAX_ENTRIES,
+    TOPIC_METADATA_CACHE_TTL_SECS,
+)
+from the_daily_bite_web_app.utils.cache import LRUCache
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TopicMetadata(NamedTuple):
+    """The metadata of a news topic displayed in the app."""
+
+    topic_id: str
+    topic: str
+    is_published: bool
+    last_publishing_date: Optional[datetime]
+
+
+# topics rarely change so they're served from memory and refreshed once their entry expires
+topic_metadata_cache = LRUCache(
+    "topic_metadata",
+    max_entries=TOPIC_METADATA_CACHE_MAX_ENTRIES,
+    ttl_seconds=TOPIC_METADATA_CACHE_TTL_SECS,
+)
+
+
+def news_topic_to_topic_metadata(news_topic: NewsTopics) -> TopicMetadata:
+    """
+    Gets the metadata of a news topic.
+
+    :param news_topic: The news topic.
+    :return: The topic metadata.
+    """
+    return TopicMetadata(
+        topic_id=news_topic.topic_id,
+        topic=news_topic.topic,
+        is_published=bool(news_topic.is_published),
+        last_publishing_date=news_topic.last_publishing_date,
+    )
+
+
+def get_topics_metadata(topic_ids: Iterable[str]) -> List[TopicMetadata]:
+    """
+    Gets the metadata of the given topics, served from the shared cache when possible.
+
+    The topics missing from the cache (or expired) are read in a single batch get.
+
+    :param topic_ids: The topic ids to get the metadata of.
+    :return: The metadata of the topics found, in the order of the topic ids.
+    """
+    topic_ids = list(dict.fromkeys(topic_ids))
+    topics_metadata = {topic_id: topic_metadata_cache.get(topic_id) for topic_id in topic_ids}
+    missing_topic_ids = [
+        topic_id for topic_id, topic_metadata in topics_metadata.items() if topic_metadata is None
+    ]
+    if missing_topic_ids:
+        logger.info("Getting the metadata of %s topics...", len(missing_topic_ids))
+        for news_topic in NewsTopics.batch_get(missing_topic_ids):
+            topic_metadata = news_topic_to_topic_metadata(news_topic)
+            topic_metadata_cache.set(topic_metadata.topic_id, topic_metadata)
+            topics_metadata[topic_metadata.topic_id] = topic_metadata
+    return [
+        topics_metadata[topic_id] for topic_id in topic_ids if topics_metadata[topic_id] is not None
+    ]
+
+
+class TopicCatalog:
+    """
+    The published news topics, kept in memory and refreshed in the background.
+
+    The catalog is read with a single table scan when first used and then every refresh interval
+    by a daemon thread, so serving it doesn't touch DynamoDB. If a refresh fails the previous
+    catalog keeps being served.
+    """
+
+    def __init__(self, refresh_interval_secs: float):
+        """
+        :param refresh_interval_secs: How often the catalog is read again.
+        """
+        self.refresh_interval_secs = refresh_interval_secs
+        self._published_topics: Optional[List[TopicMetadata]] = None
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def get_published_topics(self) -> List[TopicMetadata]:
+        """
+        Gets the published topics, reading them first if the catalog was never loaded.
+
+        :return: The metadata of the published topics.
+        """
+        published_topics = self._published_topics
+        if published_topics is None:
+            with self._lock:
+                if self._published_topics is None:
+                    self.refresh()
+                if self._refresh_thread is None:
+                    self._refresh_thread = threading.Thread(
+                        target=self._refresh_loop, name="topic-catalog-refresh", daemon=True
+                    )
+                    self._refresh_thread.start()
+            published_topics = self._published_topics
+        return list(published_topics or [])
+
+    def refresh(self) -> None:
+        """Read the published topics from DynamoDB, also refreshing the topic metadata cache."""
+        published_topics = []
+        for news_topic in NewsTopics.scan():
+            topic_metadata = news_topic_to_topic_metadata(news_topic)
+            topic_metadata_cache.set(topic_metadata.topic_id, topic_metadata)
+            if topic_metadata.is_published:
+                published_topics.append(topic_metadata)
+        self._published_topics = published_topics
+        logger.info("Refreshed the topic catalog with %s published topics", len(published_topics))
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(self.refresh_interval_secs)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Error refreshing the topic catalog: %s", e, exc_info=True)
+                metrics.increment("TopicCatalogRefreshError")
+
+
+topic_catalog = TopicCatalog(refresh_interval_secs=TOPIC_CATALOG_REFRESH_INTERVAL_SECS)
@@ -0,0 +1,283 @@
+"""A background queue for the writes a user doesn't need to wait on."""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type
+
+import atexit
+import queue
+import random
+import threading
+import time
+
+from pynamodb.models import Model
+
+from the_daily_bite_web_app.config import WRITE_BEHIND_MAX_ATTEMPTS, WRITE_BEHIND_QUEUE_MAX_SIZE
+from the_daily_bite_web_app.utils.cache import LRUCache
+from the_daily_bite_web_app.utils.dynamodb import batch_write
+from the_daily_bite_web_app.utils.telemetry import metrics, setup_logger
+
+logger = setup_logger(__name__)
+
+
+class WriteBehindQueue:
+    """
+    A bounded queue of writes performed in order by a background thread.
+
+    Each write is attempted up to ``max_attempts`` times with a jittered exponential backoff.
+    The writes still queued when the process exits are flushed before it does.
+    """
+
+    def __init__(self, name: str, max_size: int, max_attempts: int, base_backoff_secs: float = 0.1):
+        """
+        :param name: The name of the queue, used in logs and statistics.
+        :param max_size: The maximum number of writes queued.
+        :param max_attempts: The number of times a write is attempted before it is dropped.
+        :param base_backoff_secs: The backoff before the second attempt of a write, doubled after each attempt.
+        """
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_backoff_secs = base_backoff_secs
+        self._queue: "queue.Queue[Callable[[], Any]]" = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._written = 0
+        self._failed = 0
+
+    def submit(self, write: Callable[[], Any], description: str = "") -> bool:
+        """
+        Queue a write to be performed in the background.
+
+        :param write: Called with no arguments to perform the write.
+        :param description: Describes the write in the logs.
+        :return: Whether the write was queued. False when the queue is full, in which case the
+                 caller should perform the write itself.
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(lambda: self._write(write, description))
+            return True
+        except queue.Full:
+            logger.warning("Write behind queue %s is full. Not queueing %s", self.name, description)
+            metrics.increment("WriteBehindQueueFull", dimensions={"Queue": self.name})
+            return False
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Perform the writes queued in the calling thread.
+
+        :param timeout: The maximum time spent flushing. No limit when None.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                write = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                write()
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of writes queued, written and failed."""
+        return {
+            "name": self.name,
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "failed": self._failed,
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._work, name=f"write-behind-{self.name}", daemon=True
+                )
+                self._worker.start()
+                atexit.register(self.flush)
+
+    def _work(self) -> None:
+        while True:
+            write = self._queue.get()
+            try:
+                write()
+            finally:
+                self._queue.task_done()
+
+    def _write(self, write: Callable[[], Any], description: str) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                write()
+                self._written += 1
+                return
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    logger.error(
+                        "Failed to write %s after %s attempts: %s",
+                        description,
+                        attempt,
+                        e,
+                        exc_info=True,
+                    )
+                    metrics.increment("WriteBehindWriteError", dimensions={"Queue": self.name})
+                    self._failed += 1
+                    return
+                time.sleep(random.uniform(0, self.base_backoff_secs * 2 ** (attempt - 1)))
+
+
+class BatchWriteBuffer:
+    """
+    A buffer of items saved to DynamoDB in batch writes by a background thread.
+
+    The buffer is flushed once it holds ``max_items`` items or every ``flush_interval_secs``,
+    whichever comes first, and when the process exits. Items with the same dedupe key as an item
+    added within the last ``dedupe_window_secs`` are dropped. Items which fail to be written are
+    put back in the buffer and dropped after ``max_attempts`` attempts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: Type[Model],
+        max_items: int,
+        flush_interval_secs: float,
+        dedupe_key: Optional[Callable[[Model], Hashable]] = None,
+        dedupe_window_secs: Optional[float] = None,
+        max_attempts: int = 3,
+    ):
+        """
+        :param name: The name of the buffer, used in logs and statistics.
+        :param model: The model of the items.
+        :param max_items: The number of items buffered that triggers a flush.
+        :param flush_interval_secs: The maximum time an item stays buffered.
+        :param dedupe_key: Returns the key items are deduplicated on. No deduplication when None.
+        :param dedupe_window_secs: How long a dedupe key is remembered for.
+        :param max_attempts: The number of times an item is attempted to be written before it is dropped.
+        """
+        self.name = name
+        self.model = model
+        self.max_items = max_items
+        self.flush_interval_secs = flush_interval_secs
+        self.dedupe_key = dedupe_key
+        self.max_attempts = max_attempts
+        self._recent_dedupe_keys = LRUCache(
+            f"{name}_dedupe_keys", max_entries=100000, ttl_seconds=dedupe_window_secs
+        )
+        # (<item>, <number of attempts made to write it>)
+        self._items: List[Tuple[Model, int]] = []
+        self._lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._deduped = 0
+        self._written = 0
+        self._retried = 0
+        self._failed = 0
+
+    def add(self, item: Model) -> bool:
+        """
+        Add an item to be saved.
+
+        :param item: The item to save.
+        :return: Whether the item was added. False when it duplicates a recent item.
+        """
+        self._ensure_flusher()
+        with self._lock:
+            if self.dedupe_key is not None:
+                dedupe_key = self.dedupe_key(item)
+                if dedupe_key in self._recent_dedupe_keys:
+                    self._deduped += 1
+                    return False
+                self._recent_dedupe_keys.set(dedupe_key, True)
+            self._items.append((item, 0))
+            if len(self._items) >= self.max_items:
+                self._flush_requested.set()
+        return True
+
+    def flush(self, concurrent: bool = True) -> None:
+        """
+        Save the items buffered in the calling thread.
+
+        The items which fail to be written are put back in the buffer, to be written by the next
+        flush, unless they were attempted ``max_attempts`` times.
+
+        :param concurrent: Whether the batch writes are sent concurrently (see batch_write).
+        """
+        with self._lock:
+            items, self._items = self._items, []
+        if not items:
+            return
+        batch_write_result = batch_write(
+            self.model,
+            items_to_save=[item for item, _ in items],
+            items_to_delete=[],
+            concurrent=concurrent,
+        )
+        failed_item_ids = {id(item) for item in batch_write_result.failed_saves}
+        retried_items = [
+            (item, attempts + 1)
+            for item, attempts in items
+            if id(item) in failed_item_ids and attempts + 1 < self.max_attempts
+        ]
+        dropped = len(failed_item_ids) - len(retried_items)
+        if failed_item_ids:
+            logger.error(
+                "Failed to write %d of %d %s items. Retrying %d, dropping %d",
+                len(failed_item_ids),
+                len(items),
+                self.name,
+                len(retried_items),
+                dropped,
+            )
+            metrics.increment(
+                "BatchWriteBufferWriteError", len(failed_item_ids), dimensions={"Buffer": self.name}
+            )
+        if retried_items:
+            with self._lock:
+                self._items[:0] = retried_items
+        self._written += len(items) - len(failed_item_ids)
+        self._retried += len(retried_items)
+        self._failed += dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of items buffered, deduplicated, written, retried and failed."""
+        return {
+            "name": self.name,
+            "buffered": len(self._items),
+            "deduped": self._deduped,
+            "written": self._written,
+            "retried": self._retried,
+            "failed": self._failed,
+        }
+
+    def _flush_on_exit(self) -> None:
+        # the thread pool of the batch writes is shut down before the atexit handlers run, so the
+        # batches are written from this thread. items are retried until written or out of attempts
+        while self._items:
+            self.flush(concurrent=False)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name=f"batch-write-buffer-{self.name}", daemon=True
+                )
+                self._flusher.start()
+                atexit.register(self._flush_on_exit)
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._flush_requested.wait(timeout=self.flush_interval_secs)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Error flushing %s: %s", self.name, e, exc_info=True)
+                metrics.increment("BatchWriteBufferFlushError", dimensions={"Buffer": self.name})
+
+
+write_behind_queue = WriteBehindQueue(
+    "default", max_size=WRITE_BEHIND_QUEUE_MAX_SIZE, max_attempts=WRITE_BEHIND_MAX_ATTEMPTS
+)